@@ -0,0 +1,159 @@
+"""
+WSGI vs ASGI capacity benchmark.
+
+Starts the API twice with the same number of gunicorn workers, once with sync
+workers on mentoreed.wsgi and once with uvicorn workers on mentoreed.asgi and
+the async auth views, then sends GET /api/v1/auth/user at rising concurrency
+levels. Both servers get the same worker count, so they run under roughly the
+same memory budget; the resident memory of each server is printed next to
+its results.
+
+The servers are separate processes, so this runs against the configured
+database rather than a throwaway one. A benchmark user is created and removed
+afterwards. Needs the production requirements (gunicorn, uvicorn):
+
+    python -m benchmarks.asgi_capacity --workers 2 --concurrency 8 32 128
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.utils import report, setup_django
+
+SERVERS = {
+    "wsgi (sync workers)": ["mentoreed.wsgi"],
+    "asgi (uvicorn workers)": [
+        "mentoreed.asgi:application",
+        "--worker-class",
+        "uvicorn.workers.UvicornWorker",
+    ],
+}
+
+
+def start_server(app_args, workers, port, async_views):
+    env = {
+        **os.environ,
+        "JWT_AUTH_ASYNC_VIEWS": str(async_views),
+    }
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            *app_args,
+            "--workers",
+            str(workers),
+            "--bind",
+            f"127.0.0.1:{port}",
+            "--log-level",
+            "warning",
+        ],
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/api/v1/auth/user")
+        except urllib.error.HTTPError:
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("Server did not start")
+
+
+def resident_memory_mb(pid):
+    """
+    Returns the resident memory of `pid` and its children, in megabytes.
+    """
+    pids = {pid}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as stat:
+                if int(stat.read().rsplit(")", 1)[1].split()[1]) == pid:
+                    pids.add(int(entry))
+        except OSError:
+            continue
+
+    total_kb = 0
+    for child in pids:
+        try:
+            with open(f"/proc/{child}/status") as status:
+                for line in status:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+        except OSError:
+            continue
+    return total_kb / 1024
+
+
+def load(url, cookie, concurrency, requests):
+    def call():
+        request = urllib.request.Request(url, headers={"Cookie": cookie})
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                response.read()
+            ok = True
+        except OSError:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda _: call(), range(requests)))
+    total = time.perf_counter() - start
+    return [duration for duration, ok in results if ok], total, results
+
+
+def run(workers, levels, requests, port):
+    from django.conf import settings
+
+    from core_apps.jwt.tokens import RefreshToken
+    from core_apps.users.tests.factories import UserFactory
+
+    user = UserFactory.create()
+    cookie = f"{settings.JWT_AUTH_COOKIE}={RefreshToken.for_user(user).access_token}"
+    url = f"http://127.0.0.1:{port}/api/v1/auth/user"
+
+    try:
+        for label, app_args in SERVERS.items():
+            process = start_server(app_args, workers, port, "asgi" in label)
+            try:
+                print(f"{label}: {resident_memory_mb(process.pid):.0f} MB resident")
+                for concurrency in levels:
+                    durations, total, results = load(url, cookie, concurrency, requests)
+                    failed = len(results) - len(durations)
+                    if durations:
+                        report(f"  concurrency {concurrency}", durations, total)
+                    if failed:
+                        print(f"  {failed} requests failed")
+            finally:
+                process.terminate()
+                process.wait()
+    finally:
+        user.delete()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 32, 128])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    setup_django()
+    run(args.workers, args.concurrency, args.requests, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Celery queue layout benchmark.
+
+Runs a burst of short tasks (like email batches) behind a few long ones (like
+bulk imports) through workers started in this process on an in-memory
+broker, so neither Redis nor a worker container is needed:
+
+    python -m benchmarks.celery_queues --short 400 --long 8
+
+Two layouts are compared:
+- "one queue": every task in the default queue, consumed by as many worker
+  processes as the routed layout has altogether, with the default prefetch
+  multiplier of 4;
+- "routed": the CELERY_TASK_ROUTES of the settings, with the processes of
+  CELERY_QUEUE_CONCURRENCY on each queue, and a prefetch multiplier of 1 on
+  the long-task queues.
+
+For each, it reports how long short tasks waited between being sent and
+starting, and the time to drain the burst.
+"""
+
+import argparse
+import logging
+import threading
+import time
+from contextlib import ExitStack
+
+from benchmarks.utils import report, setup_django
+
+
+def run(shorts, longs, short_seconds, long_seconds):
+    from celery.contrib.testing.worker import start_worker
+    from django.conf import settings
+
+    from mentoreed.celery import app
+
+    # Under their settings names, which take precedence over the celery ones.
+    app.conf.update(
+        CELERY_BROKER_URL="memory://",
+        CELERY_RESULT_BACKEND="cache+memory://",
+        CELERY_BROKER_TRANSPORT_OPTIONS={"polling_interval": 0.01},
+    )
+    waits = []
+    finished = threading.Semaphore(0)
+    lock = threading.Lock()
+
+    # Named after the tasks they stand in for, so the settings route them.
+    @app.task(name="core_apps.common.tasks.send_email_batch")
+    def short(sent):
+        with lock:
+            waits.append(time.perf_counter() - sent)
+        time.sleep(short_seconds)
+        finished.release()
+
+    @app.task(name="core_apps.users.tasks.import_users_task", acks_late=True)
+    def long():
+        time.sleep(long_seconds)
+        finished.release()
+
+    # Each worker process is a solo worker of its own, which runs one task at
+    # a time and reserves up to `prefetch_multiplier` messages, as a prefork
+    # process does.
+    queues = settings.CELERY_QUEUE_CONCURRENCY
+    layouts = {
+        "one queue": ({}, [("default", sum(queues.values()), 4)]),
+        "routed": (
+            settings.CELERY_TASK_ROUTES,
+            [
+                (
+                    queue,
+                    concurrency,
+                    1 if queue in settings.CELERY_LONG_TASK_QUEUES else 4,
+                )
+                for queue, concurrency in queues.items()
+            ],
+        ),
+    }
+
+    for label, (routes, workers) in layouts.items():
+        app.conf.update(CELERY_TASK_ROUTES=routes)
+        app.amqp.flush_routes()
+        app.amqp.router = app.amqp.Router()
+        waits.clear()
+        with ExitStack() as stack:
+            for queue, processes, prefetch_multiplier in workers:
+                for _ in range(processes):
+                    stack.enter_context(
+                        start_worker(
+                            app,
+                            pool="solo",
+                            queues=[queue],
+                            prefetch_multiplier=prefetch_multiplier,
+                            perform_ping_check=False,
+                            shutdown_timeout=60,
+                        )
+                    )
+            start = time.perf_counter()
+            for _ in range(longs):
+                long.delay()
+            for _ in range(shorts):
+                short.delay(time.perf_counter())
+            for _ in range(shorts + longs):
+                finished.acquire()
+            total = time.perf_counter() - start
+        report(f"{label}: short task wait", waits, total)
+        print(f"{label}: drained in {total:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--short", type=int, default=400)
+    parser.add_argument("--long", type=int, default=8)
+    parser.add_argument("--short-seconds", type=float, default=0.005)
+    parser.add_argument("--long-seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    setup_django()
+    logging.getLogger("celery").setLevel(logging.WARNING)
+    run(args.short, args.long, args.short_seconds, args.long_seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Database connection handling benchmark.
+
+Measures the latency of POST /api/v1/auth/register when every request opens
+a new database connection, when a connection is kept open between requests
+(CONN_MAX_AGE with health checks), and when connections come from a psycopg 3
+pool. The pool mode only runs against PostgreSQL with psycopg 3 installed.
+
+Point DATABASE_URL at the Postgres the service uses in production, over the
+same network path, so the connection handshake is measured:
+
+    python -m benchmarks.db_connections --requests 300
+
+Passwords are hashed with MD5 here, so connection cost is not lost behind
+the hasher.
+"""
+
+import argparse
+import itertools
+
+from benchmarks.utils import measure, report, setup_django, test_database
+
+MODES = {
+    "new connection per request": {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False},
+    "persistent connection": {"CONN_MAX_AGE": 60, "CONN_HEALTH_CHECKS": True},
+    "psycopg pool": {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False, "pool": True},
+}
+
+
+def configure(connection, mode):
+    connection.close()
+    if hasattr(connection, "close_pool"):
+        connection.close_pool()
+
+    options = dict(connection.settings_dict.get("OPTIONS", {}))
+    options.pop("pool", None)
+    if mode.get("pool"):
+        options["pool"] = {"min_size": 1, "max_size": 4}
+    connection.settings_dict.update(
+        CONN_MAX_AGE=mode["CONN_MAX_AGE"],
+        CONN_HEALTH_CHECKS=mode["CONN_HEALTH_CHECKS"],
+        OPTIONS=options,
+    )
+
+
+def supports_pool(connection):
+    return (
+        connection.vendor == "postgresql" and connection.Database.__name__ == "psycopg"
+    )
+
+
+def run(requests):
+    from django.db import close_old_connections, connection
+    from django.test import Client, override_settings
+
+    from core_apps.jwt.views import RegisterView
+
+    # The benchmark sends far more registrations than the throttle allows.
+    RegisterView.throttle_classes = []
+    client = Client()
+    counter = itertools.count()
+
+    def register():
+        n = next(counter)
+        response = client.post(
+            "/api/v1/auth/register",
+            {
+                "username": f"bench{n}",
+                "email": f"bench{n}@example.com",
+                "password1": "benchmark-password",
+                "password2": "benchmark-password",
+            },
+        )
+        assert response.status_code == 201, response.content
+        # The test client keeps the connection open; a server would run this
+        # on request_finished.
+        close_old_connections()
+
+    with override_settings(
+        PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]
+    ):
+        for label, mode in MODES.items():
+            if mode.get("pool") and not supports_pool(connection):
+                print(f"{label:<32} skipped, needs PostgreSQL with psycopg 3")
+                continue
+            configure(connection, mode)
+            register()
+            report(label, measure(register, requests))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        run(args.requests)
+
+
+if __name__ == "__main__":
+    main()
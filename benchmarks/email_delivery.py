@@ -0,0 +1,79 @@
+"""
+Email delivery benchmark.
+
+Sends the same messages to EMAIL_HOST the way djcelery_email's task does,
+with a new SMTP session per task of one message, and the way
+core_apps.common.tasks.send_email_batch does, in batches over the pooled
+session of the worker. Tasks run in this process, so no broker is needed;
+point it at the mailhog service of local.yml:
+
+    docker compose -f local.yml run --rm api \\
+        python -m benchmarks.email_delivery --messages 500 --batch-size 20
+
+Against mailhog only the SMTP round trips are measured; with EMAIL_USE_TLS
+and a remote server the per-session TLS handshake adds to the first case.
+"""
+
+import argparse
+import time
+
+from benchmarks.utils import report, setup_django
+
+
+def run(messages, batch_size):
+    from django.conf import settings
+    from django.core.mail import EmailMessage, get_connection
+    from djcelery_email.utils import chunked, dict_to_email, email_to_dict
+
+    from core_apps.common.mail import smtp_pool
+    from core_apps.common.tasks import send_email_batch
+
+    serialized = [
+        email_to_dict(
+            EmailMessage(f"Benchmark {i}", "Hello", to=[f"benchmark-{i}@example.com"])
+        )
+        for i in range(messages)
+    ]
+    print(f"{messages} messages to {settings.EMAIL_HOST}:{settings.EMAIL_PORT}")
+
+    def per_message(message):
+        connection = get_connection(settings.EMAIL_DELIVERY_BACKEND)
+        connection.open()
+        try:
+            connection.send_messages([dict_to_email(message)])
+        finally:
+            connection.close()
+
+    for label, chunks, send in (
+        ("session per message", [[m] for m in serialized], lambda c: per_message(c[0])),
+        (
+            f"pooled, batches of {batch_size}",
+            list(chunked(serialized, batch_size)),
+            send_email_batch,
+        ),
+    ):
+        durations = []
+        start = time.perf_counter()
+        for chunk in chunks:
+            chunk_start = time.perf_counter()
+            send(chunk)
+            # Per message, so both rows report messages per second.
+            durations += [(time.perf_counter() - chunk_start) / len(chunk)] * len(chunk)
+        report(label, durations, time.perf_counter() - start)
+        smtp_pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    run(args.messages, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Login-heavy load test for the gunicorn worker settings.
+
+Starts the API with gunicorn.conf.py once per worker setup and runs the same
+traffic against each: simulated clients log in, read their user details a
+few times and refresh their tokens, so password hashing (CPU bound, in the
+hashing pool) and database and Redis round trips (I/O bound) are mixed the
+way they are in production. Latency is reported per endpoint with the
+resident memory of each server.
+
+A setup is `<worker class>:<workers>x<threads>`. The first one is the
+default derived by gunicorn.conf.py for this machine:
+
+    python -m benchmarks.login_mix --setup default --setup gthread:2x1 \\
+        --setup gthread:2x8 --setup uvicorn:2x1 --clients 32 --seconds 30
+
+Like benchmarks.asgi_capacity, this runs against the configured database and
+Redis; the benchmark users are removed afterwards. Each request carries its
+own X-Forwarded-For so the login throttle sees many clients, as it would in
+production.
+"""
+
+import argparse
+import http.client
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+
+from benchmarks.asgi_capacity import resident_memory_mb
+from benchmarks.utils import report, setup_django
+
+PASSWORD = "benchmark-password"
+APPS = {
+    "gthread": "mentoreed.wsgi",
+    "uvicorn": "mentoreed.asgi:application",
+}
+
+
+def parse_setup(setup):
+    if setup == "default":
+        return "gthread", {}
+    worker_class, _, size = setup.partition(":")
+    workers, _, threads = size.partition("x")
+    return worker_class, {
+        "WEB_CONCURRENCY": workers,
+        "GUNICORN_THREADS": threads or "1",
+    }
+
+
+def start_server(setup, port):
+    worker_class, env = parse_setup(setup)
+    env = {
+        **os.environ,
+        **env,
+        "GUNICORN_WORKER_CLASS": worker_class,
+        "GUNICORN_BIND": f"127.0.0.1:{port}",
+        "JWT_AUTH_ASYNC_VIEWS": str(worker_class == "uvicorn"),
+    }
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            APPS[worker_class],
+            "--config",
+            "gunicorn.conf.py",
+            "--log-level",
+            "warning",
+        ],
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/api/v1/auth/user")
+            connection.getresponse().read()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("Server did not start")
+
+
+class Client:
+    """
+    One simulated user on a keep-alive connection.
+    """
+
+    addresses = itertools.count()
+
+    def __init__(self, port, username):
+        self.connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        self.username = username
+        self.cookies = {}
+
+    def send(self, method, path, body=None):
+        address = next(self.addresses)
+        headers = {
+            "X-Forwarded-For": f"10.{address >> 16 & 255}.{address >> 8 & 255}."
+            f"{address & 255}",
+            "Cookie": "; ".join(f"{k}={v}" for k, v in self.cookies.items()),
+        }
+        if body is not None:
+            headers["Content-Type"] = "application/json"
+            body = json.dumps(body)
+        self.connection.request(method, path, body=body, headers=headers)
+        response = self.connection.getresponse()
+        response.read()
+        for header in response.headers.get_all("Set-Cookie") or []:
+            name, _, rest = header.partition("=")
+            self.cookies[name] = rest.split(";", 1)[0]
+        return response.status
+
+    def session(self, reads):
+        yield "login", self.send(
+            "POST",
+            "/api/v1/auth/login",
+            {"username": self.username, "password": PASSWORD},
+        )
+        for _ in range(reads):
+            yield "user", self.send("GET", "/api/v1/auth/user")
+        yield "refresh", self.send("POST", "/api/v1/auth/token/refresh", {})
+
+
+def load(port, usernames, seconds, reads):
+    durations = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def simulate(username):
+        client = Client(port, username)
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            for name, status in client.session(random.randint(1, reads)):
+                elapsed = time.perf_counter() - start
+                with lock:
+                    if status < 400:
+                        durations[name].append(elapsed)
+                    else:
+                        errors[f"{name} {status}"] += 1
+                start = time.perf_counter()
+            client.cookies.clear()
+
+    threads = [threading.Thread(target=simulate, args=(u,)) for u in usernames]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return durations, errors, time.perf_counter() - start
+
+
+def run(setups, clients, seconds, reads, port):
+    from core_apps.users.tests.factories import UserFactory
+
+    users = UserFactory.create_batch(clients, password=PASSWORD)
+    usernames = [user.username for user in users]
+
+    try:
+        for setup in setups:
+            process = start_server(setup, port)
+            try:
+                durations, errors, total = load(port, usernames, seconds, reads)
+                print(f"{setup}: {resident_memory_mb(process.pid):.0f} MB resident")
+                for name, values in durations.items():
+                    report(f"  {name}", values, total)
+                for error, count in errors.items():
+                    print(f"  {count} x {error}")
+            finally:
+                process.terminate()
+                process.wait()
+    finally:
+        for user in users:
+            user.delete()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--setup", action="append")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--seconds", type=int, default=30)
+    parser.add_argument(
+        "--reads", type=int, default=4, help="Most user reads per login."
+    )
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    setup_django()
+    run(args.setup or ["default"], args.clients, args.seconds, args.reads, args.port)
+
+
+if __name__ == "__main__":
+    main()
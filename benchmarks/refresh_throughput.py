@@ -0,0 +1,68 @@
+"""
+Refresh throughput benchmark.
+
+Compares what clients had to do before the refresh route existed (log in
+again: a full password check plus a new token pair) with a rotating refresh
+through /api/v1/auth/token/refresh, with and without buffered token writes.
+
+    python -m benchmarks.refresh_throughput --requests 200
+"""
+
+import argparse
+import time
+
+from benchmarks.utils import measure, report, setup_django, test_database
+
+
+def run(requests):
+    from django.conf import settings
+    from django.contrib.auth import authenticate
+    from django.test import Client, override_settings
+
+    from core_apps.jwt.blacklist import token_write_buffer
+    from core_apps.jwt.tokens import RefreshToken
+    from core_apps.jwt.utils import jwt_encode
+    from core_apps.users.tests.factories import UserFactory
+
+    password = "benchmark-password"
+    user = UserFactory.create(password=password)
+
+    def login():
+        jwt_encode(authenticate(username=user.username, password=password))
+
+    report("re-login (before)", measure(login, requests))
+
+    for buffered in (False, True):
+        client = Client()
+        client.cookies[settings.JWT_AUTH_REFRESH_COOKIE] = str(
+            RefreshToken.for_user(user)
+        )
+
+        def refresh():
+            response = client.post("/api/v1/auth/token/refresh")
+            assert response.status_code == 200, response.content
+
+        with override_settings(JWT_BUFFER_TOKEN_WRITES=buffered):
+            start = time.perf_counter()
+            durations = measure(refresh, requests)
+            token_write_buffer.flush()
+            total = time.perf_counter() - start
+
+        label = (
+            "refresh, buffered writes" if buffered else "refresh, per-request writes"
+        )
+        report(label, durations, total)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        run(args.requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Login response serialization benchmark.
+
+Measures the time spent turning a login payload into response bytes with the
+DRF serializers and `JSONRenderer`, and with the compiled serializer from
+core_apps.jwt.compiled. Both paths are checked to produce the same bytes
+first. No database is needed:
+
+    python -m benchmarks.response_serializers --iterations 20000
+"""
+
+import argparse
+
+from benchmarks.utils import measure, report, setup_django
+
+
+def run(iterations):
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+    from rest_framework.renderers import JSONRenderer
+
+    from core_apps.jwt.app_settings import jwt_app_settings
+    from core_apps.jwt.compiled import compile_jwt_serializer, render_json
+
+    user = get_user_model()(
+        pk=1, username="benchmark", email="bench@example.com", first_name="Bench"
+    )
+    renderer = JSONRenderer()
+
+    for label, serializer_class in (
+        ("login", jwt_app_settings.JWT_SERIALIZER),
+        ("login with expiration", jwt_app_settings.JWT_SERIALIZER_WITH_EXPIRATION),
+    ):
+        payload = {
+            "user": user,
+            "access": "a" * 250,
+            "refresh": "r" * 250,
+            "access_expiration": timezone.now(),
+            "refresh_expiration": timezone.now(),
+        }
+        compiled = compile_jwt_serializer(
+            serializer_class, jwt_app_settings.USER_DETAILS_SERIALIZER
+        )
+
+        def drf():
+            return renderer.render(serializer_class(payload).data)
+
+        def fast():
+            return render_json(compiled(payload))
+
+        assert drf() == fast()
+        report(f"{label}, DRF", measure(drf, iterations))
+        report(f"{label}, compiled", measure(fast, iterations))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    setup_django()
+    run(args.iterations)
+
+
+if __name__ == "__main__":
+    main()
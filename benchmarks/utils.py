@@ -0,0 +1,67 @@
+"""
+Helpers shared by the benchmark scripts in this package.
+
+Benchmarks run against a throwaway test database created from the configured
+DATABASE_URL, so they can be pointed at the local docker Postgres:
+
+    docker compose -f local.yml run --rm api python -m benchmarks.<name>
+"""
+
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+
+def setup_django(settings_module="mentoreed.settings.local"):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    from django.db import connection
+    from django.test.utils import (
+        setup_test_environment,
+        teardown_test_environment,
+    )
+
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(func, iterations):
+    """
+    Calls `func` `iterations` times and returns the duration of each call.
+    """
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def percentile(durations, pct):
+    ordered = sorted(durations)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def report(label, durations, total=None):
+    total = total if total is not None else sum(durations)
+    print(
+        f"{label:<32} {len(durations) / total:>10.1f}/s"
+        f"  p50 {percentile(durations, 50) * 1000:>8.2f} ms"
+        f"  p99 {percentile(durations, 99) * 1000:>8.2f} ms"
+        f"  mean {statistics.fmean(durations) * 1000:>8.2f} ms"
+    )
@@ -0,0 +1,19 @@
+import pytest
+from django.core.cache import caches
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """
+    Empties every cache alias, and the per-process tiers in front of them,
+    after each test.
+    """
+    yield
+    from core_apps.common.cache import cache_aside
+    from core_apps.users.cache import permission_cache, user_cache
+
+    for cache in caches.all():
+        cache.clear()
+    cache_aside.clear_local()
+    permission_cache.clear_local()
+    user_cache.clear_local()
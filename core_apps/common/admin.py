@@ -0,0 +1,112 @@
+"""
+Changelist helpers for admin pages of large tables.
+
+`EstimatedCountPaginator` counts with the planner's estimates instead of
+`COUNT(*)` once a table outgrows ADMIN_ESTIMATED_COUNT_THRESHOLD rows, and
+`KeysetChangeList` pages through the default ordering with a cursor
+(`?after=<key>`) instead of OFFSET, so the last page costs what the first
+does. A ModelAdmin opts in with:
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    keyset_field = "username"  # a unique field
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+"""
+
+from django.conf import settings
+from django.contrib.admin.views.main import ORDER_VAR, PAGE_VAR, ChangeList
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+CURSOR_VAR = "after"
+
+
+def estimated_count(queryset, threshold):
+    """
+    Returns the number of rows of `queryset` as estimated by PostgreSQL, or
+    None when its table has fewer than `threshold` rows, or on other
+    databases, where the caller should count them.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+            [connection.ops.quote_name(queryset.model._meta.db_table)],
+        )
+        row = cursor.fetchone()
+        # reltuples is -1 until the table is first analyzed.
+        if row is None or row[0] < threshold:
+            return None
+        if not queryset.query.where:
+            return int(row[0])
+        sql, params = queryset.order_by().query.sql_with_params()
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        (plan,) = cursor.fetchone()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    estimated = False
+
+    @cached_property
+    def count(self):
+        estimate = estimated_count(
+            self.object_list, settings.ADMIN_ESTIMATED_COUNT_THRESHOLD
+        )
+        self.estimated = estimate is not None
+        return super().count if estimate is None else estimate
+
+
+class KeysetChangeList(ChangeList):
+    """
+    ChangeList that shows the rows after the `after` cursor, in the order of
+    the model admin's `keyset_field`, and links to the next page by the key
+    of its last row. When the user sorts by another column, or asks for all
+    rows, it pages with OFFSET like ChangeList.
+    """
+
+    keyset_template_name = "common/pagination_keyset.html"
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_results(self, request):
+        # Links to other filters, orderings or searches start from the top.
+        self.params.pop(CURSOR_VAR, None)
+        self.filter_params.pop(CURSOR_VAR, None)
+        self.keyset = ORDER_VAR not in self.params and not self.show_all
+        if not self.keyset:
+            return super().get_results(request)
+
+        field = self.model_admin.keyset_field
+        paginator = self.model_admin.get_paginator(
+            request, self.queryset, self.list_per_page
+        )
+        paginator.template_name = self.keyset_template_name
+        queryset = self.queryset.order_by(field)
+        self.cursor = request.GET.get(CURSOR_VAR)
+        if self.cursor is not None:
+            queryset = queryset.filter(**{f"{field}__gt": self.cursor})
+        # One row more than a page tells whether there is a next page.
+        rows = list(queryset[: self.list_per_page + 1])
+        self.has_next = len(rows) > self.list_per_page
+        self.result_list = rows[: self.list_per_page]
+        self.next_url = self.has_next and self.get_query_string(
+            {CURSOR_VAR: getattr(self.result_list[-1], field)}, remove=[PAGE_VAR]
+        )
+        self.first_url = self.get_query_string(remove=[CURSOR_VAR, PAGE_VAR])
+
+        self.result_count = paginator.count
+        self.show_full_result_count = False
+        self.full_result_count = None
+        self.show_admin_actions = True
+        self.can_show_all = False
+        self.multi_page = self.has_next or self.cursor is not None
+        self.paginator = paginator
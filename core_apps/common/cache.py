@@ -0,0 +1,282 @@
+"""
+The Redis cache backend and cache-aside helpers for read endpoints.
+
+`cached_view` and `cached_queryset` read through `cache_aside`: a
+per-process LRU in front of the default cache alias (Redis).
+"""
+
+import hashlib
+import logging
+import math
+import pickle
+import random
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache, RedisCacheClient
+from django.core.exceptions import EmptyResultSet
+from django.http import HttpResponse, HttpResponseBase
+from redis import RedisError
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+
+def fail_soft(default):
+    def decorator(method):
+        @wraps(method)
+        def wrapped(self, *args, **kwargs):
+            try:
+                return method(self, *args, **kwargs)
+            except RedisError:
+                logger.warning("Cache backend is unavailable", exc_info=True)
+                return default
+
+        return wrapped
+
+    return decorator
+
+
+class FailSoftRedisCacheClient(RedisCacheClient):
+    def get(self, key, default):
+        try:
+            return super().get(key, default)
+        except RedisError:
+            logger.warning("Cache backend is unavailable", exc_info=True)
+            return default
+
+    get_many = fail_soft({})(RedisCacheClient.get_many)
+    has_key = fail_soft(False)(RedisCacheClient.has_key)
+    set = fail_soft(None)(RedisCacheClient.set)
+    set_many = fail_soft(None)(RedisCacheClient.set_many)
+    add = fail_soft(False)(RedisCacheClient.add)
+    touch = fail_soft(False)(RedisCacheClient.touch)
+    delete = fail_soft(False)(RedisCacheClient.delete)
+    delete_many = fail_soft(None)(RedisCacheClient.delete_many)
+    clear = fail_soft(False)(RedisCacheClient.clear)
+
+
+class FailSoftRedisCache(RedisCache):
+    """
+    RedisCache that reads as a miss and drops writes while Redis is
+    unavailable, instead of failing the request. `incr` and `decr` still
+    raise, since callers cannot tell a made-up value from a real one.
+    """
+
+    def __init__(self, server, params):
+        super().__init__(server, params)
+        self._class = FailSoftRedisCacheClient
+
+
+class Uncacheable(Exception):
+    """
+    Raised by a `get_or_set` compute function to return a value without
+    caching it.
+    """
+
+    def __init__(self, value):
+        self.value = value
+
+
+class CacheAside:
+    """
+    Cache-aside reads with two tiers: a per-process LRU bounded by
+    `max_size`, whose entries live for `local_ttl` seconds, in front of the
+    shared cache `alias`.
+
+    Each entry records how long it took to compute. A reader recomputes it
+    early with a probability that grows as its expiry nears, so a popular key
+    is refreshed by one request ahead of time instead of expiring for every
+    worker at once; threads of one process computing the same key wait for
+    the first. Shared keys carry CACHE_DEPLOY_VERSION, so values written by
+    an older release are never read back.
+
+    Values are stored pickled, also in the local tier, so callers never share
+    a mutable object.
+    """
+
+    # Higher values recompute earlier.
+    beta = 1.0
+
+    def __init__(self, alias, max_size, local_ttl):
+        self.alias = alias
+        self.max_size = max_size
+        self.local_ttl = local_ttl
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = [threading.Lock() for _ in range(64)]
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    @property
+    def version(self):
+        return settings.CACHE_DEPLOY_VERSION
+
+    def get_or_set(self, key, compute, timeout):
+        """
+        Returns the cached value of `key`, calling `compute` and caching its
+        result for `timeout` seconds when there is none or it is due for
+        recomputation.
+        """
+        entry = self.get_entry(key)
+        if entry is not None and not self.recompute_early(entry):
+            return pickle.loads(entry[0])
+
+        with self._key_locks[hash(key) % len(self._key_locks)]:
+            latest = self.get_entry(key)
+            if latest is not None and latest is not entry:
+                # Another thread computed it while this one waited.
+                return pickle.loads(latest[0])
+
+            start = time.monotonic()
+            try:
+                value = compute()
+            except Uncacheable as e:
+                return e.value
+            entry = (
+                pickle.dumps(value, pickle.HIGHEST_PROTOCOL),
+                time.monotonic() - start,
+                time.time() + timeout,
+            )
+            self.shared.set(key, entry, timeout=timeout, version=self.version)
+            self.set_local(key, entry)
+        return value
+
+    def delete(self, key):
+        with self._lock:
+            self._local.pop(key, None)
+        self.shared.delete(key, version=self.version)
+
+    def clear_local(self):
+        with self._lock:
+            self._local.clear()
+
+    def get_entry(self, key):
+        # (pickled value, seconds taken to compute it, expiry timestamp)
+        with self._lock:
+            local = self._local.get(key)
+            if local is not None:
+                expires_at, entry = local
+                if expires_at >= time.monotonic():
+                    self._local.move_to_end(key)
+                    return entry
+                del self._local[key]
+
+        entry = self.shared.get(key, version=self.version)
+        if entry is not None:
+            self.set_local(key, entry)
+        return entry
+
+    def set_local(self, key, entry):
+        with self._lock:
+            self._local[key] = (time.monotonic() + self.local_ttl, entry)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_size:
+                self._local.popitem(last=False)
+
+    def recompute_early(self, entry):
+        _, delta, expires_at = entry
+        # 1 - random() is in (0, 1], so the logarithm is defined.
+        early = delta * self.beta * -math.log(1 - random.random())
+        return time.time() + early >= expires_at
+
+
+cache_aside = CacheAside(
+    alias=settings.CACHE_ASIDE_ALIAS,
+    max_size=settings.CACHE_ASIDE_MAX_SIZE,
+    local_ttl=settings.CACHE_ASIDE_LOCAL_TTL,
+)
+
+
+def hashed(value):
+    return hashlib.md5(value.encode(), usedforsecurity=False).hexdigest()
+
+
+def cached_queryset(queryset, timeout=None, key=None):
+    """
+    Returns the rows of `queryset` as a list, read through `cache_aside`.
+
+    The key defaults to the model and the SQL of the query, so the same
+    filters share an entry. Pass `key` to be able to delete it from
+    `cache_aside` when the rows change; otherwise they are served for up to
+    `timeout` seconds.
+    """
+    if key is None:
+        try:
+            sql, params = queryset.query.sql_with_params()
+        except EmptyResultSet:
+            return []
+        key = (
+            f"queryset:{queryset.model._meta.label_lower}:{hashed(sql + repr(params))}"
+        )
+    # A clone, so a recomputation never reuses the queryset's result cache.
+    return cache_aside.get_or_set(
+        key, lambda: list(queryset.all()), timeout or settings.CACHE_ASIDE_TIMEOUT
+    )
+
+
+def freeze_response(response):
+    if response.status_code != 200:
+        raise Uncacheable(response)
+    if isinstance(response, Response) and not response.is_rendered:
+        # Kept as data: DRF still negotiates the renderer of every response.
+        headers = {
+            name: value
+            for name, value in response.items()
+            if name.lower() != "content-type"
+        }
+        return ("data", response.data, headers)
+    if hasattr(response, "render"):
+        response.render()
+    return ("content", response.content, dict(response.items()))
+
+
+def thaw_response(frozen):
+    kind, body, headers = frozen
+    if kind == "data":
+        return Response(body, headers=headers)
+    response = HttpResponse(body)
+    for name, value in headers.items():
+        response[name] = value
+    return response
+
+
+def cached_view(timeout=None, per_user=False, key_prefix=None):
+    """
+    Caches the 200 responses of a read endpoint for `timeout` seconds, keyed
+    on the path and query string, and on the user with `per_user` (anonymous
+    requests are then not cached). Decorates a view function, or an APIView
+    `get` through `method_decorator`, where DRF has authenticated the user.
+    """
+
+    def decorator(view):
+        prefix = key_prefix or f"{view.__module__}.{view.__qualname__}"
+
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+            key = f"view:{prefix}:{hashed(request.get_full_path())}"
+            if per_user:
+                if not request.user.is_authenticated:
+                    return view(request, *args, **kwargs)
+                key = f"{key}:{request.user.pk}"
+
+            frozen = cache_aside.get_or_set(
+                key,
+                lambda: freeze_response(view(request, *args, **kwargs)),
+                timeout or settings.CACHE_ASIDE_TIMEOUT,
+            )
+            if isinstance(frozen, HttpResponseBase):
+                return frozen  # not cacheable, returned as is
+            return thaw_response(frozen)
+
+        return wrapped
+
+    return decorator
@@ -0,0 +1,28 @@
+from django.core.cache import caches
+from django.db import connections
+
+
+def close_connections():
+    """
+    Closes the database connections and pools and the Redis connections of
+    this process.
+
+    Gunicorn calls it in the master before forking each worker, so a worker
+    never inherits a socket that its parent (with preload_app) opened while
+    importing the app, and again in the worker after the fork.
+    """
+    from core_apps.jwt.throttling import RedisScopedRateThrottle
+
+    for connection in connections.all(initialized_only=True):
+        connection.close()
+        # Only pools already opened; reading `connection.pool` creates one.
+        if connection.alias in getattr(type(connection), "_connection_pools", {}):
+            connection.close_pool()
+
+    for cache in caches.all(initialized_only=True):
+        # django.core.cache.backends.redis keeps a connection pool per server.
+        for pool in getattr(getattr(cache, "_cache", None), "_pools", {}).values():
+            pool.disconnect()
+        cache.close()
+
+    RedisScopedRateThrottle.close()
@@ -0,0 +1,73 @@
+"""
+Measures what a process imports on boot, from `python -X importtime`.
+"""
+
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+# What each kind of process imports before it can serve anything.
+TARGETS = {
+    "setup": "import django; django.setup()",
+    "wsgi": (
+        "import mentoreed.wsgi; "
+        "from django.urls import get_resolver; get_resolver().url_patterns"
+    ),
+    "asgi": (
+        "import mentoreed.asgi; "
+        "from django.urls import get_resolver; get_resolver().url_patterns"
+    ),
+    "celery": "from mentoreed.celery import app; app.loader.import_default_modules()",
+}
+
+
+def parse_importtime(output):
+    """
+    Returns `(module, self_us, cumulative_us, depth)` for each line of
+    `-X importtime` output, depth 0 being imported by the target itself.
+    """
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line.split(":", 1)[1].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header line
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        depth = (len(name) - len(stripped) - 1) // 2
+        modules.append(
+            (stripped, int(fields[0].strip()), int(fields[1].strip()), depth)
+        )
+    return modules
+
+
+def by_package(modules):
+    """
+    Returns the import time of each top-level package, summed over its
+    modules, most expensive first.
+    """
+    totals = defaultdict(int)
+    for name, self_us, _, _ in modules:
+        totals[name.split(".", 1)[0]] += self_us
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def measure_imports(target, role, settings_module=None):
+    """
+    Boots a fresh interpreter as `target` with `DJANGO_ROLE=role` and returns
+    the parsed import times.
+    """
+    env = dict(os.environ, DJANGO_ROLE=role)
+    if settings_module:
+        env["DJANGO_SETTINGS_MODULE"] = settings_module
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", TARGETS[target]],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return parse_importtime(result.stderr)
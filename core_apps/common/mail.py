@@ -0,0 +1,223 @@
+"""
+Batched email delivery through celery.
+
+`BatchingEmailBackend` is the EMAIL_BACKEND of the web processes: it enqueues
+messages in chunks of EMAIL_BATCH_SIZE instead of one task per message. The
+celery task (core_apps.common.tasks.send_email_batch) delivers each chunk
+through `smtp_pool`, which keeps the SMTP sessions of a worker process open
+between tasks, so a burst of emails costs one TLS handshake per worker
+instead of one per message.
+"""
+
+import atexit
+import logging
+import smtplib
+import threading
+import time
+
+# Loads the CELERY_EMAIL_* defaults that djcelery_email.utils reads.
+import djcelery_email.conf  # noqa: F401
+from django.conf import settings
+from django.core.cache import caches
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from djcelery_email.utils import chunked, dict_to_email, email_to_dict
+
+logger = logging.getLogger(__name__)
+
+
+class BatchingEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        from .tasks import send_email_batch
+
+        if not email_messages:
+            return 0
+        for chunk in chunked(email_messages, settings.EMAIL_BATCH_SIZE):
+            try:
+                send_email_batch.delay([email_to_dict(message) for message in chunk])
+            except Exception:
+                if not self.fail_silently:
+                    raise
+                return 0
+        return len(email_messages)
+
+
+class MailStats:
+    """
+    Delivery counters of the current process, added to totals in the shared
+    cache `alias` after every batch so `manage.py mail_stats` can report
+    them for all workers. Time spent delivering is counted in milliseconds,
+    since the cache only increments integers.
+    """
+
+    names = (
+        "batches",
+        "sent",
+        "failed",
+        "retried",
+        "dropped",
+        "connections",
+        "milliseconds",
+    )
+
+    def __init__(self, alias):
+        self.alias = alias
+        self._counters = dict.fromkeys(self.names, 0)
+        self._published = dict(self._counters)
+        self._lock = threading.Lock()
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    @staticmethod
+    def key(name):
+        return f"stats:mail:{name}"
+
+    def count(self, name, value=1):
+        with self._lock:
+            self._counters[name] += value
+
+    def record_batch(self, sent, failed, seconds):
+        with self._lock:
+            self._counters["batches"] += 1
+            self._counters["sent"] += sent
+            self._counters["failed"] += failed
+            self._counters["milliseconds"] += round(seconds * 1000)
+            deltas = {
+                name: value - self._published[name]
+                for name, value in self._counters.items()
+            }
+            self._published = dict(self._counters)
+        self._publish(deltas)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def shared_stats(self):
+        """
+        Returns the counters summed over every process, or an empty dict if
+        the shared cache is unavailable.
+        """
+        keys = [self.key(name) for name in self.names]
+        try:
+            values = self.shared.get_many(keys)
+        except Exception:
+            return {}
+        return {name: values.get(self.key(name), 0) for name in self.names}
+
+    def _publish(self, deltas):
+        for name, delta in deltas.items():
+            if not delta:
+                continue
+            key = self.key(name)
+            try:
+                self.shared.add(key, 0, timeout=None)
+                self.shared.incr(key, delta)
+            except Exception:
+                return
+
+
+class SMTPConnectionPool:
+    """
+    Open connections of the `backend` email backend, reused by the tasks of a
+    worker process. At most `max_size` connections are kept idle, each for
+    up to `max_idle` seconds, since SMTP servers drop idle sessions.
+    """
+
+    def __init__(self, backend, max_size, max_idle, stats):
+        self.backend = backend
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.stats = stats
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Returns an open connection and whether it was reused.
+        """
+        now = time.monotonic()
+        with self._lock:
+            while self._idle:
+                released_at, connection = self._idle.pop()
+                if now - released_at < self.max_idle:
+                    return connection, True
+                self._close(connection)
+
+        connection = get_connection(self.backend, fail_silently=False)
+        connection.open()
+        self.stats.count("connections")
+        return connection, False
+
+    def release(self, connection):
+        with self._lock:
+            if len(self._idle) < self.max_size:
+                self._idle.append((time.monotonic(), connection))
+                return
+        self._close(connection)
+
+    def discard(self, connection):
+        self._close(connection)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for _, connection in idle:
+            self._close(connection)
+
+    def deliver(self, messages):
+        """
+        Sends the serialized `messages` one by one over a pooled connection
+        and returns those that could not be sent.
+        """
+        failed = []
+        connection = None
+        for index, message in enumerate(messages):
+            try:
+                if connection is None:
+                    connection, reused = self.acquire()
+                try:
+                    connection.send_messages([dict_to_email(message)])
+                except smtplib.SMTPServerDisconnected:
+                    if not reused:
+                        raise
+                    # The server closed the idle session; retry on a new one.
+                    self.discard(connection)
+                    connection = None
+                    connection, reused = self.acquire()
+                    connection.send_messages([dict_to_email(message)])
+                reused = False
+            except Exception:
+                logger.warning(
+                    "Could not send email to %r", message["to"], exc_info=True
+                )
+                if connection is None:
+                    # Could not connect: the rest of the batch would fail too.
+                    failed.extend(messages[index:])
+                    break
+                failed.append(message)
+                self.discard(connection)
+                connection = None
+
+        if connection is not None:
+            self.release(connection)
+        return failed
+
+    @staticmethod
+    def _close(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+mail_stats = MailStats(alias=settings.EMAIL_STATS_ALIAS)
+smtp_pool = SMTPConnectionPool(
+    backend=settings.EMAIL_DELIVERY_BACKEND,
+    max_size=settings.EMAIL_SMTP_POOL_SIZE,
+    max_idle=settings.EMAIL_SMTP_MAX_IDLE,
+    stats=mail_stats,
+)
+atexit.register(smtp_pool.close)
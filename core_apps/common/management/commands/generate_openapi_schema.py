@@ -0,0 +1,36 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core_apps.common.schema import generate_schema
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates the OpenAPI schema served to /redoc/ and writes it to "
+        "OPENAPI_SCHEMA_FILE, so API workers do not build it on requests."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            default=settings.OPENAPI_SCHEMA_FILE,
+            help="Defaults to OPENAPI_SCHEMA_FILE.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["output"]
+        if not path:
+            raise CommandError("OPENAPI_SCHEMA_FILE is not set, pass --output.")
+
+        content = generate_schema()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Written next to the target and renamed, so a running worker never
+        # reads a partial file.
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+        self.stdout.write(f"Wrote {len(content)} bytes to {path}")
@@ -0,0 +1,45 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core_apps.common.importtime import TARGETS, by_package, measure_imports
+
+
+class Command(BaseCommand):
+    help = (
+        "Boots a fresh interpreter per DJANGO_ROLE with python -X importtime "
+        "and reports the total import time and the most expensive packages."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--role",
+            action="append",
+            choices=list(settings.ROLE_APPS),
+            help="Role to measure; repeat for several. Defaults to all of them.",
+        )
+        parser.add_argument("--target", choices=TARGETS, default="wsgi")
+        parser.add_argument(
+            "--limit", type=int, default=15, help="Packages listed per role."
+        )
+
+    def handle(self, *args, **options):
+        roles = options["role"] or list(settings.ROLE_APPS)
+        settings_module = os.environ.get("DJANGO_SETTINGS_MODULE")
+
+        for role in roles:
+            try:
+                modules = measure_imports(options["target"], role, settings_module)
+            except RuntimeError as e:
+                raise CommandError(f"{role} failed to boot: {e}")
+
+            total = sum(self_us for _, self_us, _, _ in modules)
+            self.stdout.write(
+                f"{role}: {len(modules)} modules imported in {total / 1000:.1f} ms"
+            )
+            for package, self_us in by_package(modules)[: options["limit"]]:
+                self.stdout.write(
+                    f"  {package:<40} {self_us / 1000:>8.1f} ms"
+                    f" {self_us / total:>6.1%}"
+                )
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from core_apps.common.mail import mail_stats
+
+
+class Command(BaseCommand):
+    help = "Prints the email delivery counters published by all celery workers."
+
+    def handle(self, *args, **options):
+        stats = mail_stats.shared_stats()
+        if not stats:
+            self.stderr.write("The shared cache is unavailable.")
+            return
+
+        for name, value in stats.items():
+            self.stdout.write(f"{name}: {value}")
+        if stats["milliseconds"]:
+            rate = stats["sent"] / (stats["milliseconds"] / 1000)
+            self.stdout.write(f"messages_per_second: {rate:.1f}")
+        if stats["batches"]:
+            per_connection = stats["sent"] / max(1, stats["connections"])
+            self.stdout.write(f"messages_per_connection: {per_connection:.1f}")
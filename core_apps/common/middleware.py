@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.contrib.sessions.backends.base import SessionBase
+from django.contrib.sessions.middleware import (
+    SessionMiddleware as BaseSessionMiddleware,
+)
+
+
+class SessionlessStore(SessionBase):
+    """
+    An always empty session that is never loaded or saved, for requests that
+    authenticate with JWT only. Logging in or out on it changes nothing.
+    """
+
+    def load(self):
+        return {}
+
+    def exists(self, session_key):
+        return False
+
+    def create(self):
+        self._session_key = None
+        self.modified = False
+
+    def save(self, must_create=False):
+        self.modified = False
+
+    def delete(self, session_key=None):
+        pass
+
+    @classmethod
+    def clear_expired(cls):
+        pass
+
+
+class SessionMiddleware(BaseSessionMiddleware):
+    """
+    Django's session middleware, skipped for paths under
+    SESSIONLESS_PATH_PREFIXES: those requests get a `SessionlessStore`, so
+    they never read or write the session store or send a session cookie.
+    """
+
+    def is_sessionless(self, request):
+        return request.path_info.startswith(tuple(settings.SESSIONLESS_PATH_PREFIXES))
+
+    def process_request(self, request):
+        if self.is_sessionless(request):
+            # Middleware further down (auth, messages) expects a session.
+            request.session = SessionlessStore()
+        else:
+            super().process_request(request)
+
+    def process_response(self, request, response):
+        if isinstance(getattr(request, "session", None), SessionlessStore):
+            return response
+        return super().process_response(request, response)
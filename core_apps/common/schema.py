@@ -0,0 +1,93 @@
+"""
+The OpenAPI schema of the API, generated once instead of on every request.
+
+`generate_openapi_schema` writes the schema to `OPENAPI_SCHEMA_FILE` at
+build time; `openapi_schema` serves that file, or generates the schema the
+first time it is asked for when there is no file, and keeps it in memory
+together with its gzipped copy and ETag.
+"""
+
+import gzip
+import hashlib
+import logging
+import threading
+
+from django.conf import settings
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+
+logger = logging.getLogger(__name__)
+
+info = openapi.Info(
+    title="Mentoreed API",
+    default_version="v1",
+    description="Mentoreed API documentation",
+    contact=openapi.Contact(email="whatever@whatever.com"),
+    license=openapi.License(name="MIT License"),
+)
+
+schema_view = get_schema_view(
+    info,
+    public=True,
+    permission_classes=(permissions.AllowAny,),
+)
+
+
+def generate_schema():
+    """
+    Returns the OpenAPI schema of all public endpoints as JSON bytes.
+    """
+    generator = schema_view.generator_class(info)
+    schema = generator.get_schema(request=None, public=True)
+    return OpenAPICodecJson(validators=[]).encode(schema)
+
+
+class SchemaArtifact:
+    """
+    Schema bytes with their gzipped copy and the ETag of each.
+    """
+
+    def __init__(self, content):
+        self.content = content
+        self.compressed = gzip.compress(content, mtime=0)
+        digest = hashlib.sha256(content).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+        self.compressed_etag = f'"{digest}-gzip"'
+
+
+class OpenAPISchema:
+    """
+    The schema served to ReDoc, loaded once per process.
+    """
+
+    def __init__(self):
+        self._artifact = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self._artifact is None:
+            with self._lock:
+                if self._artifact is None:
+                    self._artifact = SchemaArtifact(self.load())
+        return self._artifact
+
+    def load(self):
+        path = settings.OPENAPI_SCHEMA_FILE
+        if path:
+            try:
+                with open(path, "rb") as f:
+                    return f.read()
+            except FileNotFoundError:
+                logger.warning(
+                    "%s is missing, generating the OpenAPI schema in process", path
+                )
+        return generate_schema()
+
+    def clear(self):
+        with self._lock:
+            self._artifact = None
+
+
+openapi_schema = OpenAPISchema()
@@ -0,0 +1,49 @@
+import logging
+import random
+import time
+
+from celery import shared_task
+from django.conf import settings
+
+from .mail import mail_stats, smtp_pool
+
+logger = logging.getLogger(__name__)
+
+
+def retry_delay(attempt):
+    """
+    Seconds before retry number `attempt` (from 1): exponential backoff from
+    EMAIL_RETRY_BACKOFF, with jitter so failed messages do not all come back
+    at once.
+    """
+    return settings.EMAIL_RETRY_BACKOFF * 2 ** (attempt - 1) * random.uniform(0.5, 1)
+
+
+@shared_task(ignore_result=True)
+def send_email_batch(messages, attempt=0):
+    """
+    Delivers a chunk of messages serialized by `BatchingEmailBackend` over a
+    pooled SMTP connection. Each message that fails is retried on its own,
+    up to EMAIL_MAX_RETRIES times.
+    """
+    start = time.monotonic()
+    failed = smtp_pool.deliver(messages)
+
+    if failed and attempt < settings.EMAIL_MAX_RETRIES:
+        for message in failed:
+            send_email_batch.apply_async(
+                ([message], attempt + 1), countdown=retry_delay(attempt + 1)
+            )
+        mail_stats.count("retried", len(failed))
+    elif failed:
+        for message in failed:
+            logger.error(
+                "Giving up on email to %r after %d attempts", message["to"], attempt + 1
+            )
+        mail_stats.count("dropped", len(failed))
+
+    mail_stats.record_batch(
+        sent=len(messages) - len(failed),
+        failed=len(failed),
+        seconds=time.monotonic() - start,
+    )
@@ -0,0 +1,135 @@
+import time
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.utils.decorators import method_decorator
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
+
+from core_apps.common.cache import cache_aside, cached_queryset, cached_view
+from core_apps.users.tests.factories import UserFactory
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+def test_cached_queryset_reads_through_cache(django_assert_num_queries):
+    """
+    Test that a cached queryset is read from the database once.
+    """
+
+    UserFactory.create_batch(2)
+    queryset = User.objects.order_by("pk")
+
+    with django_assert_num_queries(1):
+        first = cached_queryset(queryset)
+        second = cached_queryset(queryset)
+
+    assert [user.pk for user in first] == [user.pk for user in second]
+    assert first[0] is not second[0]
+
+
+@pytest.mark.django_db
+def test_deploy_version_starts_an_empty_cache(django_assert_num_queries):
+    """
+    Test that entries written by another release are not read back.
+    """
+
+    queryset = User.objects.all()
+    cached_queryset(queryset)
+    cache_aside.clear_local()
+
+    with override_settings(CACHE_DEPLOY_VERSION="next"):
+        with django_assert_num_queries(1):
+            cached_queryset(queryset)
+
+
+def test_entries_are_recomputed_before_they_expire():
+    """
+    Test that an entry close to its expiry is recomputed early.
+    """
+
+    fresh = (b"", 0.01, time.time() + 60)
+    expiring = (b"", 10.0, time.time() + 0.001)
+
+    assert not cache_aside.recompute_early(fresh)
+    assert cache_aside.recompute_early(expiring)
+
+
+def test_cached_view_caches_successful_responses():
+    """
+    Test that a cached view runs once per URL and does not cache errors.
+    """
+
+    calls = []
+
+    @cached_view(timeout=60)
+    def view(request):
+        calls.append(request.get_full_path())
+        status = 404 if "missing" in request.GET else 200
+        return HttpResponse(f"page {len(calls)}", status=status)
+
+    factory = RequestFactory()
+    first = view(factory.get("/items?page=1"))
+    second = view(factory.get("/items?page=1"))
+    view(factory.get("/items?missing=1"))
+    missing = view(factory.get("/items?missing=1"))
+
+    assert first.content == second.content == b"page 1"
+    assert missing.status_code == 404
+    assert calls == ["/items?page=1", "/items?missing=1", "/items?missing=1"]
+
+
+@pytest.mark.django_db
+def test_cached_view_per_user():
+    """
+    Test that per-user entries are not shared and DRF responses stay negotiable.
+    """
+
+    class ProfileView(APIView):
+        permission_classes = []
+        calls = 0
+
+        @method_decorator(cached_view(timeout=60, per_user=True))
+        def get(self, request):
+            ProfileView.calls += 1
+            return Response({"pk": request.user.pk})
+
+    first, second = UserFactory.create_batch(2)
+    factory = APIRequestFactory()
+
+    def get(user):
+        request = factory.get("/profile")
+        force_authenticate(request, user=user)
+        response = ProfileView.as_view()(request)
+        response.render()
+        return response
+
+    assert get(first).data == get(first).data == {"pk": first.pk}
+    assert get(second).data == {"pk": second.pk}
+    assert get(first)["Content-Type"] == "application/json"
+    assert ProfileView.calls == 2
+
+
+def test_unavailable_redis_reads_as_miss():
+    """
+    Test that the default backend does not fail requests while Redis is down.
+    """
+
+    with override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "core_apps.common.cache.FailSoftRedisCache",
+                "LOCATION": "redis://127.0.0.1:1/0",
+            }
+        }
+    ):
+        cache = caches["default"]
+        cache.set("key", "value")
+
+        assert cache.get("key", "default") == "default"
+        assert cache.add("key", "value") is False
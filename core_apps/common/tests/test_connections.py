@@ -0,0 +1,18 @@
+from core_apps.common.connections import close_connections
+from core_apps.jwt.throttling import RedisScopedRateThrottle
+
+
+def test_close_connections_drops_redis_clients(settings):
+    """
+    Test that a forked worker starts with new Redis clients.
+    """
+
+    # Building the client does not connect.
+    settings.THROTTLE_REDIS_URL = "redis://redis:6379/1"
+    RedisScopedRateThrottle.get_script()
+    assert RedisScopedRateThrottle._client is not None
+
+    close_connections()
+
+    assert RedisScopedRateThrottle._client is None
+    assert RedisScopedRateThrottle._script is None
@@ -0,0 +1,45 @@
+import pytest
+
+from core_apps.common.importtime import (
+    by_package,
+    measure_imports,
+    parse_importtime,
+)
+
+IMPORTTIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        300 |     django.utils
+import time:       200 |        500 |   django.conf
+import time:        50 |        670 | django
+"""
+
+
+def test_parse_importtime():
+    """
+    Test that -X importtime lines are parsed with their nesting depth.
+    """
+
+    modules = parse_importtime(IMPORTTIME_OUTPUT)
+
+    assert modules == [
+        ("_io", 120, 120, 1),
+        ("django.utils", 300, 300, 2),
+        ("django.conf", 200, 500, 1),
+        ("django", 50, 670, 0),
+    ]
+    assert by_package(modules) == [("django", 550), ("_io", 120)]
+
+
+@pytest.mark.parametrize("role", ["api", "worker"])
+def test_role_does_not_import_admin_or_docs(role):
+    """
+    Test that API and worker processes boot without the admin site and API docs.
+    """
+
+    imported = {name for name, _, _, _ in measure_imports("wsgi", role)}
+
+    assert "core_apps.jwt.views" in imported
+    assert "unfold" not in imported
+    assert "drf_yasg" not in imported
+    assert "allauth.socialaccount.models" not in imported
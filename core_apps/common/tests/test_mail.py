@@ -0,0 +1,138 @@
+import socketserver
+import threading
+
+import pytest
+from django.core.mail import EmailMessage, get_connection
+from django.test import override_settings
+from djcelery_email.utils import email_to_dict
+
+from core_apps.common import tasks
+from core_apps.common.mail import mail_stats, smtp_pool
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply("220 stand-in ready")
+        for line in self.rfile:
+            command = line.decode().strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb == "EHLO":
+                self.reply("250 stand-in")
+            elif verb == "RCPT" and "reject" in command:
+                self.reply("550 mailbox unavailable")
+            elif verb == "DATA":
+                self.reply("354 end with .")
+                for data in self.rfile:
+                    if data == b".\r\n":
+                        break
+                self.server.messages += 1
+                self.reply("250 queued")
+            elif verb == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("250 ok")
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """
+    Just enough of an SMTP server, like the mailhog service of local.yml,
+    to count the sessions opened and the messages received.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+        self.connections = 0
+        self.messages = 0
+
+
+@pytest.fixture
+def smtp_server():
+    server = SMTPStandIn()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    with override_settings(
+        EMAIL_HOST="127.0.0.1", EMAIL_PORT=server.server_address[1], EMAIL_USE_TLS=False
+    ):
+        yield server
+        smtp_pool.close()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def enqueued(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        tasks.send_email_batch, "delay", lambda *args: calls.append(args)
+    )
+    monkeypatch.setattr(
+        tasks.send_email_batch,
+        "apply_async",
+        lambda args, countdown: calls.append((*args, countdown)),
+    )
+    return calls
+
+
+def serialized(*recipients):
+    return [email_to_dict(EmailMessage("Hello", "Hello", to=[to])) for to in recipients]
+
+
+@override_settings(
+    EMAIL_BACKEND="core_apps.common.mail.BatchingEmailBackend", EMAIL_BATCH_SIZE=10
+)
+def test_backend_enqueues_messages_in_chunks(enqueued):
+    """
+    Test that the backend enqueues one task per chunk of messages.
+    """
+
+    messages = [
+        EmailMessage("Hello", "Hello", to=[f"{i}@example.com"]) for i in range(25)
+    ]
+
+    assert get_connection().send_messages(messages) == 25
+    assert [len(chunk) for chunk, in enqueued] == [10, 10, 5]
+    assert enqueued[0][0][0]["to"] == ["0@example.com"]
+
+
+def test_batches_share_one_smtp_session(smtp_server, enqueued):
+    """
+    Test that consecutive batches of a worker are sent over the same session.
+    """
+
+    tasks.send_email_batch(serialized("a@example.com", "b@example.com"))
+    tasks.send_email_batch(serialized("c@example.com"))
+
+    assert smtp_server.messages == 3
+    assert smtp_server.connections == 1
+    assert enqueued == []
+
+
+def test_failed_messages_are_retried_alone(smtp_server, enqueued):
+    """
+    Test that only the rejected message is retried, after a backoff.
+    """
+
+    before = mail_stats.stats()
+    messages = serialized("a@example.com", "reject@example.com", "b@example.com")
+
+    with override_settings(EMAIL_RETRY_BACKOFF=10):
+        tasks.send_email_batch(messages)
+        tasks.send_email_batch([messages[1]], attempt=5)
+
+    ((retried, attempt, countdown),) = enqueued
+    assert retried == [messages[1]]
+    assert attempt == 1
+    assert 5 <= countdown <= 10
+    assert smtp_server.messages == 2
+
+    after = mail_stats.stats()
+    assert after["sent"] - before["sent"] == 2
+    assert after["retried"] - before["retried"] == 1
+    assert after["dropped"] - before["dropped"] == 1
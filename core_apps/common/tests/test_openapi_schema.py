@@ -0,0 +1,89 @@
+import gzip
+import json
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+
+from core_apps.common.schema import openapi_schema
+
+
+@pytest.fixture(autouse=True)
+def clear_openapi_schema():
+    openapi_schema.clear()
+    yield
+    openapi_schema.clear()
+
+
+def test_schema_is_generated_once_per_process(client, monkeypatch):
+    """
+    Test that without a schema file the schema is generated on the first request only.
+    """
+
+    calls = []
+
+    def generate_schema():
+        calls.append(1)
+        return b'{"paths": {}}'
+
+    monkeypatch.setattr("core_apps.common.schema.generate_schema", generate_schema)
+
+    first = client.get("/redoc/openapi.json")
+    second = client.get("/redoc/openapi.json")
+
+    assert first.status_code == second.status_code == 200
+    assert first.content == b'{"paths": {}}'
+    assert len(calls) == 1
+
+
+def test_generated_file_is_served(client, tmp_path):
+    """
+    Test that the schema written by generate_openapi_schema is served as is.
+    """
+
+    path = tmp_path / "openapi.json"
+    call_command("generate_openapi_schema", output=str(path))
+
+    with override_settings(OPENAPI_SCHEMA_FILE=str(path)):
+        response = client.get("/redoc/openapi.json")
+
+    assert response.status_code == 200
+    assert response.content == path.read_bytes()
+    assert "/api/v1/auth/login" in json.loads(response.content)["paths"]
+
+
+def test_schema_is_revalidated_with_etag(client):
+    """
+    Test that an unchanged schema is answered with 304 Not Modified.
+    """
+
+    response = client.get("/redoc/openapi.json")
+    cached = client.get("/redoc/openapi.json", HTTP_IF_NONE_MATCH=response["ETag"])
+
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+
+def test_schema_is_gzipped_when_accepted(client):
+    """
+    Test that clients accepting gzip get the compressed schema with its own ETag.
+    """
+
+    plain = client.get("/redoc/openapi.json")
+    compressed = client.get("/redoc/openapi.json", HTTP_ACCEPT_ENCODING="gzip, br")
+
+    assert compressed["Content-Encoding"] == "gzip"
+    assert gzip.decompress(compressed.content) == plain.content
+    assert compressed["ETag"] != plain["ETag"]
+    assert "Accept-Encoding" in compressed["Vary"]
+
+
+def test_redoc_page_loads_precomputed_schema(client):
+    """
+    Test that the ReDoc page points at the precomputed schema.
+    """
+
+    response = client.get("/redoc/", HTTP_ACCEPT="text/html")
+
+    assert response.status_code == 200
+    assert b"/redoc/openapi.json" in response.content
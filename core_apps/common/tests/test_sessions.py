@@ -0,0 +1,48 @@
+import pytest
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from core_apps.common.middleware import SessionlessStore, SessionMiddleware
+
+
+def writing_view(request):
+    request.session["visited"] = True
+    return HttpResponse()
+
+
+@pytest.fixture
+def middleware():
+    return SessionMiddleware(writing_view)
+
+
+def test_api_requests_do_not_use_the_session(middleware):
+    """
+    Test that API requests never load or save a session or set its cookie.
+    """
+
+    request = RequestFactory().get(
+        "/api/v1/auth/user", HTTP_COOKIE=f"{settings.SESSION_COOKIE_NAME}=abc"
+    )
+    response = middleware(request)
+
+    assert isinstance(request.session, SessionlessStore)
+    assert request.session.session_key is None
+    assert settings.SESSION_COOKIE_NAME not in response.cookies
+
+
+@pytest.mark.django_db
+@override_settings(SESSION_ENGINE="django.contrib.sessions.backends.db")
+def test_other_requests_use_the_session_engine():
+    """
+    Test that requests outside the API still get a saved session.
+    """
+
+    # The engine is imported when the middleware is created.
+    middleware = SessionMiddleware(writing_view)
+    request = RequestFactory().get("/admin/")
+    response = middleware(request)
+
+    assert isinstance(request.session, SessionStore)
+    assert SessionStore().exists(response.cookies[settings.SESSION_COOKIE_NAME].value)
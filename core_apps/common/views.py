@@ -0,0 +1,37 @@
+import re
+
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition, require_safe
+
+from .schema import openapi_schema
+
+accepts_gzip = re.compile(r"\bgzip\b")
+
+
+def wants_gzip(request):
+    return bool(accepts_gzip.search(request.headers.get("Accept-Encoding", "")))
+
+
+def schema_etag(request):
+    schema = openapi_schema.get()
+    return schema.compressed_etag if wants_gzip(request) else schema.etag
+
+
+@require_safe
+@condition(etag_func=schema_etag)
+def openapi_schema_view(request):
+    """
+    Serves the precomputed OpenAPI schema, gzipped when the client accepts
+    it. Clients revalidate with the ETag and get a 304 while it is unchanged.
+    """
+    schema = openapi_schema.get()
+    if wants_gzip(request):
+        response = HttpResponse(schema.compressed, content_type="application/json")
+        response["Content-Encoding"] = "gzip"
+    else:
+        response = HttpResponse(schema.content, content_type="application/json")
+
+    patch_vary_headers(response, ("Accept-Encoding",))
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
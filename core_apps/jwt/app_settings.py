@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from rest_framework.permissions import BasePermission
+from rest_framework.serializers import BaseSerializer
+
+# Project settings naming classes by dotted path, and whether each holds a
+# list of paths.
+IMPORT_SETTINGS = {
+    "LOGIN_SERIALIZER": False,
+    "JWT_SERIALIZER": False,
+    "JWT_SERIALIZER_WITH_EXPIRATION": False,
+    "JWT_TOKEN_CLAIMS_SERIALIZER": False,
+    "USER_DETAILS_SERIALIZER": False,
+    "REGISTER_SERIALIZER": False,
+    "REGISTER_PERMISSION_CLASSES": True,
+}
+
+
+class JwtAppSettings:
+    """
+    The classes named by dotted paths in the project settings, imported the
+    first time they are read instead of on every request.
+
+    `validate` imports all of them so a wrong path fails at startup, and the
+    cache is dropped whenever one of the settings changes (in tests).
+    """
+
+    LOGIN_SERIALIZER: type[BaseSerializer]
+    JWT_SERIALIZER: type[BaseSerializer]
+    JWT_SERIALIZER_WITH_EXPIRATION: type[BaseSerializer]
+    # A TokenObtainPairSerializer, used through its `get_token` classmethod
+    JWT_TOKEN_CLAIMS_SERIALIZER: type[BaseSerializer]
+    USER_DETAILS_SERIALIZER: type[BaseSerializer]
+    REGISTER_SERIALIZER: type[BaseSerializer]
+    REGISTER_PERMISSION_CLASSES: tuple[type[BasePermission], ...]
+
+    def __getattr__(self, name):
+        if name not in IMPORT_SETTINGS:
+            raise AttributeError(f"Invalid JWT app setting: {name!r}")
+
+        value = getattr(settings, name)
+        if IMPORT_SETTINGS[name]:
+            resolved = tuple(self.import_path(name, path) for path in value)
+        else:
+            resolved = self.import_path(name, value)
+
+        setattr(self, name, resolved)
+        return resolved
+
+    @staticmethod
+    def import_path(name, path):
+        if not isinstance(path, str):
+            raise ImproperlyConfigured(
+                f"{name} must be a dotted import path, not {path!r}."
+            )
+        try:
+            return import_string(path)
+        except ImportError as e:
+            raise ImproperlyConfigured(f"Could not import {path!r} for {name}: {e}")
+
+    def validate(self):
+        for name in IMPORT_SETTINGS:
+            getattr(self, name)
+
+    def reload(self):
+        for name in IMPORT_SETTINGS:
+            self.__dict__.pop(name, None)
+
+
+jwt_app_settings = JwtAppSettings()
+
+
+@receiver(setting_changed)
+def reload_jwt_app_settings(*, setting, **kwargs):
+    if setting in IMPORT_SETTINGS:
+        jwt_app_settings.reload()
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class JwtConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "core_apps.jwt"
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .app_settings import jwt_app_settings
+
+        jwt_app_settings.validate()
@@ -0,0 +1,120 @@
+import inspect
+
+from asgiref.sync import sync_to_async
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from .serializers import get_refresh_view
+from .views import LoginView, UserDetailsView, sensitive_post_parameters_m
+
+
+class AsyncAPIViewMixin:
+    """
+    Serves a DRF view as a native async Django view, so a request waiting on
+    the database or the hashing pool does not hold a worker thread.
+
+    Authentication, permission and throttle checks may hit the database or
+    Redis and run in a thread; handlers are coroutines. Sync handlers, such as
+    the inherited `options`, are still accepted.
+    """
+
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed
+                )
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class AsyncLoginView(AsyncAPIViewMixin, LoginView):
+    """
+    Async variant of `LoginView`. The user is fetched with the async ORM and
+    the password is checked by the hashing pool off the event loop.
+    """
+
+    @sensitive_post_parameters_m
+    async def dispatch(self, *args, **kwargs):
+        return await super().dispatch(*args, **kwargs)
+
+    async def post(self, request, *args, **kwargs):
+        self.request = request
+        self.serializer = self.get_serializer(data=self.request.data)
+        await self.serializer.ais_valid(raise_exception=True)
+
+        # Issuing the token pair records the outstanding refresh token.
+        await sync_to_async(self.login)()
+        return self.get_response()
+
+
+class AsyncRefreshView(AsyncAPIViewMixin, get_refresh_view()):
+    """
+    Async variant of the cookie-aware token refresh view.
+    """
+
+    async def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+
+        try:
+            await serializer.ais_valid(raise_exception=True)
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+
+        return Response(serializer.validated_data, status=status.HTTP_200_OK)
+
+
+class AsyncUserDetailsView(AsyncAPIViewMixin, UserDetailsView):
+    """
+    Async variant of `UserDetailsView`.
+    """
+
+    async def aget_object(self):
+        user = self.get_object()
+        # Users built from a token snapshot load their remaining fields here.
+        if user.get_deferred_fields():
+            await user.arefresh_from_db()
+        return user
+
+    async def get(self, request, *args, **kwargs):
+        serializer = self.get_serializer(await self.aget_object())
+        return Response(serializer.data)
+
+    async def put(self, request, *args, **kwargs):
+        return await self.aupdate(request, *args, **kwargs)
+
+    async def patch(self, request, *args, **kwargs):
+        return await self.aupdate(request, partial=True, *args, **kwargs)
+
+    async def aupdate(self, request, *args, **kwargs):
+        partial = kwargs.pop("partial", False)
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance, data=request.data, partial=partial)
+        # Field validators check uniqueness against the database.
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+
+        for attr, value in serializer.validated_data.items():
+            setattr(instance, attr, value)
+        await instance.asave()
+        return Response(serializer.data)
@@ -0,0 +1,330 @@
+import logging
+import threading
+import time
+from datetime import timedelta
+from hashlib import blake2b
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+logger = logging.getLogger(__name__)
+
+
+class BlacklistIndex:
+    """
+    Per-process index of blacklisted refresh-token JTIs.
+
+    The index keeps a set of 64-bit JTI fingerprints. It is synced
+    incrementally from `BlacklistedToken` at most every `sync_interval`
+    seconds, and rebuilt from the unexpired rows every `rebuild_interval`
+    seconds so pruned entries are dropped. A JTI whose fingerprint is absent
+    is not blacklisted; only a fingerprint hit falls back to SQL to rule out
+    collisions. JTIs blacklisted by this process are also kept verbatim until
+    the next rebuild, since their rows may still be waiting in the
+    `TokenWriteBuffer`.
+
+    Rows become visible in commit order, which is neither id nor
+    `blacklisted_at` order, so each sync reads again the rows blacklisted up
+    to `overlap` seconds before the latest one seen; the set of fingerprints
+    absorbs the rows read twice. A row committed more than `overlap` seconds
+    after its `blacklisted_at` is only picked up by the next rebuild.
+    """
+
+    def __init__(self, sync_interval, rebuild_interval, overlap):
+        self.sync_interval = sync_interval
+        self.rebuild_interval = rebuild_interval
+        self.overlap = timedelta(seconds=overlap)
+        self._fingerprints = set()
+        self._local = set()
+        self._last_seen = None
+        self._synced_at = None
+        self._rebuilt_at = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(jti):
+        return int.from_bytes(blake2b(jti.encode(), digest_size=8).digest(), "big")
+
+    def add(self, jti):
+        with self._lock:
+            self._fingerprints.add(self.fingerprint(jti))
+            self._local.add(jti)
+
+    def is_blacklisted(self, jti):
+        self.sync()
+        if self.fingerprint(jti) not in self._fingerprints:
+            return False
+        if jti in self._local:
+            return True
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+    def sync(self):
+        now = time.monotonic()
+        if self._rebuilt_at is None or now - self._rebuilt_at >= self.rebuild_interval:
+            self.rebuild()
+        elif now - self._synced_at >= self.sync_interval:
+            fingerprints, last_seen = self._load(
+                BlacklistedToken.objects.filter(
+                    blacklisted_at__gte=self._last_seen - self.overlap
+                )
+            )
+            with self._lock:
+                self._fingerprints |= fingerprints
+                self._last_seen = max(self._last_seen, last_seen or self._last_seen)
+                self._synced_at = now
+
+    def rebuild(self):
+        now = time.monotonic()
+        started_at = timezone.now()
+        fingerprints, last_seen = self._load(
+            BlacklistedToken.objects.filter(token__expires_at__gt=started_at)
+        )
+        with self._lock:
+            self._fingerprints = fingerprints | {
+                self.fingerprint(jti) for jti in self._local
+            }
+            self._local = set()
+            self._last_seen = max(last_seen or started_at, started_at)
+            self._synced_at = self._rebuilt_at = now
+
+    def clear(self):
+        with self._lock:
+            self._fingerprints = set()
+            self._local = set()
+            self._last_seen = None
+            self._synced_at = None
+            self._rebuilt_at = None
+
+    def __len__(self):
+        return len(self._fingerprints)
+
+    def _load(self, queryset):
+        # The fingerprints of the rows, and the latest `blacklisted_at`.
+        rows = queryset.values_list("blacklisted_at", "token__jti")
+        fingerprints = set()
+        last_seen = None
+        for blacklisted_at, jti in rows.iterator():
+            fingerprints.add(self.fingerprint(jti))
+            if last_seen is None or blacklisted_at > last_seen:
+                last_seen = blacklisted_at
+        return fingerprints, last_seen
+
+
+blacklist_index = BlacklistIndex(
+    sync_interval=settings.JWT_BLACKLIST_SYNC_INTERVAL,
+    rebuild_interval=settings.JWT_BLACKLIST_REBUILD_INTERVAL,
+    overlap=settings.JWT_BLACKLIST_SYNC_OVERLAP,
+)
+
+
+class TokenWriteBuffer:
+    """
+    Buffers the `OutstandingToken` and `BlacklistedToken` inserts caused by
+    refresh-token rotation and writes them with `bulk_create`.
+
+    Entries are flushed after a response once `max_size` entries are
+    pending, by a timer thread `max_delay` seconds after the first entry of
+    a batch (with `autoflush`), and when the process exits. Callers revoke
+    blacklisted tokens in `revoked_tokens` before buffering them, since
+    other processes only see the rows after the flush plus one index sync.
+    """
+
+    def __init__(self, max_size, max_delay, autoflush):
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self.autoflush = autoflush
+        self._outstanding = {}
+        self._blacklisted = []
+        self._since = None
+        self._lock = threading.Lock()
+
+    def outstand(self, token):
+        jti = token[api_settings.JTI_CLAIM]
+        with self._lock:
+            first = self._since is None
+            self._since = self._since or time.monotonic()
+            self._outstanding.setdefault(
+                jti,
+                OutstandingToken(
+                    jti=jti,
+                    user_id=token.get(api_settings.USER_ID_CLAIM),
+                    token=str(token),
+                    created_at=token.current_time,
+                    expires_at=datetime_from_epoch(token["exp"]),
+                ),
+            )
+        if first and self.autoflush:
+            timer = threading.Timer(self.max_delay, self.flush_on_timer)
+            timer.daemon = True
+            timer.start()
+
+    def blacklist(self, token):
+        self.outstand(token)
+        jti = token[api_settings.JTI_CLAIM]
+        with self._lock:
+            self._blacklisted.append(jti)
+        blacklist_index.add(jti)
+
+    def __len__(self):
+        return len(self._outstanding) + len(self._blacklisted)
+
+    def should_flush(self):
+        if self._since is None:
+            return False
+        return (
+            len(self) >= self.max_size
+            or time.monotonic() - self._since >= self.max_delay
+        )
+
+    def flush(self):
+        with self._lock:
+            outstanding = list(self._outstanding.values())
+            blacklisted = self._blacklisted
+            self._outstanding = {}
+            self._blacklisted = []
+            self._since = None
+
+        if outstanding:
+            self.write(outstanding, blacklisted)
+
+    def clear(self):
+        """
+        Drops the pending entries without writing them.
+        """
+        with self._lock:
+            self._outstanding = {}
+            self._blacklisted = []
+            self._since = None
+
+    def flush_on_timer(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Could not write buffered tokens")
+        finally:
+            # The timer thread's own connections.
+            connections.close_all()
+
+    def write(self, outstanding, blacklisted):
+        write_tokens(outstanding, blacklisted)
+
+
+class DeferredTokenWriteBuffer(TokenWriteBuffer):
+    """
+    A `TokenWriteBuffer` whose batches are written by a celery worker instead
+    of the web process, or inline when the broker cannot be reached.
+    """
+
+    def write(self, outstanding, blacklisted):
+        from .tasks import write_tokens_task
+
+        rows = [
+            {
+                "jti": token.jti,
+                "user_id": token.user_id,
+                "token": token.token,
+                "created_at": token.created_at.timestamp(),
+                "expires_at": token.expires_at.timestamp(),
+            }
+            for token in outstanding
+        ]
+        try:
+            write_tokens_task.delay(rows, blacklisted)
+        except Exception:
+            logger.warning(
+                "Could not enqueue %d token writes", len(rows), exc_info=True
+            )
+            write_tokens(outstanding, blacklisted)
+
+
+def write_tokens(outstanding, blacklisted):
+    """
+    Inserts the `OutstandingToken` instances and blacklists the JTIs in
+    `blacklisted`, skipping rows that already exist.
+    """
+    with transaction.atomic():
+        OutstandingToken.objects.bulk_create(outstanding, ignore_conflicts=True)
+        if blacklisted:
+            token_ids = OutstandingToken.objects.filter(
+                jti__in=blacklisted
+            ).values_list("id", flat=True)
+            BlacklistedToken.objects.bulk_create(
+                [BlacklistedToken(token_id=token_id) for token_id in token_ids],
+                ignore_conflicts=True,
+            )
+
+
+def prune_expired_tokens(batch_size):
+    """
+    Deletes outstanding tokens that have expired, with their blacklist rows,
+    `batch_size` at a time so the token tables are never locked for long.
+    Returns the number of rows deleted.
+    """
+    expired = OutstandingToken.objects.filter(expires_at__lte=timezone.now())
+    total = 0
+    while True:
+        ids = list(expired.order_by("id").values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return total
+        # Blacklist entries go with their token through the cascade.
+        deleted, _ = OutstandingToken.objects.filter(id__in=ids).delete()
+        total += deleted
+
+
+class RevokedTokens:
+    """
+    JTIs revoked by logout, kept in the shared cache `alias` until their
+    token expires, so every process rejects them from the next request on,
+    before the blacklist rows are written.
+
+    `revoke` raises when the cache is unavailable, so callers can write the
+    blacklist row instead of losing the revocation. `is_revoked` reads as
+    not revoked then: refresh tokens are still rejected through the
+    blacklist, while revoked access tokens stay usable until they expire, as
+    they would without logout.
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    @staticmethod
+    def key(jti):
+        return f"revoked:{jti}"
+
+    def revoke(self, token):
+        jti = token.get(api_settings.JTI_CLAIM)
+        timeout = int(token["exp"] - time.time())
+        if jti is not None and timeout > 0:
+            self.shared.set(self.key(jti), True, timeout=timeout)
+
+    def is_revoked(self, jti):
+        try:
+            return self.shared.get(self.key(jti)) is not None
+        except Exception:
+            logger.warning("Revoked token cache is unavailable", exc_info=True)
+            return False
+
+
+token_write_buffer = TokenWriteBuffer(
+    max_size=settings.JWT_TOKEN_WRITE_BATCH_SIZE,
+    max_delay=settings.JWT_TOKEN_WRITE_MAX_DELAY,
+    autoflush=settings.JWT_TOKEN_WRITE_AUTOFLUSH,
+)
+logout_write_buffer = DeferredTokenWriteBuffer(
+    max_size=settings.JWT_TOKEN_WRITE_BATCH_SIZE,
+    max_delay=settings.JWT_TOKEN_WRITE_MAX_DELAY,
+    autoflush=settings.JWT_TOKEN_WRITE_AUTOFLUSH,
+)
+revoked_tokens = RevokedTokens(alias=settings.JWT_REVOKED_TOKENS_ALIAS)
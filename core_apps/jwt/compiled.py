@@ -0,0 +1,152 @@
+"""
+Compiled JSON responses for the JWT login and register views.
+
+`JWTSerializer` builds a fresh `UserDetailsSerializer` (a ModelSerializer,
+whose fields are introspected from the model) for every response. The
+functions here bind the fields of both serializers once and turn a response
+payload straight into the bytes `JSONRenderer` would have produced.
+"""
+
+import json
+from functools import lru_cache
+
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework.fields import SerializerMethodField, SkipField
+from rest_framework.relations import (
+    ManyRelatedField,
+    PKOnlyObject,
+    RelatedField,
+)
+from rest_framework.renderers import JSONRenderer
+from rest_framework.serializers import BaseSerializer
+
+from .app_settings import jwt_app_settings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+UNSUPPORTED_FIELDS = (
+    BaseSerializer,
+    ManyRelatedField,
+    RelatedField,
+    SerializerMethodField,
+)
+
+
+def bind_fields(serializer, nested=None):
+    """
+    Returns `(name, get_attribute, to_representation)` for each readable field
+    of `serializer`, or `None` if one of them needs more than the instance to
+    be represented (method fields, nested or related fields). Fields named in
+    `nested` are represented by the given function of the whole instance.
+    """
+    nested = nested or {}
+    bound = []
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.field_name in nested:
+            bound.append((field.field_name, None, nested[field.field_name]))
+        elif isinstance(field, UNSUPPORTED_FIELDS):
+            return None
+        else:
+            bound.append(
+                (field.field_name, field.get_attribute, field.to_representation)
+            )
+    return bound
+
+
+def represent(fields, instance):
+    # Same as Serializer.to_representation, over pre-bound fields.
+    ret = {}
+    for name, get_attribute, to_representation in fields:
+        if get_attribute is None:
+            ret[name] = to_representation(instance)
+            continue
+        try:
+            attribute = get_attribute(instance)
+        except SkipField:
+            continue
+        check_for_none = (
+            attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+        )
+        ret[name] = None if check_for_none is None else to_representation(attribute)
+    return ret
+
+
+@lru_cache(maxsize=None)
+def compile_jwt_serializer(serializer_class, user_serializer_class):
+    """
+    Returns a function turning a JWT response payload into the dict
+    `serializer_class(payload).data` would be, or `None` if the serializers
+    cannot be compiled.
+    """
+    from .serializers import JWTSerializer
+
+    # The "user" field is only understood as JWTSerializer defines it.
+    if getattr(serializer_class, "get_user", None) is not JWTSerializer.get_user:
+        return None
+
+    user_fields = bind_fields(user_serializer_class())
+    if user_fields is None:
+        return None
+    fields = bind_fields(
+        serializer_class(),
+        nested={"user": lambda payload: represent(user_fields, payload["user"])},
+    )
+    if fields is None:
+        return None
+
+    return lambda payload: represent(fields, payload)
+
+
+def render_json(data):
+    """
+    Encodes `data` exactly as the default `JSONRenderer` does, with orjson
+    when it is installed.
+    """
+    if orjson is not None:
+        content = orjson.dumps(data)
+    else:
+        content = json.dumps(
+            data, ensure_ascii=False, separators=(",", ":"), allow_nan=False
+        ).encode()
+    # JSONRenderer escapes these so the output is also valid JavaScript.
+    return content.replace("\u2028".encode(), b"\\u2028").replace(
+        "\u2029".encode(), b"\\u2029"
+    )
+
+
+def compiled_jwt_response(request, serializer_class, payload, **kwargs):
+    """
+    Returns the response for a JWT payload rendered through the compiled
+    serializer, or `None` when the DRF path has to be used: compiled
+    responses are disabled, the client negotiated another renderer or
+    indented JSON, or the serializers cannot be compiled.
+    """
+    renderer = getattr(request, "accepted_renderer", None)
+    if (
+        not settings.JWT_COMPILED_RESPONSES
+        or type(renderer) is not JSONRenderer
+        or not renderer.compact
+        or not renderer.strict
+        or renderer.ensure_ascii
+        or "indent" in (request.accepted_media_type or "")
+    ):
+        return None
+
+    compiled = compile_jwt_serializer(
+        serializer_class, jwt_app_settings.USER_DETAILS_SERIALIZER
+    )
+    if compiled is None:
+        return None
+
+    try:
+        content = render_json(compiled(payload))
+    except TypeError:
+        # A value only DRF's encoder knows how to write.
+        return None
+    return HttpResponse(content, content_type=renderer.media_type, **kwargs)
@@ -0,0 +1,150 @@
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+# Settings the cookie attributes are built from.
+COOKIE_SETTINGS = {
+    "SIMPLE_JWT",
+    "JWT_AUTH_COOKIE",
+    "JWT_AUTH_REFRESH_COOKIE",
+    "JWT_AUTH_REFRESH_COOKIE_PATH",
+    "JWT_AUTH_SECURE",
+    "JWT_AUTH_HTTPONLY",
+    "JWT_AUTH_SAMESITE",
+    "JWT_AUTH_COOKIE_DOMAIN",
+}
+
+# What HttpResponse.delete_cookie sends.
+EXPIRED = "Thu, 01 Jan 1970 00:00:00 GMT"
+
+
+class CookiePolicy:
+    """
+    The attributes of the access and refresh token cookies, read from the
+    settings once instead of on every response.
+
+    A response takes a single timestamp: `expirations(now)` gives the
+    expiration times returned in the body, and `set_cookies(response, ...,
+    now=now)` writes both cookies with the same `Expires`/`Max-Age`, so the
+    two cannot drift apart.
+    """
+
+    def __init__(self):
+        self.configure()
+
+    def configure(self):
+        samesite = settings.JWT_AUTH_SAMESITE
+        if samesite and samesite.lower() not in ("lax", "none", "strict"):
+            raise ImproperlyConfigured(
+                'JWT_AUTH_SAMESITE must be "Lax", "None", "Strict" or None.'
+            )
+
+        attributes = {"path": "/"}
+        if settings.JWT_AUTH_COOKIE_DOMAIN is not None:
+            attributes["domain"] = settings.JWT_AUTH_COOKIE_DOMAIN
+        if samesite:
+            attributes["samesite"] = samesite
+        deleted = {**attributes, "expires": EXPIRED, "max-age": 0}
+        if settings.JWT_AUTH_SECURE:
+            attributes["secure"] = True
+        if settings.JWT_AUTH_HTTPONLY:
+            attributes["httponly"] = True
+
+        self.access_lifetime = jwt_settings.ACCESS_TOKEN_LIFETIME
+        self.refresh_lifetime = jwt_settings.REFRESH_TOKEN_LIFETIME
+        self.access_max_age = int(self.access_lifetime.total_seconds())
+        self.refresh_max_age = int(self.refresh_lifetime.total_seconds())
+
+        refresh_path = {"path": settings.JWT_AUTH_REFRESH_COOKIE_PATH}
+        # (name, attributes, attributes when deleted) of each cookie, or None
+        # when the cookie is disabled.
+        self.access_cookie = self.refresh_cookie = None
+        if settings.JWT_AUTH_COOKIE:
+            name = settings.JWT_AUTH_COOKIE
+            self.access_cookie = (name, attributes, self.deleted(name, deleted))
+        if settings.JWT_AUTH_REFRESH_COOKIE:
+            name = settings.JWT_AUTH_REFRESH_COOKIE
+            self.refresh_cookie = (
+                name,
+                {**attributes, **refresh_path},
+                self.deleted(name, {**deleted, **refresh_path}),
+            )
+
+    @staticmethod
+    def deleted(name, attributes):
+        # Secure as HttpResponse.delete_cookie makes it: browsers ignore an
+        # insecure Set-Cookie for a SameSite=None or prefixed cookie.
+        samesite = attributes.get("samesite")
+        if name.startswith(("__Secure-", "__Host-")) or (
+            samesite and samesite.lower() == "none"
+        ):
+            return {**attributes, "secure": True}
+        return attributes
+
+    def now(self):
+        return timezone.now()
+
+    def expirations(self, now):
+        """
+        Returns the access and refresh token expiration times for a response
+        made at `now`.
+        """
+        return now + self.access_lifetime, now + self.refresh_lifetime
+
+    def set_cookies(self, response, access_token=None, refresh_token=None, now=None):
+        """
+        Sets the cookies of the given tokens on `response`, expiring when the
+        tokens issued at `now` do.
+        """
+        now = now or self.now()
+        timestamp = now.timestamp()
+        if access_token is not None and self.access_cookie:
+            name, attributes, _ = self.access_cookie
+            self.set_cookie(
+                response,
+                name,
+                access_token,
+                attributes,
+                self.access_max_age,
+                timestamp,
+            )
+        if refresh_token is not None and self.refresh_cookie:
+            name, attributes, _ = self.refresh_cookie
+            self.set_cookie(
+                response,
+                name,
+                refresh_token,
+                attributes,
+                self.refresh_max_age,
+                timestamp,
+            )
+
+    def unset_cookies(self, response):
+        for cookie in (self.access_cookie, self.refresh_cookie):
+            if cookie:
+                name, _, deleted = cookie
+                response.cookies[name] = ""
+                response.cookies[name].update(deleted)
+
+    @staticmethod
+    def set_cookie(response, name, value, attributes, max_age, timestamp):
+        # Same header as HttpResponse.set_cookie(expires=...), without
+        # recomputing the delta from a second clock reading.
+        response.cookies[name] = value
+        morsel = response.cookies[name]
+        morsel.update(attributes)
+        morsel["max-age"] = max_age
+        morsel["expires"] = http_date(timestamp + max_age)
+
+
+cookie_policy = CookiePolicy()
+
+
+@receiver(setting_changed)
+def reload_cookie_policy(*, setting, **kwargs):
+    if setting in COOKIE_SETTINGS:
+        cookie_policy.configure()
@@ -1,7 +1,19 @@
 from django.conf import settings
+from django.utils.translation import gettext_lazy as _
 from rest_framework import exceptions
 from rest_framework.authentication import CSRFCheck
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from core_apps.users.cache import user_cache
+
+from .blacklist import revoked_tokens
+from .utils import USER_SNAPSHOT_CLAIM, user_from_snapshot
 
 
 class JWTCookieAuthentication(JWTAuthentication):
@@ -27,6 +39,60 @@ class JWTCookieAuthentication(JWTAuthentication):
             # CSRF failed, bail with explicit error message
             raise exceptions.PermissionDenied(f"CSRF Failed: {reason}")
 
+    def get_validated_token(self, raw_token):
+        """
+        Also rejects access tokens revoked by a fast logout.
+        """
+        validated_token = super().get_validated_token(raw_token)
+        if settings.JWT_FAST_LOGOUT:
+            jti = validated_token.get(api_settings.JTI_CLAIM)
+            if jti is not None and revoked_tokens.is_revoked(jti):
+                raise AuthenticationFailed(
+                    _("Token has been revoked"), code="token_revoked"
+                )
+        return validated_token
+
+    def get_user(self, validated_token):
+        """
+        Builds the user from the token snapshot when JWT_AUTH_USER_SNAPSHOT is
+        enabled, otherwise reads it through the shared user cache.
+        """
+        snapshot = validated_token.get(USER_SNAPSHOT_CLAIM)
+        use_snapshot = (
+            settings.JWT_AUTH_USER_SNAPSHOT
+            and snapshot
+            and not api_settings.CHECK_REVOKE_TOKEN
+        )
+        if not use_snapshot and not settings.USER_CACHE_ENABLED:
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        if use_snapshot:
+            user = user_from_snapshot(user_id, snapshot)
+        else:
+            user = user_cache.get(user_id)
+            if user is None:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # Cached users carry the digest instead of the password hash.
+            password_digest = getattr(user, "password_digest", None)
+            if password_digest is None:
+                password_digest = get_md5_hash_password(user.password)
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != password_digest:
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
+
     def authenticate(self, request):
         cookie_name = settings.JWT_AUTH_COOKIE
         header = self.get_header(request)
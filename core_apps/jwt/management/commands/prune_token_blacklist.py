@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from core_apps.jwt.blacklist import prune_expired_tokens
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes outstanding and blacklisted refresh tokens that have already "
+        "expired, in batches so the token tables are never locked for long."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        total = prune_expired_tokens(options["batch_size"])
+        self.stdout.write(f"Deleted {total} expired token rows.")
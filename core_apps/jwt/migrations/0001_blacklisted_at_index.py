@@ -0,0 +1,36 @@
+from django.db import migrations
+
+# Serves the incremental syncs of core_apps.jwt.blacklist.BlacklistIndex,
+# which read the rows blacklisted since a point in time.
+INDEX = "jwt_blacklistedtoken_blacklisted_at_idx"
+
+
+def create_index(apps, schema_editor):
+    # CONCURRENTLY on PostgreSQL, so building it does not lock the table.
+    concurrently = (
+        "CONCURRENTLY " if schema_editor.connection.vendor == "postgresql" else ""
+    )
+    schema_editor.execute(
+        f"CREATE INDEX {concurrently}IF NOT EXISTS {INDEX} "
+        "ON token_blacklist_blacklistedtoken (blacklisted_at)"
+    )
+
+
+def drop_index(apps, schema_editor):
+    concurrently = (
+        "CONCURRENTLY " if schema_editor.connection.vendor == "postgresql" else ""
+    )
+    schema_editor.execute(f"DROP INDEX {concurrently}IF EXISTS {INDEX}")
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run in a transaction.
+    atomic = False
+
+    dependencies = [
+        ("token_blacklist", "0012_alter_outstandingtoken_user"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -1,19 +1,47 @@
+import logging
+
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.signals import user_login_failed
 from django.core.exceptions import ValidationError as DjangoValidationError
-from django.utils import timezone
-from django.utils.module_loading import import_string
+from django.db import transaction
+from django.db.models import Case, Value, When
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 from rest_framework import exceptions, serializers, status
-from rest_framework_simplejwt.exceptions import InvalidToken
-from rest_framework_simplejwt.serializers import TokenRefreshSerializer
-from rest_framework_simplejwt.settings import settings as jwt_settings
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from core_apps.users.hashing import (
+    acheck_user_password,
+    check_user_password,
+    password_hashing,
+    set_user_password,
+)
+
+from .app_settings import jwt_app_settings
+from .blacklist import revoked_tokens, token_write_buffer
+from .cookies import cookie_policy
+from .tokens import RefreshToken
+from .utils import USER_SNAPSHOT_CLAIM, get_user_snapshot
 
 try:
     from allauth.account import app_settings as allauth_account_settings
     from allauth.account.adapter import get_adapter
-    from allauth.account.utils import setup_user_email
-    from allauth.socialaccount.models import EmailAddress
+    from allauth.account.models import EmailAddress
+    from allauth.account.utils import (
+        filter_users_by_username,
+        setup_user_email,
+        user_email,
+    )
     from allauth.utils import get_username_max_length
 except ImportError:
     raise ImportError("allauth needs to be added to INSTALLED_APPS.")
@@ -21,78 +49,53 @@ except ImportError:
 
 UserModel = get_user_model()
 
+logger = logging.getLogger(__name__)
 
-def set_jwt_access_cookie(response, access_token):
-    cookie_name = settings.JWT_AUTH_COOKIE
-    access_token_expiration = timezone.now() + jwt_settings.ACCESS_TOKEN_LIFETIME
-    cookie_secure = settings.JWT_AUTH_SECURE
-    cookie_httponly = settings.JWT_AUTH_HTTPONLY
-    cookie_samesite = settings.JWT_AUTH_SAMESITE
-    cookie_domain = settings.JWT_AUTH_COOKIE_DOMAIN
-
-    if cookie_name:
-        response.set_cookie(
-            cookie_name,
-            access_token,
-            expires=access_token_expiration,
-            secure=cookie_secure,
-            httponly=cookie_httponly,
-            samesite=cookie_samesite,
-            domain=cookie_domain,
-        )
 
+class AsyncValidationMixin:
+    """
+    Adds `ais_valid`, the async counterpart of `is_valid`, to serializers
+    that implement `avalidate` instead of blocking on the database.
+    """
 
-def set_jwt_refresh_cookie(response, refresh_token):
-    refresh_token_expiration = timezone.now() + jwt_settings.REFRESH_TOKEN_LIFETIME
-    refresh_cookie_name = settings.JWT_AUTH_REFRESH_COOKIE
-    refresh_cookie_path = settings.JWT_AUTH_REFRESH_COOKIE_PATH
-    cookie_secure = settings.JWT_AUTH_SECURE
-    cookie_httponly = settings.JWT_AUTH_HTTPONLY
-    cookie_samesite = settings.JWT_AUTH_SAMESITE
-    cookie_domain = settings.JWT_AUTH_COOKIE_DOMAIN
-
-    if refresh_cookie_name:
-        response.set_cookie(
-            refresh_cookie_name,
-            refresh_token,
-            expires=refresh_token_expiration,
-            secure=cookie_secure,
-            httponly=cookie_httponly,
-            samesite=cookie_samesite,
-            path=refresh_cookie_path,
-            domain=cookie_domain,
-        )
+    async def ais_valid(self, raise_exception=False):
+        try:
+            attrs = self.to_internal_value(self.initial_data)
+            self.run_validators(attrs)
+            self._validated_data = await self.avalidate(attrs)
+        except (exceptions.ValidationError, DjangoValidationError) as exc:
+            self._validated_data = {}
+            self._errors = serializers.as_serializer_error(exc)
+        else:
+            self._errors = {}
+
+        if self._errors and raise_exception:
+            raise exceptions.ValidationError(self.errors)
+
+        return not bool(self._errors)
+
+
+def set_jwt_access_cookie(response, access_token, now=None):
+    cookie_policy.set_cookies(response, access_token=access_token, now=now)
 
 
-def set_jwt_cookies(response, access_token, refresh_token):
-    set_jwt_access_cookie(response, access_token)
-    set_jwt_refresh_cookie(response, refresh_token)
+def set_jwt_refresh_cookie(response, refresh_token, now=None):
+    cookie_policy.set_cookies(response, refresh_token=refresh_token, now=now)
+
+
+def set_jwt_cookies(response, access_token, refresh_token, now=None):
+    cookie_policy.set_cookies(response, access_token, refresh_token, now=now)
 
 
 def unset_jwt_cookies(response):
-    cookie_name = settings.JWT_AUTH_COOKIE
-    refresh_cookie_name = settings.JWT_AUTH_REFRESH_COOKIE
-    refresh_cookie_path = settings.JWT_AUTH_REFRESH_COOKIE_PATH
-    cookie_samesite = settings.JWT_AUTH_SAMESITE
-    cookie_domain = settings.JWT_AUTH_COOKIE_DOMAIN
-
-    if cookie_name:
-        response.delete_cookie(
-            cookie_name, samesite=cookie_samesite, domain=cookie_domain
-        )
-    if refresh_cookie_name:
-        response.delete_cookie(
-            refresh_cookie_name,
-            path=refresh_cookie_path,
-            samesite=cookie_samesite,
-            domain=cookie_domain,
-        )
+    cookie_policy.unset_cookies(response)
 
 
-class CookieTokenRefreshSerializer(TokenRefreshSerializer):
+class CookieTokenRefreshSerializer(AsyncValidationMixin, TokenRefreshSerializer):
     refresh = serializers.CharField(
         required=False, help_text=_("WIll override cookie.")
     )
+    token_class = RefreshToken
 
     def extract_refresh_token(self):
         request = self.context["request"]
@@ -104,41 +107,146 @@ class CookieTokenRefreshSerializer(TokenRefreshSerializer):
         else:
             raise InvalidToken(_("No valid refresh token found."))
 
+    def get_token_user(self, refresh):
+        user_id = refresh.payload.get(jwt_settings.USER_ID_CLAIM, None)
+        if not user_id:
+            return None
+
+        try:
+            user = UserModel.objects.get(**{jwt_settings.USER_ID_FIELD: user_id})
+        except UserModel.DoesNotExist:
+            user = None
+        return self.check_token_user(user)
+
+    async def aget_token_user(self, refresh):
+        user_id = refresh.payload.get(jwt_settings.USER_ID_CLAIM, None)
+        if not user_id:
+            return None
+
+        try:
+            user = await UserModel.objects.aget(**{jwt_settings.USER_ID_FIELD: user_id})
+        except UserModel.DoesNotExist:
+            user = None
+        return self.check_token_user(user)
+
+    def check_token_user(self, user):
+        if not jwt_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(
+                self.error_messages["no_active_account"],
+                "no_active_account",
+            )
+        return user
+
+    @staticmethod
+    def refresh_user_snapshot(refresh, user):
+        """
+        Re-embeds the user snapshot when the one carried by the refresh token
+        no longer matches the user, so the new access token never outlives a
+        change to the user by more than one access-token lifetime.
+        """
+        snapshot = get_user_snapshot(user)
+        if refresh.payload.get(USER_SNAPSHOT_CLAIM) != snapshot:
+            refresh[USER_SNAPSHOT_CLAIM] = snapshot
+
     def validate(self, attrs):
-        attrs["refresh"] = self.extract_refresh_token()
-        return super().validate(attrs)
+        refresh = self.token_class(self.extract_refresh_token())
+        user = self.get_token_user(refresh)
+        return self.issue_tokens(refresh, user)
+
+    async def avalidate(self, attrs):
+        # Decoding may confirm a blacklist hit in SQL, and unbuffered
+        # rotation writes rows, so both run in a thread.
+        refresh = await sync_to_async(self.token_class)(self.extract_refresh_token())
+        user = await self.aget_token_user(refresh)
+        return await sync_to_async(self.issue_tokens)(refresh, user)
+
+    @staticmethod
+    def revoke_rotated(refresh):
+        """
+        Revokes the rotated token in the shared cache, so every process
+        refuses it before its buffered blacklist row is written. If the cache
+        cannot take it, the row is written now instead.
+        """
+        try:
+            revoked_tokens.revoke(refresh)
+        except Exception:
+            logger.warning(
+                "Could not revoke the rotated token in the cache, blacklisting",
+                exc_info=True,
+            )
+            refresh.blacklist()
+        else:
+            token_write_buffer.blacklist(refresh)
+
+    def issue_tokens(self, refresh, user):
+        if settings.JWT_AUTH_USER_SNAPSHOT and user is not None:
+            self.refresh_user_snapshot(refresh, user)
+
+        data = {"access": str(refresh.access_token)}
+
+        if jwt_settings.ROTATE_REFRESH_TOKENS:
+            buffered = settings.JWT_BUFFER_TOKEN_WRITES
+            if jwt_settings.BLACKLIST_AFTER_ROTATION:
+                if buffered:
+                    self.revoke_rotated(refresh)
+                else:
+                    refresh.blacklist()
+
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            if buffered:
+                token_write_buffer.outstand(refresh)
+            else:
+                refresh.outstand()
+
+            data["refresh"] = str(refresh)
+
+        return data
 
 
 def get_refresh_view():
     """Returns a Token Refresh CBV without a circular import"""
-    from rest_framework_simplejwt.settings import settings as jwt_settings
     from rest_framework_simplejwt.views import TokenRefreshView
 
     class RefreshViewWithCookieSupport(TokenRefreshView):
         serializer_class = CookieTokenRefreshSerializer
 
         def finalize_response(self, request, response, *args, **kwargs):
-            if response.status_code == status.HTTP_200_OK and "access" in response.data:
-                set_jwt_access_cookie(response, response.data["access"])
-                response.data["access_expiration"] = (
-                    timezone.now() + jwt_settings.ACCESS_TOKEN_LIFETIME
-                )
-            if (
-                response.status_code == status.HTTP_200_OK
-                and "refresh" in response.data
-            ):
-                set_jwt_refresh_cookie(response, response.data["refresh"])
-                if settings.JWT_AUTH_HTTPONLY:
-                    del response.data["refresh"]
-                else:
-                    response.data["refresh_expiration"] = (
-                        timezone.now() + jwt_settings.REFRESH_TOKEN_LIFETIME
-                    )
+            if response.status_code == status.HTTP_200_OK:
+                now = cookie_policy.now()
+                access_expiration, refresh_expiration = cookie_policy.expirations(now)
+                access_token = response.data.get("access")
+                refresh_token = response.data.get("refresh")
+                set_jwt_cookies(response, access_token, refresh_token, now=now)
+                if access_token is not None:
+                    response.data["access_expiration"] = access_expiration
+                if refresh_token is not None:
+                    if settings.JWT_AUTH_HTTPONLY:
+                        del response.data["refresh"]
+                    else:
+                        response.data["refresh_expiration"] = refresh_expiration
             return super().finalize_response(request, response, *args, **kwargs)
 
     return RefreshViewWithCookieSupport
 
 
+class TokenClaimsSerializer(TokenObtainPairSerializer):
+    """
+    Issues token pairs that carry a compact user snapshot when
+    JWT_AUTH_USER_SNAPSHOT is enabled.
+    """
+
+    token_class = RefreshToken
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        if settings.JWT_AUTH_USER_SNAPSHOT:
+            token[USER_SNAPSHOT_CLAIM] = get_user_snapshot(user)
+        return token
+
+
 class JWTSerializer(serializers.Serializer):
     """
     Serializer for JWT authentication.
@@ -153,7 +261,7 @@ class JWTSerializer(serializers.Serializer):
         Required to allow using custom USER_DETAILS_SERIALIZER in
         JWTSerializer. Defining it here to avoid circular imports
         """
-        JWTUserDetailsSerializer = import_string(settings.USER_DETAILS_SERIALIZER)
+        JWTUserDetailsSerializer = jwt_app_settings.USER_DETAILS_SERIALIZER
 
         user_data = JWTUserDetailsSerializer(obj["user"], context=self.context).data
         return user_data
@@ -168,11 +276,17 @@ class JWTSerializerWithExpiration(JWTSerializer):
     refresh_expiration = serializers.DateTimeField()
 
 
-class LoginSerializer(serializers.Serializer):
+class LoginSerializer(AsyncValidationMixin, serializers.Serializer):
     username = serializers.CharField(required=False, allow_blank=True)
     email = serializers.EmailField(required=False, allow_blank=True)
     password = serializers.CharField(style={"input_type": "password"})
 
+    # The backend a session login records for the user, which must be one
+    # of AUTHENTICATION_BACKENDS for the session to load the user back.
+    @property
+    def backend_path(self):
+        return settings.AUTHENTICATION_BACKENDS[0]
+
     def authenticate(self, **kwargs):
         return authenticate(self.context["request"], **kwargs)
 
@@ -205,18 +319,93 @@ class LoginSerializer(serializers.Serializer):
 
         return user
 
-    def get_auth_user_using_orm(self, username, email, password):
+    @staticmethod
+    def get_user_by_login(username, email):
+        """
+        Fetches the user matching the email, or else the username, in one
+        query each. Both lookups are case-insensitive, like the allauth
+        backend, and are served by the `Upper` indexes on the user table.
+        """
+        users = UserModel._default_manager.all()
         if email:
-            try:
-                username = UserModel.objects.get(email__iexact=email).get_username()
-            except UserModel.DoesNotExist:
-                pass
+            user = users.filter(email__iexact=email).first()
+            if user is not None or not username:
+                return user
+
+        username_field = UserModel.USERNAME_FIELD
+        matches = users.filter(**{f"{username_field}__iexact": username})
+        # An exact match wins, as it would through ModelBackend.
+        return min(
+            matches, key=lambda user: user.get_username() != username, default=None
+        )
+
+    @staticmethod
+    async def aget_user_by_login(username, email):
+        users = UserModel._default_manager.all()
+        if email:
+            user = await users.filter(email__iexact=email).afirst()
+            if user is not None or not username:
+                return user
+
+        username_field = UserModel.USERNAME_FIELD
+        matches = users.filter(**{f"{username_field}__iexact": username})
+        return min(
+            [user async for user in matches],
+            key=lambda user: user.get_username() != username,
+            default=None,
+        )
+
+    def check_password(self, user, password):
+        return check_user_password(user, password)
+
+    async def acheck_password(self, user, password):
+        return await acheck_user_password(user, password)
+
+    def get_auth_user_using_orm(self, username, email, password):
+        if not (username or email):
+            return None
+        if not password:
+            return self._validate_username_email(username, email, password)
+
+        user = self.get_user_by_login(username, email)
+        if user is None:
+            # Run the hasher anyway so unknown accounts take as long to
+            # reject as wrong passwords.
+            password_hashing.make_password(password)
+        elif self.check_password(user, password) and user.is_active:
+            user.backend = self.backend_path
+            return user
+
+        user_login_failed.send(**self.get_login_failed_kwargs(username, email))
+        return None
+
+    async def aget_auth_user_using_orm(self, username, email, password):
+        if not (username or email):
+            return None
+        if not password:
+            return self._validate_username_email(username, email, password)
 
-        if username:
-            return self._validate_username_email(username, "", password)
+        user = await self.aget_user_by_login(username, email)
+        if user is None:
+            await password_hashing.amake_password(password)
+        elif await self.acheck_password(user, password) and user.is_active:
+            user.backend = self.backend_path
+            return user
 
+        await user_login_failed.asend(**self.get_login_failed_kwargs(username, email))
         return None
 
+    def get_login_failed_kwargs(self, username, email):
+        return {
+            "sender": __name__,
+            "credentials": {
+                "username": username,
+                "email": email,
+                "password": "********************",
+            },
+            "request": self.context.get("request"),
+        }
+
     def get_auth_user(self, username, email, password):
         """
         Retrieve the auth user from given POST payload by using
@@ -232,7 +421,15 @@ class LoginSerializer(serializers.Serializer):
         email = attrs.get("email")
         password = attrs.get("password")
         user = self.get_auth_user(username, email, password)
+        return self.validate_auth_user(attrs, user)
 
+    async def avalidate(self, attrs):
+        user = await self.aget_auth_user_using_orm(
+            attrs.get("username"), attrs.get("email"), attrs.get("password")
+        )
+        return self.validate_auth_user(attrs, user)
+
+    def validate_auth_user(self, attrs, user):
         if not user:
             msg = _("Unable to log in with provided credentials.")
             raise exceptions.ValidationError(msg)
@@ -262,15 +459,49 @@ class RegisterSerializer(serializers.Serializer):
     password1 = serializers.CharField(write_only=True)
     password2 = serializers.CharField(write_only=True)
 
+    @cached_property
+    def registered(self):
+        """
+        Looks up, in one query, whether the submitted username is taken and
+        whether the email is already recorded (`"email"`) or verified
+        (`"verified"`) for an account. Returns the set of matches.
+        """
+        username = self.initial_data.get("username")
+        email = self.initial_data.get("email")
+        lookups = []
+        if isinstance(username, str) and username:
+            lookups.append(
+                filter_users_by_username(username)
+                .annotate(kind=Value("username"))
+                .values_list("kind", flat=True)
+            )
+        if isinstance(email, str) and email.strip():
+            lookups.append(
+                EmailAddress.objects.filter(email=email.strip().lower())
+                .annotate(
+                    kind=Case(
+                        When(verified=True, then=Value("verified")),
+                        default=Value("email"),
+                    )
+                )
+                .values_list("kind", flat=True)
+            )
+        if not lookups:
+            return set()
+        return set(lookups[0].union(*lookups[1:], all=True))
+
     def validate_username(self, username):
-        username = get_adapter().clean_username(username)
+        adapter = get_adapter()
+        username = adapter.clean_username(username, shallow=True)
+        if "username" in self.registered:
+            raise adapter.validation_error("username_taken")
         return username
 
     def validate_email(self, email):
         email = get_adapter().clean_email(email)
 
         if allauth_account_settings.UNIQUE_EMAIL:
-            if email and EmailAddress.objects.is_verified(email):
+            if email and "verified" in self.registered:
                 raise serializers.ValidationError(
                     _("A user is already registered with this e-mail address."),
                 )
@@ -300,15 +531,46 @@ class RegisterSerializer(serializers.Serializer):
         adapter = get_adapter()
         user = adapter.new_user(request)
         self.cleaned_data = self.get_cleaned_data()
+        # Keep the password away from save_user so it is hashed by the pool.
+        password = self.cleaned_data.pop("password1", None)
         user = adapter.save_user(request, user, self, commit=False)
-        if "password1" in self.cleaned_data:
+        if password is not None:
+            self.cleaned_data["password1"] = password
             try:
-                adapter.clean_password(self.cleaned_data["password1"], user=user)
+                adapter.clean_password(password, user=user)
             except DjangoValidationError as exc:
                 raise serializers.ValidationError(
                     detail=serializers.as_serializer_error(exc)
                 )
-        user.save()
-        self.custom_signup(request, user)
-        setup_user_email(request, user, [])
+            set_user_password(user, password)
+
+        with transaction.atomic():
+            user.save()
+            self.custom_signup(request, user)
+            self.setup_user_email(request, user)
         return user
+
+    def setup_user_email(self, request, user):
+        """
+        Creates the primary EmailAddress of the new user. Same outcome as
+        allauth's `setup_user_email`, without repeating the lookups that
+        `registered` already made.
+        """
+        # An email verified by a social login is stashed in the session;
+        # allauth decides which address wins then. Unstashing unconditionally
+        # would write the session on every signup.
+        if request.session.get("account_verified_email"):
+            return setup_user_email(request, user, [])
+
+        email = user_email(user)
+        if not email:
+            return None
+        if (
+            allauth_account_settings.UNIQUE_EMAIL
+            and allauth_account_settings.PREVENT_ENUMERATION != "strict"
+            and self.registered & {"email", "verified"}
+        ):
+            return None
+        return EmailAddress.objects.create(
+            user=user, email=email.lower(), primary=True, verified=False
+        )
@@ -0,0 +1,30 @@
+import atexit
+import logging
+
+from django.core.signals import request_finished
+from django.dispatch import receiver
+
+from .blacklist import logout_write_buffer, token_write_buffer
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(request_finished)
+def flush_token_writes(sender, **kwargs):
+    """
+    Writes buffered rotation inserts, and enqueues buffered logout writes,
+    once the response has been sent and a full batch is pending. Partial
+    batches are flushed by the buffers' timers.
+    """
+    for buffer in (token_write_buffer, logout_write_buffer):
+        if buffer.should_flush():
+            buffer.flush()
+
+
+@atexit.register
+def flush_token_writes_on_exit():
+    for buffer in (token_write_buffer, logout_write_buffer):
+        try:
+            buffer.flush()
+        except Exception:
+            logger.exception("Could not write %d buffered tokens", len(buffer))
@@ -0,0 +1,32 @@
+from celery import shared_task
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .blacklist import prune_expired_tokens, write_tokens
+
+
+@shared_task(ignore_result=True)
+def write_tokens_task(rows, blacklisted):
+    """
+    Writes a batch of `DeferredTokenWriteBuffer`: `rows` are the outstanding
+    tokens as dicts, with timestamps in seconds since the epoch.
+    """
+    outstanding = [
+        OutstandingToken(
+            jti=row["jti"],
+            user_id=row["user_id"],
+            token=row["token"],
+            created_at=datetime_from_epoch(row["created_at"]),
+            expires_at=datetime_from_epoch(row["expires_at"]),
+        )
+        for row in rows
+    ]
+    write_tokens(outstanding, blacklisted)
+
+
+@shared_task(ignore_result=True, acks_late=True)
+def prune_token_blacklist_task(batch_size=5000):
+    """
+    The `prune_token_blacklist` command, for workers of the tokens queue.
+    """
+    prune_expired_tokens(batch_size)
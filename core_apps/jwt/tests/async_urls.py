@@ -0,0 +1,13 @@
+from django.urls import path
+
+from core_apps.jwt.async_views import (
+    AsyncLoginView,
+    AsyncRefreshView,
+    AsyncUserDetailsView,
+)
+
+urlpatterns = [
+    path("login", AsyncLoginView.as_view()),
+    path("token/refresh", AsyncRefreshView.as_view()),
+    path("user", AsyncUserDetailsView.as_view()),
+]
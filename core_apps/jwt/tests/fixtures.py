@@ -1,6 +1,8 @@
 import pytest
 from rest_framework.test import APIClient as BaseAPIClient
 
+from core_apps.jwt.blacklist import logout_write_buffer, token_write_buffer
+from core_apps.jwt.throttling import RedisScopedRateThrottle
 from core_apps.users.tests.factories import UserFactory
 
 
@@ -27,3 +29,23 @@ def authenticated_client(client):
     user = UserFactory.create()
     client.force_authenticate(user=user)
     return client
+
+
+@pytest.fixture(autouse=True)
+def clear_throttle_history():
+    """
+    Fixture to reset the throttle history, which the test settings keep in
+    the process, so request counts do not leak between tests.
+    """
+    RedisScopedRateThrottle.clear_history()
+
+
+@pytest.fixture(autouse=True)
+def clear_token_buffers():
+    """
+    Fixture to drop the token writes a test left buffered, so they are not
+    flushed into the next test's database.
+    """
+    yield
+    token_write_buffer.clear()
+    logout_write_buffer.clear()
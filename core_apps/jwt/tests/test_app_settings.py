@@ -0,0 +1,54 @@
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+
+from core_apps.jwt.app_settings import jwt_app_settings
+from core_apps.jwt.serializers import JWTSerializerWithExpiration
+from core_apps.users.tests.factories import UserFactory
+
+
+def test_dotted_paths_are_resolved_once():
+    """
+    Test that a resolved class is cached on the registry.
+    """
+
+    assert (
+        jwt_app_settings.JWT_SERIALIZER_WITH_EXPIRATION is JWTSerializerWithExpiration
+    )
+    assert "JWT_SERIALIZER_WITH_EXPIRATION" in vars(jwt_app_settings)
+
+
+def test_invalid_path_is_reported_after_setting_change():
+    """
+    Test that changing a setting drops the cached class and a bad path is refused.
+    """
+
+    with override_settings(JWT_SERIALIZER=("core_apps.jwt.serializers.JWTSerializer",)):
+        with pytest.raises(ImproperlyConfigured, match="dotted import path"):
+            jwt_app_settings.validate()
+
+    with override_settings(JWT_SERIALIZER="core_apps.jwt.serializers.Missing"):
+        with pytest.raises(ImproperlyConfigured, match="Could not import"):
+            jwt_app_settings.JWT_SERIALIZER
+
+    jwt_app_settings.validate()
+
+
+@pytest.mark.django_db
+@override_settings(JWT_AUTH_RETURN_EXPIRATION=True)
+def test_login_returns_expiration_times(client):
+    """
+    Test that logging in with JWT_AUTH_RETURN_EXPIRATION returns both expirations.
+    """
+
+    UserFactory.create(username="loginuser", password="testpassword")
+
+    response = client.post(
+        "/api/v1/auth/login",
+        {"username": "loginuser", "password": "testpassword"},
+    )
+
+    content = response.json()
+    assert response.status_code == 200
+    assert content["access_expiration"]
+    assert content["refresh_expiration"]
@@ -0,0 +1,87 @@
+import pytest
+from django.conf import settings
+
+from core_apps.jwt.blacklist import blacklist_index, token_write_buffer
+from core_apps.jwt.tokens import RefreshToken
+from core_apps.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.urls("core_apps.jwt.tests.async_urls")
+
+
+@pytest.fixture(autouse=True)
+def empty_token_buffers():
+    blacklist_index.clear()
+    yield
+    token_write_buffer.flush()
+    blacklist_index.clear()
+
+
+@pytest.mark.django_db
+def test_async_login(client):
+    """
+    Test that the async login view authenticates and sets the JWT cookies.
+    """
+
+    user = UserFactory.create(email="async@example.com", password="testpassword")
+
+    response = client.post(
+        "/login", {"email": "async@example.com", "password": "testpassword"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["user"]["pk"] == user.pk
+    assert response.cookies[settings.JWT_AUTH_REFRESH_COOKIE].value
+
+
+@pytest.mark.django_db
+def test_async_login_rejects_wrong_password(client):
+    """
+    Test that the async login view reports bad credentials as a validation error.
+    """
+
+    UserFactory.create(email="async@example.com", password="testpassword")
+
+    response = client.post("/login", {"email": "async@example.com", "password": "x"})
+
+    assert response.status_code == 400
+    assert response.json()["non_field_errors"]
+
+
+@pytest.mark.django_db
+def test_async_refresh_rotates_token(client):
+    """
+    Test that the async refresh view rotates the refresh token and refuses the old one.
+    """
+
+    token = RefreshToken.for_user(UserFactory.create())
+    client.cookies[settings.JWT_AUTH_REFRESH_COOKIE] = str(token)
+
+    response = client.post("/token/refresh")
+
+    assert response.status_code == 200
+    assert "access" in response.json()
+
+    client.cookies[settings.JWT_AUTH_REFRESH_COOKIE] = str(token)
+    assert client.post("/token/refresh").status_code == 401
+
+
+@pytest.mark.django_db
+def test_async_user_details(client):
+    """
+    Test that the async user details view reads and updates the current user.
+    """
+
+    user = UserFactory.create(first_name="Ada")
+    token = RefreshToken.for_user(user)
+    client.cookies[settings.JWT_AUTH_COOKIE] = str(token.access_token)
+
+    response = client.get("/user")
+    assert response.status_code == 200
+    assert response.json()["first_name"] == "Ada"
+
+    response = client.patch(
+        "/user", {"first_name": "Grace"}, content_type="application/json"
+    )
+    assert response.status_code == 200
+    user.refresh_from_db()
+    assert user.first_name == "Grace"
@@ -0,0 +1,121 @@
+import pytest
+from django.conf import settings
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from core_apps.jwt.compiled import compile_jwt_serializer, render_json
+from core_apps.jwt.serializers import (
+    JWTSerializer,
+    JWTSerializerWithExpiration,
+)
+from core_apps.users.serializers import UserDetailsSerializer
+from core_apps.users.tests.factories import UserFactory
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "serializer_class", [JWTSerializer, JWTSerializerWithExpiration]
+)
+@pytest.mark.parametrize("first_name", ["Ana", 'Zoë\u2028名前\u2029"quoted"'])
+def test_compiled_serializer_matches_drf_output(serializer_class, first_name):
+    """
+    Test that the compiled serializer renders the same bytes as the DRF path.
+    """
+
+    user = UserFactory.create(first_name=first_name)
+    payload = {
+        "user": user,
+        "access": "access-token",
+        "refresh": "refresh-token",
+        "access_expiration": timezone.now(),
+        "refresh_expiration": timezone.now(),
+    }
+
+    compiled = compile_jwt_serializer(serializer_class, UserDetailsSerializer)
+
+    assert compiled is not None
+    assert render_json(compiled(payload)) == JSONRenderer().render(
+        serializer_class(payload).data
+    )
+
+
+@pytest.mark.django_db
+def test_login_response_is_compiled(client, monkeypatch):
+    """
+    Test that login responses are rendered by the compiled serializer,
+    without building the DRF one.
+    """
+
+    UserFactory.create(username="loginuser", password="testpassword")
+    # Compiled on first use, which builds the serializer once.
+    client.post(
+        "/api/v1/auth/login",
+        {"username": "loginuser", "password": "testpassword"},
+    )
+
+    def unused(*args, **kwargs):
+        raise AssertionError("The DRF serializer should not be built")
+
+    monkeypatch.setattr(JWTSerializer, "__init__", unused)
+
+    response = client.post(
+        "/api/v1/auth/login",
+        {"username": "loginuser", "password": "testpassword"},
+    )
+
+    assert response.status_code == 200
+    assert not hasattr(response, "data")
+    assert response["Content-Type"] == "application/json"
+    assert response.json()["user"]["username"] == "loginuser"
+    assert response.cookies[settings.JWT_AUTH_COOKIE].value == response.json()["access"]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "headers",
+    [
+        {"HTTP_ACCEPT": "application/json; indent=4"},
+        {"HTTP_ACCEPT": "text/html"},
+    ],
+)
+def test_other_renderings_use_drf(client, headers):
+    """
+    Test that indented or browsable responses go through DRF.
+    """
+
+    UserFactory.create(username="loginuser", password="testpassword")
+
+    response = client.post(
+        "/api/v1/auth/login",
+        {"username": "loginuser", "password": "testpassword"},
+        **headers,
+    )
+
+    assert response.status_code == 200
+    assert response.data["user"]["username"] == "loginuser"
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("compiled", [True, False])
+def test_register_response(client, compiled):
+    """
+    Test that register responses are the same with and without compiled responses.
+    """
+
+    with override_settings(JWT_COMPILED_RESPONSES=compiled):
+        response = client.post(
+            "/api/v1/auth/register",
+            {
+                "username": "testuser",
+                "email": "test@gmail.com",
+                "password1": "testpassword",
+                "password2": "testpassword",
+            },
+        )
+
+    content = response.json()
+    assert response.status_code == 201
+    assert hasattr(response, "data") is not compiled
+    assert set(content) == {"access", "refresh", "user"}
+    assert content["user"]["username"] == "testuser"
@@ -0,0 +1,120 @@
+import pytest
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import override_settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date
+
+from core_apps.jwt.cookies import cookie_policy
+from core_apps.users.tests.factories import UserFactory
+
+
+@pytest.mark.django_db
+@override_settings(JWT_AUTH_RETURN_EXPIRATION=True)
+def test_cookie_expirations_match_response_body(client):
+    """
+    Test that the login cookies expire exactly when the body says the tokens do.
+    """
+
+    UserFactory.create(username="loginuser", password="testpassword")
+
+    response = client.post(
+        "/api/v1/auth/login",
+        {"username": "loginuser", "password": "testpassword"},
+    )
+
+    content = response.json()
+    access_expiration = parse_datetime(content["access_expiration"])
+    refresh_expiration = parse_datetime(content["refresh_expiration"])
+    access_cookie = response.cookies[settings.JWT_AUTH_COOKIE]
+    refresh_cookie = response.cookies[settings.JWT_AUTH_REFRESH_COOKIE]
+
+    assert access_cookie.value == content["access"]
+    assert access_cookie["expires"] == http_date(access_expiration.timestamp())
+    assert refresh_cookie["expires"] == http_date(refresh_expiration.timestamp())
+    assert access_cookie["httponly"] and refresh_cookie["httponly"]
+    assert refresh_cookie["path"] == settings.JWT_AUTH_REFRESH_COOKIE_PATH
+
+
+@override_settings(JWT_AUTH_SECURE=True, JWT_AUTH_COOKIE_DOMAIN="example.com")
+def test_cookies_match_django_set_cookie():
+    """
+    Test that the policy writes the same cookies as HttpResponse.set_cookie.
+    """
+
+    now = timezone.now()
+    response = HttpResponse()
+    expected = HttpResponse()
+
+    cookie_policy.set_cookies(response, "access", "refresh", now=now)
+    expected.set_cookie(
+        settings.JWT_AUTH_COOKIE,
+        "access",
+        max_age=cookie_policy.access_max_age,
+        secure=True,
+        httponly=True,
+        samesite="Lax",
+        domain="example.com",
+    )
+    expected.set_cookie(
+        settings.JWT_AUTH_REFRESH_COOKIE,
+        "refresh",
+        max_age=cookie_policy.refresh_max_age,
+        secure=True,
+        httponly=True,
+        samesite="Lax",
+        domain="example.com",
+        path=settings.JWT_AUTH_REFRESH_COOKIE_PATH,
+    )
+    for cookie in expected.cookies.values():
+        cookie["expires"] = ""
+    for cookie in response.cookies.values():
+        cookie["expires"] = ""
+
+    assert response.cookies.output() == expected.cookies.output()
+
+
+def test_unset_cookies_match_django_delete_cookie():
+    """
+    Test that unsetting the cookies matches HttpResponse.delete_cookie.
+    """
+
+    response = HttpResponse()
+    expected = HttpResponse()
+
+    cookie_policy.unset_cookies(response)
+    expected.delete_cookie(settings.JWT_AUTH_COOKIE, samesite="Lax")
+    expected.delete_cookie(
+        settings.JWT_AUTH_REFRESH_COOKIE,
+        path=settings.JWT_AUTH_REFRESH_COOKIE_PATH,
+        samesite="Lax",
+    )
+
+    assert response.cookies.output() == expected.cookies.output()
+
+
+@pytest.mark.parametrize(
+    "samesite,name",
+    [("None", "jwt-auth"), ("Lax", "__Host-jwt-auth")],
+)
+def test_unset_cookies_are_secure_when_browsers_require_it(samesite, name):
+    """
+    Test that the expired cookies are marked Secure, as delete_cookie marks
+    them, when SameSite is None or the name has a secure prefix.
+    """
+
+    response = HttpResponse()
+    expected = HttpResponse()
+
+    with override_settings(JWT_AUTH_SAMESITE=samesite, JWT_AUTH_COOKIE=name):
+        cookie_policy.unset_cookies(response)
+        expected.delete_cookie(name, samesite=samesite)
+        expected.delete_cookie(
+            settings.JWT_AUTH_REFRESH_COOKIE,
+            path=settings.JWT_AUTH_REFRESH_COOKIE_PATH,
+            samesite=samesite,
+        )
+
+    assert response.cookies[name]["secure"] is True
+    assert response.cookies.output() == expected.cookies.output()
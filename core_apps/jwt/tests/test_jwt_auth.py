@@ -0,0 +1,103 @@
+import pytest
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+from core_apps.jwt.jwt_auth import JWTCookieAuthentication
+from core_apps.jwt.serializers import CookieTokenRefreshSerializer
+from core_apps.jwt.utils import USER_SNAPSHOT_CLAIM, jwt_encode
+from core_apps.users.tests.factories import UserFactory
+
+
+def authenticate(access_token):
+    request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {access_token}")
+    return JWTCookieAuthentication().authenticate(request)
+
+
+@pytest.mark.django_db
+@override_settings(JWT_AUTH_USER_SNAPSHOT=True)
+def test_snapshot_authentication_skips_user_query(django_assert_num_queries):
+    """
+    Test that a token carrying a user snapshot authenticates without SQL.
+    """
+
+    user = UserFactory.create(first_name="Ada")
+    access, _ = jwt_encode(user)
+
+    with django_assert_num_queries(0):
+        authenticated, _ = authenticate(str(access))
+        assert authenticated.pk == user.pk
+        assert authenticated.username == user.username
+        assert authenticated.is_staff is False
+
+    # Every deferred field is loaded together on first access.
+    with django_assert_num_queries(1):
+        assert authenticated.first_name == "Ada"
+        assert authenticated.email == user.email
+
+
+@pytest.mark.django_db
+@override_settings(JWT_AUTH_USER_SNAPSHOT=True)
+def test_snapshot_rejects_inactive_user():
+    """
+    Test that an inactive snapshot is refused without hitting the database.
+    """
+
+    user = UserFactory.create(is_active=False)
+    access, _ = jwt_encode(user)
+
+    with pytest.raises(AuthenticationFailed):
+        authenticate(str(access))
+
+
+@pytest.mark.django_db
+@override_settings(JWT_AUTH_USER_SNAPSHOT=True)
+def test_refresh_picks_up_user_changes():
+    """
+    Test that a refresh after a user change embeds the new snapshot.
+    """
+
+    user = UserFactory.create()
+    _, refresh = jwt_encode(user)
+    user.is_staff = True
+    user.save(update_fields=["is_staff"])
+
+    request = APIRequestFactory().post("/", {"refresh": str(refresh)})
+    request.data = {"refresh": str(refresh)}
+    serializer = CookieTokenRefreshSerializer(data={}, context={"request": request})
+    serializer.is_valid(raise_exception=True)
+
+    authenticated, token = authenticate(serializer.validated_data["access"])
+    assert token[USER_SNAPSHOT_CLAIM]["version"] == user.version
+    assert authenticated.is_staff is True
+
+
+@pytest.mark.django_db
+@override_settings(JWT_AUTH_USER_SNAPSHOT=True)
+def test_stale_snapshot_is_not_written_back(client):
+    """
+    Test that a user demoted after their access token was issued stays
+    demoted when they update their details with that token, and that the
+    version counted by the database moves past the demotion.
+    """
+
+    user = UserFactory.create(is_staff=True)
+    access, _ = jwt_encode(user)
+    User = get_user_model()
+    demoted = User.objects.get(pk=user.pk)
+    demoted.is_staff = False
+    demoted.save()
+
+    client.cookies[settings.JWT_AUTH_COOKIE] = str(access)
+    response = client.patch(
+        "/api/v1/auth/user", {"first_name": "Ada"}, content_type="application/json"
+    )
+
+    row = User.objects.get(pk=user.pk)
+    assert response.status_code == 200
+    assert row.first_name == "Ada"
+    assert row.is_staff is False
+    assert row.version == demoted.version
+    assert demoted.version == user.version + 1
@@ -0,0 +1,130 @@
+import pytest
+from django.conf import settings
+from django.db import DatabaseError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from core_apps.jwt import tasks
+from core_apps.jwt.blacklist import (
+    blacklist_index,
+    logout_write_buffer,
+    revoked_tokens,
+)
+from core_apps.jwt.tokens import RefreshToken
+from core_apps.users.tests.factories import UserFactory
+
+
+@pytest.fixture(autouse=True)
+def enqueued(monkeypatch):
+    batches = []
+    monkeypatch.setattr(
+        tasks.write_tokens_task, "delay", lambda *args: batches.append(args)
+    )
+    return batches
+
+
+@pytest.fixture(autouse=True)
+def revocation_cache(enqueued):
+    blacklist_index.clear()
+    yield
+    logout_write_buffer.flush()
+    blacklist_index.clear()
+
+
+def log_in(client, user):
+    refresh = RefreshToken.for_user(user)
+    client.cookies[settings.JWT_AUTH_COOKIE] = str(refresh.access_token)
+    client.cookies[settings.JWT_AUTH_REFRESH_COOKIE] = str(refresh)
+    return refresh
+
+
+@pytest.mark.django_db
+def test_fast_logout_does_not_query_the_database(
+    client, enqueued, django_assert_num_queries
+):
+    """
+    Test that logging out revokes both tokens without writing the blacklist.
+    """
+
+    user = UserFactory.create()
+    refresh = log_in(client, user)
+    access = client.cookies[settings.JWT_AUTH_COOKIE].value
+    blacklist_index.sync()
+
+    # Reading the user is the only query, done by authentication.
+    with django_assert_num_queries(1):
+        response = client.post("/api/v1/auth/logout")
+
+    assert response.status_code == 200
+    assert response.cookies[settings.JWT_AUTH_REFRESH_COOKIE].value == ""
+    assert not BlacklistedToken.objects.exists()
+
+    blacklist_index.clear()
+    client.cookies[settings.JWT_AUTH_COOKIE] = access
+    assert client.get("/api/v1/auth/user").status_code == 401
+    client.cookies.pop(settings.JWT_AUTH_COOKIE)
+    client.cookies[settings.JWT_AUTH_REFRESH_COOKIE] = str(refresh)
+    assert client.post("/api/v1/auth/token/refresh").status_code == 401
+
+
+@pytest.mark.django_db
+def test_logout_blacklist_is_written_by_the_task(client, enqueued):
+    """
+    Test that the buffered blacklist rows are enqueued and written by the task.
+    """
+
+    refresh = log_in(client, UserFactory.create())
+    client.post("/api/v1/auth/logout")
+    logout_write_buffer.flush()
+
+    assert len(enqueued) == 1
+    tasks.write_tokens_task(*enqueued[0])
+
+    assert BlacklistedToken.objects.get().token.jti == refresh["jti"]
+
+
+@pytest.mark.django_db
+def test_logout_without_refresh_token(client):
+    """
+    Test that logging out without a refresh cookie is refused.
+    """
+
+    response = client.post("/api/v1/auth/logout")
+
+    assert response.status_code == 401
+    assert response.json() == {
+        "detail": "Refresh token was not included in cookie data."
+    }
+
+
+class UnavailableCache:
+    def set(self, *args, **kwargs):
+        raise ConnectionError("cache is down")
+
+    def get(self, *args, **kwargs):
+        raise ConnectionError("cache is down")
+
+
+@pytest.mark.django_db
+def test_logout_blacklists_at_once_when_the_cache_is_down(
+    client, enqueued, monkeypatch
+):
+    """
+    Test that a revocation the cache refuses is written to the blacklist
+    before the response, and that logout fails if that fails too.
+    """
+
+    monkeypatch.setattr(type(revoked_tokens), "shared", UnavailableCache())
+    refresh = log_in(client, UserFactory.create())
+
+    assert client.post("/api/v1/auth/logout").status_code == 200
+    assert BlacklistedToken.objects.get().token.jti == refresh["jti"]
+    assert enqueued == []
+
+    def unavailable(self):
+        raise DatabaseError("database is down")
+
+    monkeypatch.setattr(RefreshToken, "blacklist", unavailable)
+    log_in(client, UserFactory.create())
+    client.raise_request_exception = False
+
+    assert client.post("/api/v1/auth/logout").status_code == 500
@@ -0,0 +1,41 @@
+import pytest
+import redis
+
+from core_apps.jwt.throttling import RedisScopedRateThrottle
+
+
+def test_blocked_client_is_refused_without_redis(client, monkeypatch):
+    """
+    Test that a client blocked by this process is refused before Redis is asked.
+    """
+
+    def unreachable(*args, **kwargs):
+        raise AssertionError("Redis should not be called")
+
+    monkeypatch.setattr(RedisScopedRateThrottle, "_script", unreachable)
+    monkeypatch.setitem(
+        RedisScopedRateThrottle._blocked,
+        "throttle_login_127.0.0.1",
+        RedisScopedRateThrottle.timer() + 30,
+    )
+
+    response = client.post("/api/v1/auth/login", {})
+
+    assert response.status_code == 429
+    assert 0 < int(response["Retry-After"]) <= 30
+
+
+@pytest.mark.django_db
+def test_throttle_uses_local_history_when_redis_is_down(client, monkeypatch):
+    """
+    Test that the rate still applies when the throttle backend is unreachable.
+    """
+
+    def unreachable(*args, **kwargs):
+        raise redis.ConnectionError()
+
+    monkeypatch.setattr(RedisScopedRateThrottle, "_script", unreachable)
+
+    statuses = [client.post("/api/v1/auth/login", {}).status_code for _ in range(6)]
+
+    assert statuses == [400] * 5 + [429]
@@ -0,0 +1,97 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+from core_apps.jwt.blacklist import BlacklistIndex, blacklist_index
+from core_apps.jwt.tokens import RefreshToken
+from core_apps.users.tests.factories import UserFactory
+
+
+@pytest.fixture(autouse=True)
+def empty_blacklist_index():
+    blacklist_index.clear()
+    yield
+    blacklist_index.clear()
+
+
+@pytest.mark.django_db
+def test_blacklisted_refresh_token_is_rejected():
+    """
+    Test that a blacklisted refresh token can no longer be decoded.
+    """
+
+    token = RefreshToken.for_user(UserFactory.create())
+    token.blacklist()
+
+    with pytest.raises(TokenError, match="blacklisted"):
+        RefreshToken(str(token))
+
+
+@pytest.mark.django_db
+def test_blacklist_check_skips_sql_for_unknown_tokens(django_assert_num_queries):
+    """
+    Test that a synced index answers for a valid token without querying.
+    """
+
+    other = RefreshToken.for_user(UserFactory.create())
+    other.blacklist()
+    token = RefreshToken.for_user(UserFactory.create())
+    blacklist_index.sync()
+
+    with django_assert_num_queries(0):
+        RefreshToken(str(token))
+
+
+@pytest.mark.django_db
+def test_prune_token_blacklist_deletes_expired_tokens():
+    """
+    Test that the prune command removes expired tokens and their blacklist rows.
+    """
+
+    user = UserFactory.create()
+    expired = RefreshToken.for_user(user)
+    expired.blacklist()
+    OutstandingToken.objects.filter(jti=expired["jti"]).update(
+        expires_at=timezone.now() - timedelta(minutes=1)
+    )
+    valid = RefreshToken.for_user(user)
+
+    call_command("prune_token_blacklist", batch_size=1)
+
+    assert list(OutstandingToken.objects.values_list("jti", flat=True)) == [
+        valid["jti"]
+    ]
+    assert not BlacklistedToken.objects.exists()
+
+
+@pytest.mark.django_db
+def test_blacklist_sync_picks_up_rows_committed_out_of_order():
+    """
+    Test that a row with a lower id, committed after a higher one was
+    synced, still reaches the index before the next rebuild.
+    """
+
+    index = BlacklistIndex(sync_interval=0, rebuild_interval=3600, overlap=60)
+    user = UserFactory.create()
+    early, late = RefreshToken.for_user(user), RefreshToken.for_user(user)
+    OutstandingToken.objects.filter(jti=early["jti"]).update(id=10)
+    OutstandingToken.objects.filter(jti=late["jti"]).update(id=20)
+    blacklisted_at = timezone.now()
+
+    BlacklistedToken.objects.create(id=2, token_id=20)
+    index.rebuild()
+    # Inserted first, but committed only now.
+    BlacklistedToken.objects.create(id=1, token_id=10)
+    BlacklistedToken.objects.filter(id=1).update(
+        blacklisted_at=blacklisted_at - timedelta(seconds=1)
+    )
+
+    assert index.is_blacklisted(early["jti"])
+    assert index.is_blacklisted(late["jti"])
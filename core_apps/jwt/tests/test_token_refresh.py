@@ -0,0 +1,131 @@
+import threading
+
+import pytest
+from django.conf import settings
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+from core_apps.jwt.blacklist import (
+    TokenWriteBuffer,
+    blacklist_index,
+    revoked_tokens,
+    token_write_buffer,
+)
+from core_apps.jwt.tokens import RefreshToken
+from core_apps.users.tests.factories import UserFactory
+
+
+@pytest.fixture(autouse=True)
+def empty_token_buffers():
+    blacklist_index.clear()
+    yield
+    token_write_buffer.flush()
+    blacklist_index.clear()
+
+
+def refresh(client, token):
+    client.cookies[settings.JWT_AUTH_REFRESH_COOKIE] = str(token)
+    return client.post("/api/v1/auth/token/refresh")
+
+
+@pytest.mark.django_db
+def test_refresh_rotates_token_from_cookie(client):
+    """
+    Test that refreshing returns a new access token and rotates the refresh cookie.
+    """
+
+    token = RefreshToken.for_user(UserFactory.create())
+
+    response = refresh(client, token)
+
+    assert response.status_code == 200
+    assert "access" in response.json()
+    assert response.cookies[settings.JWT_AUTH_COOKIE].value
+    rotated = response.cookies[settings.JWT_AUTH_REFRESH_COOKIE].value
+    assert RefreshToken(rotated)["jti"] != token["jti"]
+
+
+@pytest.mark.django_db
+def test_rotated_token_is_blacklisted_before_flush(client):
+    """
+    Test that the previous refresh token is refused before its rows are written.
+    """
+
+    token = RefreshToken.for_user(UserFactory.create())
+    refresh(client, token)
+
+    assert not BlacklistedToken.objects.exists()
+    assert refresh(client, token).status_code == 401
+
+
+@pytest.mark.django_db
+def test_buffered_token_writes_are_flushed_in_bulk(client, django_assert_num_queries):
+    """
+    Test that rotation inserts for several refreshes are written in one batch.
+    """
+
+    tokens = [RefreshToken.for_user(UserFactory.create()) for _ in range(3)]
+    for token in tokens:
+        refresh(client, token)
+
+    # One transaction with an outstanding insert, a lookup and a blacklist insert.
+    with django_assert_num_queries(5):
+        token_write_buffer.flush()
+
+    assert OutstandingToken.objects.count() == 6
+    assert set(BlacklistedToken.objects.values_list("token__jti", flat=True)) == {
+        token["jti"] for token in tokens
+    }
+
+
+@pytest.mark.django_db
+def test_rotated_token_is_refused_by_other_processes_before_flush(client):
+    """
+    Test that a process whose index has not seen the rotation refuses the
+    previous refresh token through the shared cache.
+    """
+
+    token = RefreshToken.for_user(UserFactory.create())
+    refresh(client, token)
+    blacklist_index.clear()
+
+    assert not BlacklistedToken.objects.exists()
+    assert refresh(client, token).status_code == 401
+
+
+@pytest.mark.django_db
+def test_rotation_blacklists_at_once_when_the_cache_is_down(client, monkeypatch):
+    """
+    Test that a rotated token the cache refuses is blacklisted before the
+    response.
+    """
+
+    def unavailable(self, token):
+        raise ConnectionError("cache is down")
+
+    monkeypatch.setattr(type(revoked_tokens), "revoke", unavailable)
+    token = RefreshToken.for_user(UserFactory.create())
+
+    assert refresh(client, token).status_code == 200
+    assert BlacklistedToken.objects.get().token.jti == token["jti"]
+
+
+def test_buffer_flushes_partial_batches_on_a_timer():
+    """
+    Test that a batch smaller than max_size is written max_delay seconds
+    after its first entry, without another request.
+    """
+
+    written = threading.Event()
+
+    class RecordingBuffer(TokenWriteBuffer):
+        def write(self, outstanding, blacklisted):
+            written.set()
+
+    buffer = RecordingBuffer(max_size=200, max_delay=0.01, autoflush=True)
+    buffer.outstand(RefreshToken())
+
+    assert written.wait(timeout=5)
+    assert len(buffer) == 0
@@ -0,0 +1,100 @@
+import pytest
+from django.conf import settings
+from django.contrib.auth import load_backend
+from rest_framework.test import APIRequestFactory
+
+from core_apps.jwt.serializers import LoginSerializer
+from core_apps.users.tests.factories import UserFactory
+
+
+@pytest.mark.django_db
+def test_user_can_login_with_email(client, django_assert_num_queries):
+    """
+    Test that logging in with an email fetches the user once and issues one token insert.
+    """
+
+    user = UserFactory.create(email="Login@Example.com", password="testpassword")
+
+    with django_assert_num_queries(2):
+        response = client.post(
+            "/api/v1/auth/login",
+            {"email": "login@example.com", "password": "testpassword"},
+        )
+
+    content = response.json()
+    assert response.status_code == 200
+    assert content["user"]["pk"] == user.pk
+    assert content["access"]
+    assert response.cookies[settings.JWT_AUTH_REFRESH_COOKIE].value
+
+
+@pytest.mark.django_db
+def test_user_can_login_with_username(client, django_assert_num_queries):
+    """
+    Test that logging in with a username is case-insensitive and takes two queries.
+    """
+
+    user = UserFactory.create(username="loginuser", password="testpassword")
+
+    with django_assert_num_queries(2):
+        response = client.post(
+            "/api/v1/auth/login",
+            {"username": "LoginUser", "password": "testpassword"},
+        )
+
+    assert response.status_code == 200
+    assert response.json()["user"]["username"] == user.username
+
+
+@pytest.mark.django_db
+def test_user_login_with_wrong_password(client):
+    """
+    Test that a wrong password is rejected.
+    """
+
+    UserFactory.create(username="loginuser", password="testpassword")
+    response = client.post(
+        "/api/v1/auth/login",
+        {"username": "loginuser", "password": "wrongpassword"},
+    )
+
+    assert response.status_code == 400
+    assert response.json()["non_field_errors"] == [
+        "Unable to log in with provided credentials."
+    ]
+
+
+@pytest.mark.django_db
+def test_inactive_user_cannot_login(client):
+    """
+    Test that an inactive user is rejected.
+    """
+
+    UserFactory.create(username="loginuser", password="testpassword", is_active=False)
+    response = client.post(
+        "/api/v1/auth/login",
+        {"username": "loginuser", "password": "testpassword"},
+    )
+
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_logged_in_user_backend_can_load_the_user():
+    """
+    Test that the backend recorded on a logged-in user is configured, so a
+    session login can load the user back.
+    """
+
+    user = UserFactory.create(username="loginuser", password="testpassword")
+    request = APIRequestFactory().post("/api/v1/auth/login")
+    serializer = LoginSerializer(
+        data={"username": "loginuser", "password": "testpassword"},
+        context={"request": request},
+    )
+
+    serializer.is_valid(raise_exception=True)
+
+    backend = serializer.validated_data["user"].backend
+    assert backend in settings.AUTHENTICATION_BACKENDS
+    assert load_backend(backend).get_user(user.pk) == user
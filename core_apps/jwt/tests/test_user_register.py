@@ -130,3 +130,53 @@ def test_user_registration_with_mismatched_passwords(client):
     content = response.json()
     assert response.status_code == 400
     assert content["non_field_errors"] == ["The two password fields didn't match."]
+
+
+@pytest.mark.django_db
+@override_settings(ACCOUNT_UNIQUE_EMAIL=True)
+def test_user_registration_query_budget(client, django_assert_num_queries):
+    """
+    Test that registering checks uniqueness in one query and writes the user,
+    its email address and the outstanding refresh token in one transaction.
+    """
+
+    # uniqueness lookup, savepoint, user, email address, release, refresh token
+    with django_assert_num_queries(6):
+        response = client.post(
+            "/api/v1/auth/register",
+            {
+                "username": "budgetuser",
+                "email": "budget@gmail.com",
+                "password1": "testpassword",
+                "password2": "testpassword",
+            },
+        )
+
+    assert response.status_code == 201
+    assert EmailAddress.objects.filter(
+        user__username="budgetuser", email="budget@gmail.com", primary=True
+    ).exists()
+
+
+@pytest.mark.django_db
+@override_settings(ACCOUNT_UNIQUE_EMAIL=True)
+def test_user_registration_skips_unverified_email_of_another_user(client):
+    """
+    Test that an email recorded but unverified for another account does not
+    block the signup, but is not added to the new user either.
+    """
+
+    EmailAddressFactory.create(email="shared@gmail.com", verified=False)
+
+    response = client.post(
+        "/api/v1/auth/register",
+        {
+            "username": "seconduser",
+            "email": "shared@gmail.com",
+            "password1": "testpassword",
+            "password2": "testpassword",
+        },
+    )
+
+    assert response.status_code == 201
+    assert not EmailAddress.objects.filter(user__username="seconduser").exists()
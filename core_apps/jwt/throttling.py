@@ -0,0 +1,147 @@
+import logging
+import threading
+import uuid
+
+import redis
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework.throttling import ScopedRateThrottle
+
+logger = logging.getLogger(__name__)
+
+# Sliding-window log: drops timestamps older than the window, then either
+# records this request or returns how many milliseconds until the oldest
+# recorded request leaves the window.
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+redis.call("ZREMRANGEBYSCORE", KEYS[1], "-inf", now - window)
+if redis.call("ZCARD", KEYS[1]) < limit then
+    redis.call("ZADD", KEYS[1], now, ARGV[4])
+    redis.call("PEXPIRE", KEYS[1], window)
+    return 0
+end
+local oldest = redis.call("ZRANGE", KEYS[1], 0, 0, "WITHSCORES")
+return math.max(1, tonumber(oldest[2]) + window - now)
+"""
+
+
+class RedisScopedRateThrottle(ScopedRateThrottle):
+    """
+    ScopedRateThrottle whose history lives in Redis, so the rate applies to
+    the whole cluster instead of to each worker's local cache. Each check is
+    one atomic script call. Clients that are already blocked are refused from
+    a per-process table until their wait is over, without calling Redis.
+
+    While Redis is unavailable, requests are throttled as by
+    ScopedRateThrottle, on a history kept in this process: each worker then
+    applies the rate on its own, which is looser but still limits brute force.
+    The default cache is not used for it, since it lives in the same Redis.
+    With THROTTLE_REDIS_URL empty, that local history is all there is.
+    """
+
+    # History of ScopedRateThrottle, used while Redis is unavailable.
+    cache = LocMemCache("throttle", {"OPTIONS": {"MAX_ENTRIES": 10_000}})
+
+    _client = None
+    _script = None
+    # client key -> timestamp at which it may send requests again
+    _blocked = {}
+    _blocked_lock = threading.Lock()
+    max_blocked = 10_000
+
+    @classmethod
+    def get_script(cls):
+        if cls._script is None and settings.THROTTLE_REDIS_URL:
+            cls._client = redis.Redis.from_url(
+                settings.THROTTLE_REDIS_URL,
+                socket_timeout=settings.THROTTLE_REDIS_TIMEOUT,
+                socket_connect_timeout=settings.THROTTLE_REDIS_TIMEOUT,
+            )
+            cls._script = cls._client.register_script(SLIDING_WINDOW_SCRIPT)
+        return cls._script
+
+    @classmethod
+    def close(cls):
+        """
+        Drops this process's Redis connections; the next check reconnects.
+        """
+        if cls._client is not None:
+            cls._client.connection_pool.disconnect()
+        cls._client = cls._script = None
+
+    @classmethod
+    def clear_history(cls):
+        """
+        Forgets every client's history, in Redis and in this process.
+        """
+        with cls._blocked_lock:
+            cls._blocked.clear()
+        cls.cache.clear()
+        if cls.get_script() is None:
+            return
+        for key in cls._client.scan_iter(match=cls.cache_format.split("%")[0] + "*"):
+            cls._client.delete(key)
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        blocked_until = self._blocked.get(self.key)
+        if blocked_until is not None and blocked_until > self.now:
+            self.wait_seconds = blocked_until - self.now
+            return False
+
+        script = self.get_script()
+        if script is None:
+            return self.allow_locally(request, view)
+        try:
+            wait_ms = script(
+                keys=[self.key],
+                args=[
+                    int(self.now * 1000),
+                    self.duration * 1000,
+                    self.num_requests,
+                    uuid.uuid4().hex,
+                ],
+            )
+        except redis.RedisError:
+            logger.warning("Throttle backend is unavailable, using the local history")
+            return self.allow_locally(request, view)
+
+        if not wait_ms:
+            return True
+
+        self.wait_seconds = wait_ms / 1000
+        self.block(self.key, self.now + self.wait_seconds)
+        return False
+
+    def allow_locally(self, request, view):
+        allowed = super().allow_request(request, view)
+        if not allowed:
+            self.wait_seconds = super().wait()
+        return allowed
+
+    def block(self, key, until):
+        with self._blocked_lock:
+            if len(self._blocked) >= self.max_blocked:
+                for blocked_key, blocked_until in list(self._blocked.items()):
+                    if blocked_until <= self.now:
+                        del self._blocked[blocked_key]
+            if len(self._blocked) < self.max_blocked:
+                self._blocked[key] = until
+
+    def wait(self):
+        return self.wait_seconds
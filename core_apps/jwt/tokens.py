@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+
+from .blacklist import blacklist_index, revoked_tokens
+
+
+class RefreshToken(BaseRefreshToken):
+    """
+    Refresh token that checks the blacklist through the in-process index
+    instead of querying `BlacklistedToken` on every refresh, after the
+    tokens revoked in the shared cache by a fast logout or a buffered
+    rotation, whose blacklist rows may not be written yet.
+    """
+
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+
+        if (
+            settings.JWT_FAST_LOGOUT or settings.JWT_BUFFER_TOKEN_WRITES
+        ) and revoked_tokens.is_revoked(jti):
+            raise TokenError(_("Token is blacklisted"))
+        if blacklist_index.is_blacklisted(jti):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        blacklisted = super().blacklist()
+        blacklist_index.add(self.payload[api_settings.JTI_CLAIM])
+        return blacklisted
@@ -1,9 +1,24 @@
+from django.conf import settings
 from django.urls import path
 
-from .views import RegisterView
+from .serializers import get_refresh_view
+from .views import LoginView, LogoutView, RegisterView, UserDetailsView
+
+if settings.JWT_AUTH_ASYNC_VIEWS:
+    from .async_views import AsyncLoginView as LoginView  # noqa: F811
+    from .async_views import AsyncRefreshView as RefreshView
+    from .async_views import (  # noqa: F811
+        AsyncUserDetailsView as UserDetailsView,
+    )
+else:
+    RefreshView = get_refresh_view()
 
 urlpatterns = [
     path("register", RegisterView.as_view(), name="rest_register"),
+    path("login", LoginView.as_view(), name="rest_login"),
+    path("logout", LogoutView.as_view(), name="rest_logout"),
+    path("token/refresh", RefreshView.as_view(), name="token_refresh"),
+    path("user", UserDetailsView.as_view(), name="rest_user_details"),
     # re_path(r'verify-email/?$', VerifyEmailView.as_view(), name='rest_verify_email'),
     # re_path(r'resend-email/?$', ResendEmailVerificationView.as_view(), name="rest_resend_email"),
     # This url is used by django-allauth and empty TemplateView is
@@ -1,6 +1,11 @@
-from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import router
 from django.utils.functional import lazy
-from django.utils.module_loading import import_string
+
+from .app_settings import jwt_app_settings
+
+# Claim holding the compact user snapshot used by the stateless auth path.
+USER_SNAPSHOT_CLAIM = "usr"
 
 
 def default_create_token(token_model, user, serializer):
@@ -9,12 +14,48 @@ def default_create_token(token_model, user, serializer):
 
 
 def jwt_encode(user):
-    JWTTokenClaimsSerializer = import_string(settings.JWT_TOKEN_CLAIMS_SERIALIZER)
-
-    refresh = JWTTokenClaimsSerializer.get_token(user)
+    refresh = jwt_app_settings.JWT_TOKEN_CLAIMS_SERIALIZER.get_token(user)
     return refresh.access_token, refresh
 
 
+def get_user_snapshot(user):
+    """
+    Returns the subset of user fields that is embedded in the token claims.
+    """
+    fields = (*user.TOKEN_SNAPSHOT_FIELDS, "version")
+    return {field: getattr(user, field) for field in fields}
+
+
+def user_from_snapshot(user_id, snapshot):
+    """
+    Builds a user instance from token claims without touching the database.
+    Every field that is not part of the snapshot is deferred, so the row is
+    only fetched if a caller reads one of them.
+    """
+    UserModel = get_user_model()
+    allowed = {*UserModel.TOKEN_SNAPSHOT_FIELDS, "version"}
+    values = {
+        UserModel._meta.pk.attname: user_id,
+        **{key: value for key, value in snapshot.items() if key in allowed},
+    }
+    field_names = [
+        field.attname
+        for field in UserModel._meta.concrete_fields
+        if field.attname in values
+    ]
+    user = UserModel.from_db(
+        router.db_for_read(UserModel),
+        field_names,
+        [values[name] for name in field_names],
+    )
+    user._from_token_snapshot = True
+    # Compared on save, so values from the token are never written back.
+    user._token_snapshot = {
+        name: values[name] for name in field_names if name in allowed
+    }
+    return user
+
+
 def format_lazy(s, *args, **kwargs):
     return s.format(*args, **kwargs)
 
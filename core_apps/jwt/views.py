@@ -1,13 +1,15 @@
+import logging
+
 from allauth.account import app_settings as allauth_account_settings
-from allauth.account.utils import complete_signup
+from allauth.account.signals import user_signed_up
+from allauth.account.utils import send_email_confirmation
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth import login as django_login
 from django.contrib.auth import logout as django_logout
 from django.core.exceptions import ObjectDoesNotExist
-from django.utils import timezone
+from django.db import transaction
 from django.utils.decorators import method_decorator
-from django.utils.module_loading import import_string
 from django.utils.translation import gettext_lazy as _
 from django.views.decorators.debug import sensitive_post_parameters
 from rest_framework import status
@@ -18,12 +20,17 @@ from rest_framework.generics import (
 )
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework.throttling import ScopedRateThrottle
 from rest_framework.views import APIView
 
+from .app_settings import jwt_app_settings
+from .compiled import compiled_jwt_response
+from .cookies import cookie_policy
 from .models import TokenModel
+from .throttling import RedisScopedRateThrottle
 from .utils import jwt_encode
 
+logger = logging.getLogger(__name__)
+
 sensitive_post_parameters_m = method_decorator(
     sensitive_post_parameters(
         "password",
@@ -33,12 +40,6 @@ sensitive_post_parameters_m = method_decorator(
     ),
 )
 
-RegisterSerializer = import_string(settings.REGISTER_SERIALIZER)
-register_permission_classes = tuple(
-    import_string(c) for c in settings.REGISTER_PERMISSION_CLASSES
-)
-JWTSerializer = import_string(settings.JWT_SERIALIZER)
-
 
 class RegisterView(CreateAPIView):
     """
@@ -47,17 +48,23 @@ class RegisterView(CreateAPIView):
     Accepts the following POST parameters: username, email, password1, password2.
     """
 
-    serializer_class = RegisterSerializer
-    permission_classes = register_permission_classes
     authentication_classes = ()
     token_model = TokenModel
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [RedisScopedRateThrottle]
     throttle_scope = "register"
 
     @sensitive_post_parameters_m
     def dispatch(self, *args, **kwargs):
         return super().dispatch(*args, **kwargs)
 
+    def get_serializer_class(self):
+        return jwt_app_settings.REGISTER_SERIALIZER
+
+    def get_permissions(self):
+        return [
+            permission() for permission in jwt_app_settings.REGISTER_PERMISSION_CLASSES
+        ]
+
     def get_response_data(self, user):
         if (
             allauth_account_settings.EMAIL_VERIFICATION
@@ -66,23 +73,46 @@ class RegisterView(CreateAPIView):
             return {"detail": _("Verification e-mail sent.")}
 
         if settings.USE_JWT:
-            data = {
-                "user": user,
-                "access": self.access_token,
-                "refresh": self.refresh_token,
-            }
-            return JWTSerializer(data, context=self.get_serializer_context()).data
+            return jwt_app_settings.JWT_SERIALIZER(
+                self.get_response_payload(user), context=self.get_serializer_context()
+            ).data
         # elif self.token_model:
         #     return settings.TOKEN_SERIALIZER(
         #         user.auth_token, context=self.get_serializer_context()
         #     ).data
         return None
 
+    def get_response_payload(self, user):
+        return {
+            "user": user,
+            "access": self.access_token,
+            "refresh": self.refresh_token,
+        }
+
+    def get_compiled_response(self, user, headers):
+        if not settings.USE_JWT or (
+            allauth_account_settings.EMAIL_VERIFICATION
+            == allauth_account_settings.EmailVerificationMethod.MANDATORY
+        ):
+            return None
+        return compiled_jwt_response(
+            self.request,
+            jwt_app_settings.JWT_SERIALIZER,
+            self.get_response_payload(user),
+            status=status.HTTP_201_CREATED,
+            headers=headers,
+        )
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = self.perform_create(serializer)
         headers = self.get_success_headers(serializer.data)
+
+        response = self.get_compiled_response(user, headers)
+        if response is not None:
+            return response
+
         data = self.get_response_data(user)
 
         if data:
@@ -107,14 +137,27 @@ class RegisterView(CreateAPIView):
             elif self.token_model:
                 settings.TOKEN_CREATOR(self.token_model, user, serializer)
 
-        complete_signup(
-            self.request._request,
-            user,
-            allauth_account_settings.EMAIL_VERIFICATION,
-            None,
-        )
+        self.complete_signup(user)
         return user
 
+    def complete_signup(self, user):
+        """
+        Runs the side effects of allauth's `complete_signup` that matter to
+        the API. The session login is skipped, as clients authenticate with
+        the JWT pair (LoginView does not start a session either), and the
+        verification e-mail is sent once the new rows are committed.
+        """
+        request = self.request._request
+        user_signed_up.send(sender=user.__class__, request=request, user=user)
+
+        if (
+            allauth_account_settings.EMAIL_VERIFICATION
+            != allauth_account_settings.EmailVerificationMethod.NONE
+        ):
+            transaction.on_commit(
+                lambda: send_email_confirmation(request, user, signup=True)
+            )
+
 
 class LoginView(GenericAPIView):
     """
@@ -128,11 +171,8 @@ class LoginView(GenericAPIView):
     """
 
     permission_classes = (AllowAny,)
-    # TO DO: Add login serializer
-    serializer_class = settings.LOGIN_SERIALIZER
-    # TO DO: add specific throttle class for login
-    throttle_classes = [ScopedRateThrottle]
-    throttle_scope = "register"
+    throttle_classes = [RedisScopedRateThrottle]
+    throttle_scope = "login"
 
     user = None
     access_token = None
@@ -142,15 +182,18 @@ class LoginView(GenericAPIView):
     def dispatch(self, *args, **kwargs):
         return super().dispatch(*args, **kwargs)
 
+    def get_serializer_class(self):
+        return jwt_app_settings.LOGIN_SERIALIZER
+
     def process_login(self):
         django_login(self.request, self.user)
 
     def get_response_serializer(self):
         if settings.USE_JWT:
             if settings.JWT_AUTH_RETURN_EXPIRATION:
-                response_serializer = settings.JWT_SERIALIZER_WITH_EXPIRATION
+                response_serializer = jwt_app_settings.JWT_SERIALIZER_WITH_EXPIRATION
             else:
-                response_serializer = settings.JWT_SERIALIZER
+                response_serializer = jwt_app_settings.JWT_SERIALIZER
 
         # else:
         #     response_serializer = settings.TOKEN_SERIALIZER
@@ -169,18 +212,13 @@ class LoginView(GenericAPIView):
         serializer_class = self.get_response_serializer()
 
         if settings.USE_JWT:
-            from rest_framework_simplejwt.settings import (
-                settings as jwt_settings,
-            )
-
-            access_token_expiration = (
-                timezone.now() + jwt_settings.ACCESS_TOKEN_LIFETIME
-            )
-            refresh_token_expiration = (
-                timezone.now() + jwt_settings.REFRESH_TOKEN_LIFETIME
-            )
-            return_expiration_times = jwt_settings.JWT_AUTH_RETURN_EXPIRATION
-            auth_httponly = jwt_settings.JWT_AUTH_HTTPONLY
+            now = cookie_policy.now()
+            (
+                access_token_expiration,
+                refresh_token_expiration,
+            ) = cookie_policy.expirations(now)
+            return_expiration_times = settings.JWT_AUTH_RETURN_EXPIRATION
+            auth_httponly = settings.JWT_AUTH_HTTPONLY
 
             data = {
                 "user": self.user,
@@ -197,23 +235,26 @@ class LoginView(GenericAPIView):
                 data["access_expiration"] = access_token_expiration
                 data["refresh_expiration"] = refresh_token_expiration
 
-            serializer = serializer_class(
-                instance=data,
-                context=self.get_serializer_context(),
-            )
+            response = compiled_jwt_response(self.request, serializer_class, data)
+            if response is None:
+                serializer = serializer_class(
+                    instance=data,
+                    context=self.get_serializer_context(),
+                )
+                response = Response(serializer.data, status=status.HTTP_200_OK)
         elif self.token:
             serializer = serializer_class(
                 instance=self.token,
                 context=self.get_serializer_context(),
             )
+            response = Response(serializer.data, status=status.HTTP_200_OK)
         else:
             return Response(status=status.HTTP_204_NO_CONTENT)
 
-        response = Response(serializer.data, status=status.HTTP_200_OK)
         if settings.USE_JWT:
-            from .serializers import set_jwt_cookies
-
-            set_jwt_cookies(response, self.access_token, self.refresh_token)
+            cookie_policy.set_cookies(
+                response, self.access_token, self.refresh_token, now=now
+            )
         return response
 
     def post(self, request, *args, **kwargs):
@@ -234,8 +275,8 @@ class LogoutView(APIView):
     """
 
     permission_classes = (AllowAny,)
-    throttle_classes = [ScopedRateThrottle]
-    throttle_scope = "register"
+    throttle_classes = [RedisScopedRateThrottle]
+    throttle_scope = "logout"
 
     def get(self, request, *args, **kwargs):
         if getattr(settings, "ACCOUNT_LOGOUT_ON_GET", False):
@@ -258,6 +299,9 @@ class LogoutView(APIView):
                 },
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        if self.fast_logout_enabled():
+            return self.fast_logout(request)
+
         try:
             request.user.auth_token.delete()
         except (AttributeError, ObjectDoesNotExist):
@@ -276,9 +320,9 @@ class LogoutView(APIView):
             # because JWT support is optional, and if `USE_JWT` isn't
             # True we shouldn't need the dependency
             from rest_framework_simplejwt.exceptions import TokenError
-            from rest_framework_simplejwt.tokens import RefreshToken
 
             from .serializers import unset_jwt_cookies
+            from .tokens import RefreshToken
 
             cookie_name = settings.JWT_AUTH_COOKIE
 
@@ -337,6 +381,66 @@ class LogoutView(APIView):
                 response.status_code = status.HTTP_200_OK
         return response
 
+    @staticmethod
+    def fast_logout_enabled():
+        return (
+            settings.JWT_FAST_LOGOUT
+            and settings.USE_JWT
+            and "rest_framework_simplejwt.token_blacklist" in settings.INSTALLED_APPS
+        )
+
+    def fast_logout(self, request):
+        """
+        Logs out without touching the database: the cookies are cleared and
+        the refresh and access tokens revoked in the shared cache, while the
+        blacklist rows are buffered and written by a celery task. If the
+        cache cannot be written, the refresh token is blacklisted right away
+        instead; if that fails too, so does the request.
+
+        The auth token row and the session are left alone, since requests
+        under /api/v1/ authenticate with JWT only and carry no session.
+        """
+        from rest_framework_simplejwt.exceptions import TokenError
+
+        from .blacklist import logout_write_buffer, revoked_tokens
+        from .serializers import unset_jwt_cookies
+        from .tokens import RefreshToken
+
+        response = Response(
+            {"detail": _("Successfully logged out.")},
+            status=status.HTTP_200_OK,
+        )
+        unset_jwt_cookies(response)
+
+        if settings.JWT_AUTH_HTTPONLY:
+            raw_token = request.COOKIES.get(settings.JWT_AUTH_REFRESH_COOKIE)
+            missing = _("Refresh token was not included in cookie data.")
+        else:
+            raw_token = request.data.get("refresh")
+            missing = _("Refresh token was not included in request data.")
+
+        try:
+            if raw_token is None:
+                raise TokenError(missing)
+            token = RefreshToken(raw_token)
+        except TokenError as error:
+            response.data = {"detail": _(error.args[0])}
+            response.status_code = status.HTTP_401_UNAUTHORIZED
+            return response
+
+        try:
+            revoked_tokens.revoke(token)
+            if request.auth is not None:
+                revoked_tokens.revoke(request.auth)
+        except Exception:
+            logger.warning(
+                "Could not revoke tokens in the cache, blacklisting", exc_info=True
+            )
+            token.blacklist()
+            return response
+        logout_write_buffer.blacklist(token)
+        return response
+
 
 class UserDetailsView(RetrieveUpdateAPIView):
     """
@@ -350,9 +454,11 @@ class UserDetailsView(RetrieveUpdateAPIView):
     Returns UserModel fields.
     """
 
-    serializer_class = settings.USER_DETAILS_SERIALIZER
     permission_classes = (IsAuthenticated,)
 
+    def get_serializer_class(self):
+        return jwt_app_settings.USER_DETAILS_SERIALIZER
+
     def get_object(self):
         return self.request.user
 
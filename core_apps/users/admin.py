@@ -1,7 +1,15 @@
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
 from django.contrib import admin
 from django.contrib.admin.sites import site
+from django.db.models import Q
+from django.utils.text import smart_split, unescape_string_literal
 from unfold.admin import ModelAdmin
 
+from core_apps.common.admin import EstimatedCountPaginator, KeysetChangeList
+
 from .models import User
 
 if site.is_registered(User):
@@ -13,6 +21,10 @@ class UserAdmin(ModelAdmin):
     """
     Admin interface for the custom User model.
     This class can be extended to customize the admin interface.
+
+    The changelist stays fast on large tables: it pages by username with a
+    cursor, estimates counts, and searches through the trigram indexes of
+    migration 0004 (see `get_search_results`).
     """
 
     list_display = (
@@ -25,6 +37,9 @@ class UserAdmin(ModelAdmin):
     )
     search_fields = ("username", "email", "first_name", "last_name")
     ordering = ("username",)
+    keyset_field = "username"
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     list_filter = ("is_staff", "is_active")
     fieldsets = (
         (None, {"fields": ("username", "password")}),
@@ -35,3 +50,35 @@ class UserAdmin(ModelAdmin):
         ),
         ("Important dates", {"fields": ("last_login", "date_joined")}),
     )
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        With USER_ADMIN_SEARCH = "trigram", each word of the search must be
+        contained in one of `search_fields`, as with Django's search, which
+        the trigram indexes serve. Words too short for trigrams would scan
+        the table instead, so they must equal a username or email.
+        """
+        if settings.USER_ADMIN_SEARCH != "trigram":
+            return super().get_search_results(request, queryset, search_term)
+
+        for bit in smart_split(search_term):
+            if bit.startswith(('"', "'")) and bit[0] == bit[-1]:
+                bit = unescape_string_literal(bit)
+            if len(bit) < 3:
+                queryset = queryset.filter(
+                    Q(username__iexact=bit) | Q(email__iexact=bit)
+                )
+            else:
+                queryset = queryset.filter(
+                    reduce(
+                        or_,
+                        (
+                            Q(**{f"{field}__icontains": bit})
+                            for field in self.search_fields
+                        ),
+                    )
+                )
+        return queryset, False
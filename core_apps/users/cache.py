@@ -0,0 +1,273 @@
+import logging
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import router
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from core_apps.common.cache import cache_aside
+
+logger = logging.getLogger(__name__)
+
+
+class UserCache:
+    """
+    Two-tier cache of user rows keyed on `User.pk`.
+
+    The first tier is a per-process LRU bounded by `max_size` whose entries
+    live for `local_ttl` seconds. It sits in front of a shared cache alias
+    (Redis) that every worker reads from. Writes to the user table invalidate
+    both tiers of the current process and the shared tier; other processes
+    converge once their local entry expires. A deactivated user can
+    therefore still authenticate on other workers for up to `local_ttl`
+    seconds (USER_CACHE_LOCAL_TTL).
+
+    The password hash is never cached: users are built with `password`
+    deferred, and carry `password_digest`, the digest that simplejwt's
+    CHECK_REVOKE_TOKEN compares with the token's.
+    """
+
+    # How often each process adds its counters to the shared totals.
+    stats_interval = 60
+
+    def __init__(self, alias, max_size, local_ttl, shared_ttl):
+        self.alias = alias
+        self.max_size = max_size
+        self.local_ttl = local_ttl
+        self.shared_ttl = shared_ttl
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"local_hits": 0, "shared_hits": 0, "misses": 0}
+        self._published = dict(self._counters)
+        self._stats_published_at = time.monotonic()
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    @cached_property
+    def fields(self):
+        return [
+            field.attname
+            for field in get_user_model()._meta.concrete_fields
+            if field.attname != "password"
+        ]
+
+    @cached_property
+    def schema_version(self):
+        # Entries written for a different set of columns are never read back.
+        return zlib.crc32(",".join([*self.fields, "password_digest"]).encode())
+
+    @staticmethod
+    def key(pk):
+        return f"user:{pk}"
+
+    def get(self, pk):
+        """
+        Returns a fresh user instance for `pk`, loading the row from the
+        database on a miss. Returns `None` if the user does not exist.
+        """
+        values = self._get_local(pk)
+        if values is not None:
+            self._count("local_hits")
+            return self._build(values)
+
+        values = self._get_shared(pk)
+        if values is not None:
+            self._count("shared_hits")
+        else:
+            self._count("misses")
+            values = self._load(pk)
+            if values is None:
+                return None
+            self._set_shared(pk, values)
+
+        self._set_local(pk, values)
+        return self._build(values)
+
+    def invalidate(self, pk):
+        with self._lock:
+            self._local.pop(pk, None)
+        try:
+            self.shared.delete(self.key(pk), version=self.schema_version)
+        except Exception:
+            logger.warning("Could not invalidate shared user cache entry %s", pk)
+
+    def clear_local(self):
+        with self._lock:
+            self._local.clear()
+
+    def stats(self):
+        """
+        Returns the hit and miss counters of the current process.
+        """
+        with self._lock:
+            return {**self._counters, "size": len(self._local)}
+
+    def shared_stats(self):
+        """
+        Returns the counters summed over every process that published them.
+        """
+        keys = [f"stats:{name}" for name in self._counters]
+        try:
+            values = self.shared.get_many(keys)
+        except Exception:
+            return {}
+        return {key.split(":", 1)[1]: values.get(key, 0) for key in keys}
+
+    def _get_local(self, pk):
+        with self._lock:
+            entry = self._local.get(pk)
+            if entry is None:
+                return None
+            expires_at, values = entry
+            if expires_at < time.monotonic():
+                del self._local[pk]
+                return None
+            self._local.move_to_end(pk)
+            return values
+
+    def _set_local(self, pk, values):
+        with self._lock:
+            self._local[pk] = (time.monotonic() + self.local_ttl, values)
+            self._local.move_to_end(pk)
+            while len(self._local) > self.max_size:
+                self._local.popitem(last=False)
+
+    def _get_shared(self, pk):
+        try:
+            return self.shared.get(self.key(pk), version=self.schema_version)
+        except Exception:
+            logger.warning("Shared user cache is unavailable", exc_info=True)
+            return None
+
+    def _set_shared(self, pk, values):
+        try:
+            self.shared.set(
+                self.key(pk),
+                values,
+                timeout=self.shared_ttl,
+                version=self.schema_version,
+            )
+        except Exception:
+            logger.warning("Shared user cache is unavailable", exc_info=True)
+
+    def _load(self, pk):
+        # The field values, followed by the digest of the password hash.
+        UserModel = get_user_model()
+        rows = UserModel._default_manager.filter(pk=pk).values_list(
+            *self.fields, "password"
+        )
+        row = next(iter(rows), None)
+        if row is None:
+            return None
+        return (*row[:-1], get_md5_hash_password(row[-1]))
+
+    def _build(self, values):
+        UserModel = get_user_model()
+        user = UserModel.from_db(
+            router.db_for_read(UserModel), self.fields, values[:-1]
+        )
+        user.password_digest = values[-1]
+        return user
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+            now = time.monotonic()
+            if now - self._stats_published_at < self.stats_interval:
+                return
+            deltas = {
+                key: value - self._published[key]
+                for key, value in self._counters.items()
+            }
+            self._published = dict(self._counters)
+            self._stats_published_at = now
+        self._publish(deltas)
+
+    def _publish(self, deltas):
+        for name, delta in deltas.items():
+            if not delta:
+                continue
+            key = f"stats:{name}"
+            try:
+                self.shared.add(key, 0, timeout=None)
+                self.shared.incr(key, delta)
+            except Exception:
+                return
+
+
+user_cache = UserCache(
+    alias=settings.USER_CACHE_ALIAS,
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    local_ttl=settings.USER_CACHE_LOCAL_TTL,
+    shared_ttl=settings.USER_CACHE_TTL,
+)
+
+
+class PermissionCache:
+    """
+    Permission sets of users, as `ModelBackend` computes them from their own
+    and their groups' permissions, read through `cache_aside`.
+
+    Entries are keyed on the user and a version of all permission
+    assignments. A change to one user's groups or permissions drops that
+    user's entry; a change to the permissions of a group, or to groups and
+    permissions themselves, bumps the version, which retires every entry at
+    once. The version is kept in the shared cache, and each process reuses
+    the one it read for CACHE_ASIDE_LOCAL_TTL seconds, as it does entries.
+    """
+
+    version_key = "perms:version"
+
+    def __init__(self, cache, timeout):
+        self.cache = cache
+        self.timeout = timeout
+        self._version = None
+        self._lock = threading.Lock()
+
+    def key(self, pk):
+        return f"perms:{pk}:{self.version()}"
+
+    def get(self, pk, compute):
+        """
+        Returns the permission set of user `pk`, calling `compute` when it
+        is not cached.
+        """
+        return self.cache.get_or_set(
+            self.key(pk), lambda: frozenset(compute()), self.timeout
+        )
+
+    def invalidate(self, pk):
+        self.cache.delete(self.key(pk))
+
+    def bump(self):
+        version = time.time_ns()
+        self.cache.shared.set(self.version_key, version, timeout=None)
+        with self._lock:
+            self._version = (time.monotonic() + self.cache.local_ttl, version)
+
+    def version(self):
+        with self._lock:
+            cached = self._version
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        version = self.cache.shared.get(self.version_key, 0)
+        with self._lock:
+            self._version = (time.monotonic() + self.cache.local_ttl, version)
+        return version
+
+    def clear_local(self):
+        with self._lock:
+            self._version = None
+
+
+permission_cache = PermissionCache(
+    cache=cache_aside, timeout=settings.PERMISSION_CACHE_TIMEOUT
+)
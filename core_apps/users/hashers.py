@@ -0,0 +1,59 @@
+import json
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+
+@lru_cache(maxsize=1)
+def load_hasher_profile():
+    """
+    Returns the Argon2 cost parameters recorded by `tune_password_hasher`,
+    or an empty dict when the host has not been tuned yet.
+    """
+    try:
+        with open(settings.PASSWORD_HASHER_PROFILE) as profile:
+            return json.load(profile)
+    except FileNotFoundError:
+        return {}
+
+
+def save_hasher_profile(profile):
+    with open(settings.PASSWORD_HASHER_PROFILE, "w") as output:
+        json.dump(profile, output, indent=2)
+    load_hasher_profile.cache_clear()
+
+
+def argon2_parameter(name, default):
+    """
+    Returns the Argon2 cost parameter `name` from the PASSWORD_ARGON2_*
+    settings, else from the recorded profile, else `default`.
+    """
+    value = getattr(settings, f"PASSWORD_ARGON2_{name.upper()}")
+    if value is not None:
+        return value
+    return load_hasher_profile().get(name, default)
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2 hasher whose cost parameters come from the PASSWORD_ARGON2_*
+    settings, tuned once with `tune_password_hasher` so every hash costs
+    roughly the same number of milliseconds of one core. Without them it uses
+    the profile recorded on this host, then Django's defaults.
+
+    Stored hashes with other parameters are upgraded on the next login
+    through `must_update`, so every host must use the same parameters.
+    """
+
+    @property
+    def time_cost(self):
+        return argon2_parameter("time_cost", super().time_cost)
+
+    @property
+    def memory_cost(self):
+        return argon2_parameter("memory_cost", super().memory_cost)
+
+    @property
+    def parallelism(self):
+        return argon2_parameter("parallelism", super().parallelism)
@@ -0,0 +1,294 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions, status
+
+logger = logging.getLogger(__name__)
+
+
+class HashingPoolFull(exceptions.APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _("The server is busy. Please try again shortly.")
+    default_code = "hashing_pool_full"
+
+    def __init__(self, wait, detail=None, code=None):
+        # DRF turns `wait` into a Retry-After header.
+        self.wait = wait
+        super().__init__(detail, code)
+
+
+def _setup_worker():
+    import django
+
+    django.setup()
+
+
+class PasswordHashingPool:
+    """
+    Runs password hashing in a process pool so CPU-bound hashes do not hold
+    the request worker's interpreter, and bounds how many hashes may be
+    running or waiting at once. A request that finds no free slot fails fast
+    with `HashingPoolFull` (503 + Retry-After) instead of queueing.
+
+    Each web worker process has its own pool and its own bound, so a host
+    runs up to WEB_CONCURRENCY * `workers` hashes at once and admits
+    WEB_CONCURRENCY * (`workers` + `max_pending`) before every worker
+    rejects. A sync worker serves one request at a time and so never fills
+    its own bound; the 503 matters for threaded and async workers.
+
+    When disabled, hashes run inline but are still timed.
+
+    With a cache `alias`, each process adds its counters, and the change in
+    its queue depth, to totals in that cache at most every `stats_interval`
+    seconds, so `manage.py password_hashing_stats` can report them for all
+    workers. Hash time is counted in milliseconds, since the cache only
+    increments integers.
+    """
+
+    # How often the counters are published and written to the log while the
+    # pool is used.
+    stats_interval = 60
+    names = ("pending", "completed", "rejected", "milliseconds")
+
+    def __init__(self, enabled, workers, max_pending, retry_after, alias=None):
+        self.enabled = enabled
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self.alias = alias
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._counters = {"completed": 0, "rejected": 0}
+        self._seconds = {"total": 0.0, "max": 0.0}
+        self._published = dict.fromkeys(self.names, 0)
+        self._stats_published_at = time.monotonic()
+
+    @property
+    def executor(self):
+        # Pools are per process; a forked web worker builds its own.
+        if self._executor is None or self._executor_pid != os.getpid():
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_setup_worker,
+            )
+            self._executor_pid = os.getpid()
+        return self._executor
+
+    def run(self, func, *args):
+        if not self.enabled:
+            return self._timed(func, *args)
+
+        self._acquire()
+        try:
+            return self._timed(lambda: self.executor.submit(func, *args).result())
+        finally:
+            self._release()
+
+    async def arun(self, func, *args):
+        """
+        Same as `run`, awaiting the hash without blocking the event loop.
+        """
+        if not self.enabled:
+            return await sync_to_async(self._timed, thread_sensitive=False)(func, *args)
+
+        self._acquire()
+        try:
+            start = time.perf_counter()
+            result = await asyncio.wrap_future(self.executor.submit(func, *args))
+            self._record(time.perf_counter() - start)
+            return result
+        finally:
+            self._release()
+
+    def make_password(self, password):
+        return self.run(hashers.make_password, password)
+
+    def check_password(self, password, encoded):
+        return self.run(hashers.check_password, password, encoded)
+
+    def make_passwords(self, passwords):
+        """
+        Hashes many passwords across the pool's workers. They are submitted a
+        few per worker at a time, so a login hashing meanwhile waits for one
+        batch rather than for all of them.
+        """
+        if not self.enabled:
+            return [self._timed(hashers.make_password, p) for p in passwords]
+
+        batch_size = self.workers * 4
+        encoded = []
+        batches = iter(passwords)
+        while batch := list(islice(batches, batch_size)):
+            self._acquire()
+            try:
+                encoded.extend(self.executor.map(hashers.make_password, batch))
+            finally:
+                self._release()
+        return encoded
+
+    async def amake_password(self, password):
+        return await self.arun(hashers.make_password, password)
+
+    async def acheck_password(self, password, encoded):
+        return await self.arun(hashers.check_password, password, encoded)
+
+    def stats(self):
+        with self._lock:
+            completed = self._counters["completed"]
+            mean = self._seconds["total"] / completed if completed else 0.0
+            return {
+                "pending": self._pending,
+                **self._counters,
+                "mean_ms": mean * 1000,
+                "max_ms": self._seconds["max"] * 1000,
+            }
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    @staticmethod
+    def key(name):
+        return f"stats:hashing:{name}"
+
+    def shared_stats(self):
+        """
+        Returns the counters summed over every process, or an empty dict if
+        the shared cache is unavailable. `pending` is the queue depth as of
+        each process's last publication.
+        """
+        keys = [self.key(name) for name in self.names]
+        try:
+            values = self.shared.get_many(keys)
+        except Exception:
+            return {}
+        return {name: values.get(self.key(name), 0) for name in self.names}
+
+    def shutdown(self):
+        if self._executor is not None and self._executor_pid == os.getpid():
+            self._executor.shutdown()
+        self._executor = None
+
+    def _acquire(self):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._counters["rejected"] += 1
+            logger.warning("Password hashing pool is full, rejecting request")
+            self._publish_stats()
+            raise HashingPoolFull(self.retry_after)
+        with self._lock:
+            self._pending += 1
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+        self._publish_stats()
+
+    def _timed(self, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        self._record(time.perf_counter() - start)
+        return result
+
+    def _record(self, elapsed):
+        with self._lock:
+            self._counters["completed"] += 1
+            self._seconds["total"] += elapsed
+            self._seconds["max"] = max(self._seconds["max"], elapsed)
+        self._publish_stats()
+
+    def _publish_stats(self):
+        with self._lock:
+            now = time.monotonic()
+            if now - self._stats_published_at < self.stats_interval:
+                return
+            self._stats_published_at = now
+            totals = {
+                "pending": self._pending,
+                **self._counters,
+                "milliseconds": round(self._seconds["total"] * 1000),
+            }
+            deltas = {name: totals[name] - self._published[name] for name in totals}
+            self._published = totals
+        logger.info("Password hashing stats: %s", self.stats())
+        if self.alias is None:
+            return
+        for name, delta in deltas.items():
+            if not delta:
+                continue
+            key = self.key(name)
+            try:
+                self.shared.add(key, 0, timeout=None)
+                self.shared.incr(key, delta)
+            except Exception:
+                return
+
+
+password_hashing = PasswordHashingPool(
+    enabled=settings.PASSWORD_HASHING_POOL,
+    workers=settings.PASSWORD_HASHING_WORKERS,
+    max_pending=settings.PASSWORD_HASHING_MAX_PENDING,
+    retry_after=settings.PASSWORD_HASHING_RETRY_AFTER,
+    alias=settings.PASSWORD_HASHING_STATS_ALIAS,
+)
+
+
+def set_user_password(user, raw_password):
+    """
+    Same as `user.set_password`, with the hash computed by the pool.
+    """
+    user.password = password_hashing.make_password(raw_password)
+    user._password = raw_password
+
+
+def check_user_password(user, raw_password):
+    """
+    Same as `user.check_password`, with the hashes computed by the pool.
+    The stored hash is upgraded when the preferred hasher or its cost
+    parameters changed.
+    """
+    encoded = user.password
+    if not password_hashing.check_password(raw_password, encoded):
+        return False
+
+    if password_needs_upgrade(encoded):
+        set_user_password(user, raw_password)
+        user._password = None
+        user.save(update_fields=["password"])
+    return True
+
+
+async def acheck_user_password(user, raw_password):
+    """
+    Async counterpart of `check_user_password`.
+    """
+    encoded = user.password
+    if not await password_hashing.acheck_password(raw_password, encoded):
+        return False
+
+    if password_needs_upgrade(encoded):
+        user.password = await password_hashing.amake_password(raw_password)
+        await user.asave(update_fields=["password"])
+    return True
+
+
+def password_needs_upgrade(encoded):
+    preferred = hashers.get_hasher("default")
+    hasher = hashers.identify_hasher(encoded)
+    return hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
@@ -0,0 +1,229 @@
+import csv
+import json
+import uuid
+from itertools import islice
+
+from allauth.account.models import EmailAddress
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Upper
+from django.utils.translation import gettext_lazy as _
+
+from .hashing import password_hashing
+from .serializers import UserImportSerializer
+
+FORMATS = ("csv", "jsonl")
+
+
+def read_rows(stream, format):
+    """
+    Yields `(row_number, row)` pairs from a text stream of CSV with a header
+    line, or of one JSON object per line. A row that cannot be parsed is
+    yielded as `None` so it is reported rather than aborting the import.
+    """
+    if format == "csv":
+        reader = csv.DictReader(stream)
+        # Row numbers count the header line, as spreadsheets do.
+        for number, row in enumerate(reader, start=2):
+            yield number, row
+    elif format == "jsonl":
+        for number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield number, json.loads(line)
+            except ValueError:
+                yield number, None
+    else:
+        raise ValueError(f"Unknown import format {format!r}")
+
+
+def format_from_name(name):
+    """
+    Returns the import format matching a file name's extension, if any.
+    """
+    extension = name.rsplit(".", 1)[-1].lower() if "." in name else ""
+    if extension == "json":
+        extension = "jsonl"
+    return extension if extension in FORMATS else None
+
+
+def stash_rows(rows):
+    """
+    Stores the rows of an upload for `import_users_task` and returns their
+    key, so plaintext passwords never travel in broker messages or task
+    events.
+    """
+    key = f"upload:{uuid.uuid4().hex}"
+    caches[settings.USER_IMPORT_CACHE_ALIAS].set(
+        key, rows, settings.USER_IMPORT_UPLOAD_TIMEOUT
+    )
+    return key
+
+
+def load_rows(key):
+    """
+    Returns the rows stored under `key` by `stash_rows`, or None once they
+    were deleted or expired.
+    """
+    return caches[settings.USER_IMPORT_CACHE_ALIAS].get(key)
+
+
+def delete_rows(key):
+    caches[settings.USER_IMPORT_CACHE_ALIAS].delete(key)
+
+
+class UserImporter:
+    """
+    Creates users and their primary `EmailAddress` from rows of
+    `UserImportSerializer` data, a chunk at a time.
+
+    Each chunk is validated row by row, then checked for usernames and emails
+    already taken with one query each. Passwords are hashed across the
+    workers of `hashing`, and the rows are written with `bulk_create` in one
+    transaction. Rows that fail are collected in `errors` with their row
+    number; the rest of the chunk is still imported.
+    """
+
+    def __init__(self, hashing=password_hashing, chunk_size=1000):
+        self.hashing = hashing
+        self.chunk_size = chunk_size
+        self.created = 0
+        self.errors = []
+        # Keys of the rows imported so far, to catch duplicates in the file.
+        self._usernames = set()
+        self._emails = set()
+
+    def run(self, rows):
+        rows = iter(rows)
+        while chunk := list(islice(rows, self.chunk_size)):
+            self.import_chunk(chunk)
+        return self.report()
+
+    def report(self):
+        return {
+            "created": self.created,
+            "failed": len(self.errors),
+            "errors": self.errors,
+        }
+
+    def fail(self, number, errors):
+        self.errors.append({"row": number, "errors": errors})
+
+    def import_chunk(self, chunk):
+        entries = self.exclude_taken(self.validate(chunk))
+        if not entries:
+            return
+
+        with_password = [data["password"] for _, data in entries if data["password"]]
+        hashed = iter(self.hashing.make_passwords(with_password))
+        entries = [
+            (
+                number,
+                data,
+                next(hashed) if data["password"] else make_password(None),
+            )
+            for number, data in entries
+        ]
+
+        try:
+            with transaction.atomic():
+                self.insert(entries)
+        except IntegrityError:
+            # Someone registered one of these users since the check; find
+            # which rows collide one at a time.
+            for entry in entries:
+                try:
+                    with transaction.atomic():
+                        self.insert([entry])
+                except IntegrityError:
+                    self.fail(
+                        entry[0],
+                        {"non_field_errors": [_("This user already exists.")]},
+                    )
+
+    def validate(self, chunk):
+        valid = []
+        for number, row in chunk:
+            if not isinstance(row, dict):
+                self.fail(number, {"non_field_errors": [_("Invalid row.")]})
+                continue
+            serializer = UserImportSerializer(data=row)
+            if not serializer.is_valid():
+                self.fail(number, serializer.errors)
+                continue
+            data = {"password": "", "first_name": "", "last_name": ""}
+            data.update(serializer.validated_data)
+            valid.append((number, data))
+        return valid
+
+    def exclude_taken(self, entries):
+        User = get_user_model()
+        usernames = {data["username"].upper() for _, data in entries}
+        emails = {data["email"] for _, data in entries}
+        upper_emails = {email.upper() for email in emails}
+        # Served by the Upper("username") index on the user table.
+        taken_usernames = self._usernames | set(
+            User._default_manager.annotate(upper=Upper("username"))
+            .filter(upper__in=usernames)
+            .values_list("upper", flat=True)
+        )
+        taken_emails = self._emails | set(
+            EmailAddress.objects.filter(email__in=emails).values_list(
+                "email", flat=True
+            )
+        )
+        # Users created outside allauth may have no EmailAddress, nor a
+        # lowercase email; served by the Upper("email") index.
+        taken_emails |= {
+            email.lower()
+            for email in User._default_manager.annotate(upper=Upper("email"))
+            .filter(upper__in=upper_emails)
+            .values_list("upper", flat=True)
+        }
+
+        available = []
+        for number, data in entries:
+            username = data["username"].upper()
+            errors = {}
+            if username in taken_usernames:
+                errors["username"] = [_("A user with that username already exists.")]
+            if data["email"] in taken_emails:
+                errors["email"] = [
+                    _("A user is already registered with this e-mail address.")
+                ]
+            if errors:
+                self.fail(number, errors)
+                continue
+            taken_usernames.add(username)
+            taken_emails.add(data["email"])
+            available.append((number, data))
+        return available
+
+    def insert(self, entries):
+        User = get_user_model()
+        users = User._default_manager.bulk_create(
+            [
+                User(
+                    username=data["username"],
+                    email=data["email"],
+                    first_name=data["first_name"],
+                    last_name=data["last_name"],
+                    password=encoded,
+                )
+                for _, data, encoded in entries
+            ]
+        )
+        EmailAddress.objects.bulk_create(
+            [
+                EmailAddress(user=user, email=user.email, primary=True, verified=False)
+                for user in users
+            ]
+        )
+        self.created += len(users)
+        for number, data, encoded in entries:
+            self._usernames.add(data["username"].upper())
+            self._emails.add(data["email"])
@@ -0,0 +1,80 @@
+import json
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+
+from core_apps.users.hashing import PasswordHashingPool
+from core_apps.users.importing import (
+    FORMATS,
+    UserImporter,
+    format_from_name,
+    read_rows,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates users in bulk from a CSV file with a header line or a JSONL "
+        "file, with username, email and optional password, first_name and "
+        "last_name. Rows that fail are reported, one JSON object per line."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help='Input file, or "-" for stdin.')
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="Input format. Defaults to the file extension.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Processes hashing passwords.",
+        )
+        parser.add_argument(
+            "--errors",
+            help="Write the per-row error report to this file instead of stdout.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        format = options["format"] or format_from_name(path)
+        if format is None:
+            raise CommandError("Cannot tell the input format, pass --format.")
+
+        # A pool of its own, so the import does not queue behind web logins
+        # and uses every core even where the web pool is disabled.
+        hashing = PasswordHashingPool(
+            enabled=True, workers=options["workers"], max_pending=0, retry_after=0
+        )
+        importer = UserImporter(hashing=hashing, chunk_size=options["chunk_size"])
+
+        start = time.perf_counter()
+        stream = (
+            sys.stdin if path == "-" else open(path, encoding="utf-8-sig", newline="")
+        )
+        try:
+            report = importer.run(read_rows(stream, format))
+        finally:
+            hashing.shutdown()
+            if stream is not sys.stdin:
+                stream.close()
+        elapsed = time.perf_counter() - start
+
+        errors = open(options["errors"], "w") if options["errors"] else self.stdout
+        try:
+            for error in report["errors"]:
+                errors.write(json.dumps(error, cls=DjangoJSONEncoder) + "\n")
+        finally:
+            if options["errors"]:
+                errors.close()
+
+        self.stdout.write(
+            f"Created {report['created']} users, {report['failed']} rows failed "
+            f"in {elapsed:.1f}s"
+        )
@@ -0,0 +1,64 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import (
+    UNUSABLE_PASSWORD_PREFIX,
+    get_hasher,
+    identify_hasher,
+)
+from django.core.management.base import BaseCommand
+from django.db.models import Case, Count, F, Value, When
+from django.db.models.functions import Left, StrIndex
+
+
+class Command(BaseCommand):
+    help = (
+        "Counts users by password hash algorithm, and how many of them will be "
+        "re-hashed on their next login."
+    )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        preferred = get_hasher("default")
+        rows = (
+            User._default_manager.annotate(
+                # Unusable passwords ("!" and random characters) have no
+                # algorithm prefix to cut at the first "$".
+                algorithm=Case(
+                    When(
+                        password__startswith=UNUSABLE_PASSWORD_PREFIX,
+                        then=Value("unusable"),
+                    ),
+                    When(
+                        password__contains="$",
+                        then=Left(
+                            F("password"), StrIndex(F("password"), Value("$")) - 1
+                        ),
+                    ),
+                    default=Value("unusable"),
+                )
+            )
+            .values("algorithm")
+            .annotate(users=Count("pk"))
+            .order_by("-users")
+        )
+
+        pending = 0
+        for row in rows:
+            algorithm = row["algorithm"]
+            if algorithm != preferred.algorithm and algorithm != "unusable":
+                pending += row["users"]
+            self.stdout.write(f"{algorithm}: {row['users']}")
+
+        # Hashes from the preferred algorithm but older cost parameters.
+        outdated = User._default_manager.filter(
+            password__startswith=f"{preferred.algorithm}$"
+        ).values_list("password", flat=True)
+        stale = sum(
+            1
+            for encoded in outdated.iterator()
+            if identify_hasher(encoded).must_update(encoded)
+        )
+
+        self.stdout.write(
+            f"Users on other algorithms: {pending}; on outdated "
+            f"{preferred.algorithm} parameters: {stale}"
+        )
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from core_apps.users.hashing import password_hashing
+
+
+class Command(BaseCommand):
+    help = (
+        "Prints the password hashing queue depth and hash times published by "
+        "all web workers."
+    )
+
+    def handle(self, *args, **options):
+        stats = password_hashing.shared_stats()
+        if not stats:
+            self.stderr.write("The shared cache is unavailable.")
+            return
+
+        for name, value in stats.items():
+            self.stdout.write(f"{name}: {value}")
+        if stats["completed"]:
+            mean = stats["milliseconds"] / stats["completed"]
+            self.stdout.write(f"mean_ms: {mean:.1f}")
+        requests = stats["completed"] + stats["rejected"]
+        if requests:
+            self.stdout.write(f"rejected_ratio: {stats['rejected'] / requests:.2%}")
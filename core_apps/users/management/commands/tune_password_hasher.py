@@ -0,0 +1,104 @@
+import platform
+import statistics
+import time
+
+import argon2
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core_apps.users.hashers import load_hasher_profile, save_hasher_profile
+
+# OWASP's lower bound for Argon2id memory, in KiB.
+MIN_MEMORY_KIB = 19456
+MAX_TIME_COST = 10
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks Argon2 cost parameters on this host and records the "
+        "strongest ones whose hash fits in the per-hash time budget. Run it "
+        "once on the production hardware and set the printed PASSWORD_ARGON2_* "
+        "variables on every host."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target-ms",
+            type=float,
+            default=settings.PASSWORD_HASH_TARGET_MS,
+            help="Time budget for one hash on one core.",
+        )
+        parser.add_argument(
+            "--memory-kib",
+            type=int,
+            default=65536,
+            help="Starting memory cost, halved until a time cost fits the budget.",
+        )
+        parser.add_argument("--samples", type=int, default=5)
+        parser.add_argument(
+            "--if-missing",
+            action="store_true",
+            help="Keep an existing profile instead of tuning again.",
+        )
+
+    @staticmethod
+    def measure(time_cost, memory_cost, samples):
+        # One lane so the budget is the cost of a hash on a single core.
+        hasher = argon2.PasswordHasher(
+            time_cost=time_cost, memory_cost=memory_cost, parallelism=1
+        )
+        durations = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            hasher.hash("benchmark-password")
+            durations.append(time.perf_counter() - start)
+        return statistics.median(durations) * 1000
+
+    def handle(self, *args, **options):
+        if options["if_missing"] and load_hasher_profile():
+            self.stdout.write("Password hasher profile already recorded.")
+            return
+
+        target_ms = options["target_ms"]
+        memory_cost = options["memory_kib"]
+        while True:
+            best = None
+            for time_cost in range(1, MAX_TIME_COST + 1):
+                elapsed_ms = self.measure(time_cost, memory_cost, options["samples"])
+                self.stdout.write(
+                    f"m={memory_cost} KiB t={time_cost}: {elapsed_ms:.1f} ms"
+                )
+                if elapsed_ms > target_ms:
+                    break
+                best = (time_cost, elapsed_ms)
+            if best is not None or memory_cost <= MIN_MEMORY_KIB:
+                break
+            memory_cost = max(MIN_MEMORY_KIB, memory_cost // 2)
+
+        if best is None:
+            self.stderr.write(
+                f"No parameters fit {target_ms} ms, using the minimum cost."
+            )
+            best = (1, elapsed_ms)
+
+        time_cost, elapsed_ms = best
+        profile = {
+            "time_cost": time_cost,
+            "memory_cost": memory_cost,
+            "parallelism": 1,
+            "measured_ms": round(elapsed_ms, 1),
+            "target_ms": target_ms,
+            "host": platform.node(),
+            "tuned_at": timezone.now().isoformat(),
+        }
+        save_hasher_profile(profile)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Recorded t={time_cost} m={memory_cost} KiB p=1 "
+                f"({elapsed_ms:.1f} ms per hash) in {settings.PASSWORD_HASHER_PROFILE}"
+            )
+        )
+        self.stdout.write("Set on every host:")
+        for name in ("time_cost", "memory_cost", "parallelism"):
+            self.stdout.write(f"PASSWORD_ARGON2_{name.upper()}={profile[name]}")
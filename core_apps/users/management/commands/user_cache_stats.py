@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from core_apps.users.cache import user_cache
+
+
+class Command(BaseCommand):
+    help = "Prints the user cache hit and miss counters published by all workers."
+
+    def handle(self, *args, **options):
+        stats = user_cache.shared_stats()
+        if not stats:
+            self.stderr.write("The shared user cache is unavailable.")
+            return
+
+        lookups = sum(stats.values())
+        hits = stats["local_hits"] + stats["shared_hits"]
+        for name, value in stats.items():
+            self.stdout.write(f"{name}: {value}")
+        if lookups:
+            self.stdout.write(f"hit_ratio: {hits / lookups:.2%}")
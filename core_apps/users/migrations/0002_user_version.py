@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-18 07:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="version",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
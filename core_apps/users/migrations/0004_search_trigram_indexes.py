@@ -0,0 +1,42 @@
+from django.db import migrations
+
+# The columns of UserAdmin.search_fields. Django matches `icontains` with
+# UPPER("column"::text) LIKE UPPER(%s), which pg_trgm GIN indexes on the same
+# expression serve for terms of three characters or more.
+SEARCH_FIELDS = ("username", "email", "first_name", "last_name")
+
+
+def index_name(field):
+    return f"users_user_{field}_trgm_idx"
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for field in SEARCH_FIELDS:
+        # CONCURRENTLY, so building them does not lock a large table.
+        schema_editor.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name(field)} "
+            f'ON users_user USING gin (UPPER("{field}"::text) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for field in SEARCH_FIELDS:
+        schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name(field)}")
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run in a transaction.
+    atomic = False
+
+    dependencies = [
+        ("users", "0003_login_lookup_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -1,4 +1,7 @@
 from django.contrib.auth.models import AbstractUser
+from django.db import models
+from django.db.models import F
+from django.db.models.functions import Upper
 
 
 class User(AbstractUser):
@@ -7,5 +10,66 @@ class User(AbstractUser):
     This allows for additional fields and methods in the future.
     """
 
-    # Add any additional fields or methods here if needed
-    pass
+    # Fields copied into the access token when JWT_AUTH_USER_SNAPSHOT is on.
+    # Saving a change to any of them bumps `version`, which is how refreshed
+    # tokens know their snapshot is stale.
+    TOKEN_SNAPSHOT_FIELDS = ("username", "is_active", "is_staff")
+
+    version = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Serve the case-insensitive (`__iexact`) login lookups.
+            models.Index(Upper("email"), name="users_user_email_upper_idx"),
+            models.Index(Upper("username"), name="users_user_username_upper_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        adding = self._state.adding
+        snapshot = None if adding else getattr(self, "_token_snapshot", None)
+        if snapshot is not None:
+            # The snapshot holds the values the token was issued with, which
+            # may be stale: only the ones the caller changed are written.
+            unchanged = {
+                field
+                for field, value in snapshot.items()
+                if getattr(self, field) == value
+            }
+            if update_fields is None:
+                deferred = self.get_deferred_fields()
+                update_fields = {
+                    field.attname
+                    for field in self._meta.concrete_fields
+                    if not field.primary_key and field.attname not in deferred
+                }
+            update_fields = set(update_fields) - unchanged
+            kwargs["update_fields"] = update_fields
+
+        bump = update_fields is None or set(update_fields) & set(
+            self.TOKEN_SNAPSHOT_FIELDS
+        )
+        if bump and adding:
+            self.version += 1
+        elif bump:
+            # Counted by the database, so concurrent or stale saves never
+            # reuse a version.
+            self.version = F("version") + 1
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "version"}
+        super().save(*args, **kwargs)
+
+        if snapshot is not None:
+            # Trade the token's values for the row's.
+            self._token_snapshot = None
+            self.refresh_from_db(fields=[*snapshot, "version"])
+        elif bump and not adding:
+            self.refresh_from_db(fields=["version"])
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        # Users rebuilt from a token snapshot load every deferred field on
+        # first access instead of issuing one query per attribute.
+        if fields is not None and getattr(self, "_from_token_snapshot", False):
+            fields = {*fields, *self.get_deferred_fields()}
+            self._from_token_snapshot = False
+        super().refresh_from_db(using, fields, from_queryset)
@@ -1,5 +1,7 @@
 from django.contrib.auth import get_user_model
-from django.contrib.auth.backends import BaseBackend
+from django.contrib.auth.backends import BaseBackend, ModelBackend
+
+from .cache import permission_cache
 
 User = get_user_model()
 
@@ -20,3 +22,27 @@ class UsersPermissionsBackend(BaseBackend):
             return (
                 user_obj.is_authenticated and user_obj == obj or user_obj.is_superuser
             )
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend whose permission sets are read through `permission_cache`,
+    so checking permissions (in the admin, or by DjangoModelPermissions)
+    does not query the database on every request.
+
+    The set is also stored in `user_obj._perm_cache`, which ModelBackend
+    subclasses later in AUTHENTICATION_BACKENDS reuse. Object-level checks,
+    such as `users.update_user`, never read it: ModelBackend has no
+    object permissions, and UsersPermissionsBackend decides them without
+    queries.
+    """
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, "_perm_cache"):
+            compute = super().get_all_permissions
+            user_obj._perm_cache = set(
+                permission_cache.get(user_obj.pk, lambda: compute(user_obj))
+            )
+        return user_obj._perm_cache
@@ -39,3 +39,47 @@ class UserDetailsSerializer(serializers.ModelSerializer):
         model = UserModel
         fields = ("pk", *extra_fields)
         read_only_fields = ("email",)
+
+
+class UserImportSerializer(serializers.Serializer):
+    """
+    One row of a bulk user import. Rows without a password get an unusable
+    one, to be set through a password reset.
+    """
+
+    username = serializers.CharField(
+        max_length=UserModel._meta.get_field("username").max_length
+    )
+    email = serializers.EmailField()
+    password = serializers.CharField(required=False, allow_blank=True)
+    first_name = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        max_length=UserModel._meta.get_field("first_name").max_length,
+    )
+    last_name = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        max_length=UserModel._meta.get_field("last_name").max_length,
+    )
+
+    @staticmethod
+    def validate_username(username):
+        from allauth.account.adapter import get_adapter
+
+        # Uniqueness is checked for the whole chunk by the importer.
+        return get_adapter().clean_username(username, shallow=True)
+
+    @staticmethod
+    def validate_email(email):
+        from allauth.account.adapter import get_adapter
+
+        return get_adapter().clean_email(email).lower()
+
+    @staticmethod
+    def validate_password(password):
+        from allauth.account.adapter import get_adapter
+
+        if password:
+            get_adapter().clean_password(password)
+        return password
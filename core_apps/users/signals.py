@@ -0,0 +1,70 @@
+from django.contrib.auth.models import Group, Permission
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import permission_cache, user_cache
+from .models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    """
+    Drops the cached row as soon as it changes, and again once the
+    transaction commits so a concurrent reader cannot re-cache the old row.
+    """
+    pk = instance.pk
+    user_cache.invalidate(pk)
+    transaction.on_commit(lambda: user_cache.invalidate(pk))
+    # is_active and is_superuser decide the permission set too.
+    invalidate_permissions([pk])
+
+
+def invalidate_permissions(pks):
+    def invalidate():
+        for pk in pks:
+            permission_cache.invalidate(pk)
+
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+def bump_permissions():
+    permission_cache.bump()
+    transaction.on_commit(permission_cache.bump)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def invalidate_user_permissions(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Drops the cached permission sets of the users whose groups or
+    permissions changed. Clearing a group or permission of all its users
+    does not say which users they were, so every set is retired.
+    """
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        invalidate_permissions([instance.pk])
+    elif pk_set:
+        invalidate_permissions(list(pk_set))
+    else:
+        bump_permissions()
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_group_permissions(sender, action, **kwargs):
+    """
+    Retires every cached permission set when the permissions of a group
+    change, since the users of the group are not known here.
+    """
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_permissions()
+
+
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+@receiver(post_delete, sender=Group)
+def invalidate_all_permissions(sender, **kwargs):
+    bump_permissions()
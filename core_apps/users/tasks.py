@@ -0,0 +1,25 @@
+import json
+
+from celery import shared_task
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .importing import UserImporter, delete_rows, load_rows
+
+
+# Acknowledged once it has run, so an import lost with its worker is run
+# again; rows imported the first time are then reported as taken.
+@shared_task(ignore_result=False, acks_late=True, reject_on_worker_lost=True)
+def import_users_task(key):
+    """
+    Imports the `(row_number, row)` pairs of an upload sent to
+    `UserImportView`, stored under `key` by `stash_rows`. Returns the
+    import report, which holds no passwords.
+    """
+    rows = load_rows(key)
+    if rows is None:
+        raise LookupError(f"The upload {key} expired before it was imported.")
+    report = UserImporter(chunk_size=settings.USER_IMPORT_CHUNK_SIZE).run(rows)
+    delete_rows(key)
+    # Error messages may be lazy translations, which celery cannot encode.
+    return json.loads(json.dumps(report, cls=DjangoJSONEncoder))
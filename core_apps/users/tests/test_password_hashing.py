@@ -0,0 +1,158 @@
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.management import call_command
+
+from core_apps.users.hashers import TunedArgon2PasswordHasher
+from core_apps.users.hashing import PasswordHashingPool, password_hashing
+from core_apps.users.tests.factories import UserFactory
+
+User = get_user_model()
+
+
+def test_hashing_pool_runs_hashes_in_worker_processes():
+    """
+    Test that an enabled pool produces hashes the main process can verify.
+    """
+
+    pool = PasswordHashingPool(enabled=True, workers=1, max_pending=0, retry_after=1)
+    try:
+        encoded = pool.make_password("testpassword")
+        assert check_password("testpassword", encoded)
+        assert pool.check_password("testpassword", encoded)
+    finally:
+        pool.shutdown()
+
+    assert pool.stats()["completed"] == 2
+    assert pool.stats()["pending"] == 0
+
+
+@pytest.mark.django_db
+def test_login_returns_503_when_hashing_pool_is_full(client, monkeypatch):
+    """
+    Test that a full hashing pool turns a login into a 503 with Retry-After.
+    """
+
+    UserFactory.create(username="loginuser", password="testpassword")
+    full_pool = PasswordHashingPool(
+        enabled=True, workers=1, max_pending=0, retry_after=3
+    )
+    full_pool._slots.acquire()
+    monkeypatch.setattr(password_hashing, "run", full_pool.run)
+
+    response = client.post(
+        "/api/v1/auth/login",
+        {"username": "loginuser", "password": "testpassword"},
+    )
+
+    assert response.status_code == 503
+    assert response["Retry-After"] == "3"
+
+
+@pytest.mark.django_db
+def test_login_upgrades_old_password_hashes(client):
+    """
+    Test that a successful login re-hashes a PBKDF2 password with Argon2.
+    """
+
+    user = UserFactory.create(username="loginuser")
+    User.objects.filter(pk=user.pk).update(
+        password=make_password("testpassword", hasher="pbkdf2_sha256")
+    )
+
+    response = client.post(
+        "/api/v1/auth/login",
+        {"username": "loginuser", "password": "testpassword"},
+    )
+
+    user.refresh_from_db()
+    assert response.status_code == 200
+    assert user.password.startswith("argon2$")
+    assert user.check_password("testpassword")
+
+
+@pytest.mark.django_db
+def test_password_hash_report_counts_algorithms():
+    """
+    Test that the report lists users still on older hashers.
+    """
+
+    UserFactory.create()
+    user = UserFactory.create()
+    User.objects.filter(pk=user.pk).update(
+        password=make_password("pw", hasher="pbkdf2_sha256")
+    )
+    output = StringIO()
+
+    call_command("password_hash_report", stdout=output)
+
+    assert "argon2: 1" in output.getvalue()
+    assert "pbkdf2_sha256: 1" in output.getvalue()
+    assert "Users on other algorithms: 1" in output.getvalue()
+
+
+@pytest.mark.django_db
+def test_password_hash_report_counts_unusable_passwords_apart():
+    """
+    Test that users without a usable password are reported as unusable
+    rather than under a made-up algorithm.
+    """
+
+    user = UserFactory.create()
+    user.set_unusable_password()
+    user.save()
+    output = StringIO()
+
+    call_command("password_hash_report", stdout=output)
+
+    assert output.getvalue().splitlines()[0] == "unusable: 1"
+    assert "Users on other algorithms: 0" in output.getvalue()
+
+
+def test_argon2_parameters_come_from_settings(settings):
+    """
+    Test that hashes use the Argon2 parameters set in the settings, and that
+    hashes made with other parameters are due for an upgrade.
+    """
+
+    hasher = TunedArgon2PasswordHasher()
+    old = hasher.encode("testpassword", hasher.salt())
+    settings.PASSWORD_ARGON2_TIME_COST = hasher.time_cost + 1
+    settings.PASSWORD_ARGON2_MEMORY_COST = 19456
+    settings.PASSWORD_ARGON2_PARALLELISM = 1
+
+    encoded = hasher.encode("testpassword", hasher.salt())
+
+    assert hasher.decode(encoded)["time_cost"] == settings.PASSWORD_ARGON2_TIME_COST
+    assert hasher.decode(encoded)["memory_cost"] == 19456
+    assert hasher.decode(encoded)["parallelism"] == 1
+    assert hasher.must_update(old)
+    assert not hasher.must_update(encoded)
+
+
+def test_hashing_stats_are_published_for_all_workers(monkeypatch):
+    """
+    Test that the pool's counters reach the shared cache and are reported by
+    password_hashing_stats.
+    """
+
+    pool = PasswordHashingPool(
+        enabled=False, workers=1, max_pending=0, retry_after=1, alias="default"
+    )
+    monkeypatch.setattr(pool, "stats_interval", 0)
+    monkeypatch.setattr(
+        "core_apps.users.management.commands.password_hashing_stats."
+        "password_hashing",
+        pool,
+    )
+    pool.make_password("testpassword")
+    output = StringIO()
+
+    call_command("password_hashing_stats", stdout=output)
+
+    assert pool.shared_stats()["completed"] == 1
+    assert pool.shared_stats()["pending"] == 0
+    assert "completed: 1" in output.getvalue()
+    assert "mean_ms: " in output.getvalue()
@@ -0,0 +1,61 @@
+import pytest
+from django.contrib.auth.models import Group, Permission
+
+from core_apps.users.models import User
+from core_apps.users.tests.factories import UserFactory
+
+
+@pytest.fixture
+def editors():
+    group = Group.objects.create(name="editors")
+    group.permissions.add(Permission.objects.get(codename="view_user"))
+    return group
+
+
+@pytest.mark.django_db
+def test_warm_permission_cache_checks_without_sql(editors, django_assert_num_queries):
+    """
+    Test that a cached permission set is checked with zero queries.
+    """
+
+    user = UserFactory.create()
+    user.groups.add(editors)
+    assert user.has_perm("users.view_user")
+
+    # A new instance, as every request loads the user again.
+    fresh = User.objects.get(pk=user.pk)
+    with django_assert_num_queries(0):
+        assert fresh.has_perm("users.view_user")
+        assert not fresh.has_perm("users.delete_user")
+
+
+@pytest.mark.django_db
+def test_permission_changes_invalidate_cache(editors):
+    """
+    Test that changes to a group's permissions and to a user's groups are
+    seen by the next check.
+    """
+
+    user = UserFactory.create()
+    user.groups.add(editors)
+    assert not User.objects.get(pk=user.pk).has_perm("users.delete_user")
+
+    editors.permissions.add(Permission.objects.get(codename="delete_user"))
+    assert User.objects.get(pk=user.pk).has_perm("users.delete_user")
+
+    editors.user_set.remove(user)
+    assert not User.objects.get(pk=user.pk).has_perm("users.view_user")
+
+
+@pytest.mark.django_db
+def test_update_user_is_decided_without_sql(django_assert_num_queries):
+    """
+    Test that the object-level update_user permission does not query the
+    user's permissions.
+    """
+
+    user, other = UserFactory.create_batch(2)
+
+    with django_assert_num_queries(0):
+        assert user.has_perm("users.update_user", user)
+        assert not user.has_perm("users.update_user", other)
@@ -0,0 +1,60 @@
+import pytest
+from django.test import override_settings
+
+from core_apps.users.admin import UserAdmin
+from core_apps.users.tests.factories import UserFactory
+
+CHANGELIST = "/admin/users/user/"
+
+
+def usernames(response):
+    return [user.username for user in response.context["cl"].result_list]
+
+
+@pytest.fixture
+def users(monkeypatch):
+    monkeypatch.setattr(UserAdmin, "list_per_page", 2)
+    # admin_client's superuser is "admin", first of them all.
+    return [UserFactory.create(username=name) for name in ("bob", "carol", "dave")]
+
+
+@pytest.mark.django_db
+def test_changelist_pages_by_cursor(admin_client, users):
+    """
+    Test that the changelist follows the cursor of the next-page link.
+    """
+
+    first = admin_client.get(CHANGELIST)
+    assert usernames(first) == ["admin", "bob"]
+    assert first.context["cl"].result_count == 4
+    assert b'href="?after=bob"' in first.content
+
+    second = admin_client.get(CHANGELIST + first.context["cl"].next_url)
+    assert usernames(second) == ["carol", "dave"]
+    assert not second.context["cl"].next_url
+
+
+@pytest.mark.django_db
+def test_sorted_changelist_pages_by_offset(admin_client, users):
+    """
+    Test that sorting by another column falls back to numbered pages.
+    """
+
+    response = admin_client.get(CHANGELIST, {"o": "-1", "p": "2"})
+
+    assert response.status_code == 200
+    assert not response.context["cl"].keyset
+    assert usernames(response) == ["bob", "admin"]
+
+
+@pytest.mark.django_db
+@override_settings(USER_ADMIN_SEARCH="trigram")
+def test_short_search_terms_match_exactly(admin_client, users):
+    """
+    Test that words shorter than a trigram match whole usernames only.
+    """
+
+    UserFactory.create(username="al")
+
+    assert usernames(admin_client.get(CHANGELIST, {"q": "al"})) == ["al"]
+    assert usernames(admin_client.get(CHANGELIST, {"q": "aro"})) == ["carol"]
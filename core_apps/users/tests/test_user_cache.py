@@ -0,0 +1,81 @@
+import pytest
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+from core_apps.jwt.jwt_auth import JWTCookieAuthentication
+from core_apps.jwt.utils import jwt_encode
+from core_apps.users.cache import user_cache
+from core_apps.users.tests.factories import UserFactory
+
+
+@pytest.fixture(autouse=True)
+def empty_user_cache():
+    user_cache.clear_local()
+    yield
+    user_cache.clear_local()
+
+
+def authenticate(access):
+    request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {access}")
+    return JWTCookieAuthentication().authenticate(request)[0]
+
+
+@pytest.mark.django_db
+def test_warm_user_cache_serves_authentication_without_sql(
+    django_assert_num_queries,
+):
+    """
+    Test that a cached user authenticates with zero queries.
+    """
+
+    user = UserFactory.create(first_name="Grace")
+    access, _ = jwt_encode(user)
+    authenticate(access)
+    before = user_cache.stats()
+
+    with django_assert_num_queries(0):
+        cached = authenticate(access)
+
+    assert cached.pk == user.pk
+    assert cached.first_name == "Grace"
+    assert user_cache.stats()["local_hits"] == before["local_hits"] + 1
+
+
+@pytest.mark.django_db
+def test_user_save_invalidates_cache():
+    """
+    Test that saving the user drops the cached row.
+    """
+
+    user = UserFactory.create()
+    access, _ = jwt_encode(user)
+    authenticate(access)
+    user.first_name = "Changed"
+    user.save()
+
+    assert authenticate(access).first_name == "Changed"
+
+
+@pytest.mark.django_db
+def test_password_hash_is_not_cached(monkeypatch):
+    """
+    Test that the shared entry leaves the password hash out, and that
+    CHECK_REVOKE_TOKEN still compares the token with its digest.
+    """
+
+    monkeypatch.setattr(api_settings, "CHECK_REVOKE_TOKEN", True)
+    user = UserFactory.create()
+    access, _ = jwt_encode(user)
+    authenticate(access)
+
+    entry = user_cache.shared.get(
+        user_cache.key(user.pk), version=user_cache.schema_version
+    )
+    assert user.password not in entry
+    assert authenticate(access).pk == user.pk
+
+    user.set_password("changed-Pa55word")
+    user.save()
+    with pytest.raises(AuthenticationFailed):
+        authenticate(access)
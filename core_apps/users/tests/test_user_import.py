@@ -0,0 +1,212 @@
+import json
+from io import StringIO
+from types import SimpleNamespace
+
+import pytest
+from allauth.socialaccount.models import EmailAddress
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+
+from core_apps.jwt.tokens import RefreshToken
+from core_apps.users.importing import load_rows, stash_rows
+from core_apps.users.tasks import import_users_task
+from core_apps.users.tests.factories import UserFactory
+
+User = get_user_model()
+
+CSV = (
+    "username,email,password,first_name\n"
+    "mentorone,One@Example.com,correct-horse-battery,Ada\n"
+    "mentortwo,two@example.com,,Grace\n"
+    "mentorone,three@example.com,,\n"
+    "takenuser,four@example.com,,\n"
+    "mentorfive,not-an-email,,\n"
+)
+
+
+def log_in(client, user):
+    client.cookies[settings.JWT_AUTH_COOKIE] = str(
+        RefreshToken.for_user(user).access_token
+    )
+
+
+@pytest.mark.django_db
+def test_import_users_command_reports_failed_rows(tmp_path):
+    """
+    Test that the command creates the valid rows and reports the others by row number.
+    """
+
+    UserFactory.create(username="TakenUser")
+    path = tmp_path / "cohort.csv"
+    path.write_text(CSV)
+    out = StringIO()
+
+    call_command("import_users", str(path), "--workers", "1", stdout=out)
+
+    lines = out.getvalue().splitlines()
+    errors = {error["row"]: error["errors"] for error in map(json.loads, lines[:-1])}
+    assert set(errors) == {4, 5, 6}
+    assert "username" in errors[4]
+    assert "username" in errors[5]
+    assert "email" in errors[6]
+    assert lines[-1].startswith("Created 2 users, 3 rows failed")
+
+    imported = User.objects.get(username="mentorone")
+    assert imported.check_password("correct-horse-battery")
+    assert imported.first_name == "Ada"
+    assert not User.objects.get(username="mentortwo").has_usable_password()
+    assert EmailAddress.objects.filter(
+        user=imported, email="one@example.com", primary=True
+    ).exists()
+
+
+@pytest.mark.django_db
+def test_user_import_endpoint_is_staff_only(client):
+    """
+    Test that only staff can import users through the API.
+    """
+
+    log_in(client, UserFactory.create())
+    upload = SimpleUploadedFile("cohort.csv", CSV.encode())
+
+    response = client.post("/api/v1/users/import", {"file": upload})
+
+    assert response.status_code == 403
+
+
+@pytest.mark.django_db
+def test_user_import_endpoint_creates_users(client, django_assert_max_num_queries):
+    """
+    Test that a JSONL upload is imported with bulk inserts.
+    """
+
+    log_in(client, UserFactory.create(is_staff=True))
+    rows = [
+        {"username": f"cohort{n}", "email": f"cohort{n}@example.com"} for n in range(50)
+    ]
+    upload = SimpleUploadedFile(
+        "cohort.jsonl", "\n".join(json.dumps(row) for row in rows).encode()
+    )
+
+    with django_assert_max_num_queries(12):
+        response = client.post("/api/v1/users/import", {"file": upload})
+
+    assert response.status_code == 201
+    assert response.json() == {"created": 50, "failed": 0, "errors": []}
+    assert EmailAddress.objects.filter(email__startswith="cohort").count() == 50
+
+
+@pytest.mark.django_db
+def test_user_import_endpoint_runs_in_background(client, monkeypatch):
+    """
+    Test that a background import is enqueued with a reference to the
+    parsed rows rather than the rows and their passwords.
+    """
+
+    enqueued = []
+    monkeypatch.setattr(
+        import_users_task,
+        "delay",
+        lambda key: enqueued.append(key) or SimpleNamespace(id="task-id"),
+    )
+    log_in(client, UserFactory.create(is_staff=True))
+    upload = SimpleUploadedFile("cohort.csv", CSV.encode())
+
+    response = client.post(
+        "/api/v1/users/import", {"file": upload, "background": "true"}
+    )
+
+    assert response.status_code == 202
+    assert response.json() == {"task_id": "task-id"}
+    (key,) = enqueued
+    assert "correct-horse-battery" not in key
+    assert [number for number, _ in load_rows(key)] == [2, 3, 4, 5, 6]
+    assert not User.objects.filter(username="mentorone").exists()
+
+
+@pytest.mark.django_db
+def test_user_import_endpoint_runs_large_uploads_in_background(
+    client, monkeypatch, settings
+):
+    """
+    Test that an upload over the synchronous limit is enqueued even without
+    `background`.
+    """
+
+    settings.USER_IMPORT_SYNC_MAX_ROWS = 4
+    enqueued = []
+    monkeypatch.setattr(
+        import_users_task,
+        "delay",
+        lambda key: enqueued.append(key) or SimpleNamespace(id="task-id"),
+    )
+    log_in(client, UserFactory.create(is_staff=True))
+    upload = SimpleUploadedFile("cohort.csv", CSV.encode())
+
+    response = client.post("/api/v1/users/import", {"file": upload})
+
+    assert response.status_code == 202
+    assert len(enqueued) == 1
+
+
+@pytest.mark.django_db
+def test_import_refuses_emails_taken_in_another_case():
+    """
+    Test that an email already on a user, in any case and without an
+    EmailAddress row, is reported as taken.
+    """
+
+    UserFactory.create(email="Taken@Example.com")
+    rows = [[2, {"username": "mentorone", "email": "taken@example.com"}]]
+
+    report = import_users_task(stash_rows(rows))
+
+    assert report["created"] == 0
+    assert "email" in report["errors"][0]["errors"]
+
+
+@pytest.mark.django_db
+def test_import_users_task_returns_a_json_report():
+    """
+    Test that the background import returns its report as plain JSON values.
+    """
+
+    rows = [[2, {"username": "mentorone", "email": "one@example.com"}], [3, None]]
+
+    key = stash_rows(rows)
+
+    report = import_users_task(key)
+
+    assert report["created"] == 1
+    assert json.loads(json.dumps(report)) == report
+    assert User.objects.filter(username="mentorone").exists()
+    assert load_rows(key) is None
+
+
+@pytest.mark.django_db
+def test_user_import_status_returns_the_report(client, monkeypatch):
+    """
+    Test that staff can read the state of a background import and, once it
+    has succeeded, its report.
+    """
+
+    report = {"created": 1, "failed": 0, "errors": []}
+    monkeypatch.setattr(
+        import_users_task,
+        "AsyncResult",
+        lambda task_id: SimpleNamespace(
+            state="SUCCESS", result=report, successful=lambda: True
+        ),
+    )
+    log_in(client, UserFactory.create(is_staff=True))
+
+    response = client.get("/api/v1/users/import/task-id")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "task_id": "task-id",
+        "status": "SUCCESS",
+        "report": report,
+    }
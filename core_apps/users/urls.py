@@ -0,0 +1,12 @@
+from django.urls import path
+
+from .views import UserImportStatusView, UserImportView
+
+urlpatterns = [
+    path("import", UserImportView.as_view(), name="user_import"),
+    path(
+        "import/<str:task_id>",
+        UserImportStatusView.as_view(),
+        name="user_import_status",
+    ),
+]
@@ -0,0 +1,89 @@
+import io
+from itertools import islice
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .importing import (
+    FORMATS,
+    UserImporter,
+    format_from_name,
+    read_rows,
+    stash_rows,
+)
+from .tasks import import_users_task
+
+
+class UserImportView(APIView):
+    """
+    Creates users in bulk from an uploaded CSV or JSONL `file`.
+    Staff only.
+
+    Accepts up to USER_IMPORT_MAX_ROWS rows; larger cohorts go through the
+    `import_users` management command.
+
+    Returns the number of users created and the errors of each failed row,
+    or with `background` set, or more than USER_IMPORT_SYNC_MAX_ROWS rows,
+    the id of the celery task running the import, whose report
+    `UserImportStatusView` returns.
+    """
+
+    permission_classes = (IsAdminUser,)
+    parser_classes = (MultiPartParser,)
+
+    def post(self, request, *args, **kwargs):
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise ValidationError({"file": [_("No file was submitted.")]})
+
+        format = request.data.get("format") or format_from_name(upload.name)
+        if format not in FORMATS:
+            raise ValidationError(
+                {"format": [_("Use one of: %s.") % ", ".join(FORMATS)]}
+            )
+
+        max_rows = settings.USER_IMPORT_MAX_ROWS
+        stream = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+        rows = list(islice(read_rows(stream, format), max_rows + 1))
+        if len(rows) > max_rows:
+            raise ValidationError(
+                {
+                    "file": [
+                        _("Imports are limited to %(max)d rows per request.")
+                        % {"max": max_rows}
+                    ]
+                }
+            )
+
+        background = request.data.get("background", "").lower() in ("1", "true")
+        if background or len(rows) > settings.USER_IMPORT_SYNC_MAX_ROWS:
+            task = import_users_task.delay(stash_rows(rows))
+            return Response({"task_id": task.id}, status=status.HTTP_202_ACCEPTED)
+
+        report = UserImporter(chunk_size=settings.USER_IMPORT_CHUNK_SIZE).run(rows)
+        response_status = (
+            status.HTTP_201_CREATED if report["created"] else status.HTTP_200_OK
+        )
+        return Response(report, status=response_status)
+
+
+class UserImportStatusView(APIView):
+    """
+    Returns the celery state of a background import started through
+    `UserImportView`, and its report once it has succeeded. Staff only.
+    """
+
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request, task_id, *args, **kwargs):
+        result = import_users_task.AsyncResult(task_id)
+        data = {"task_id": task_id, "status": result.state}
+        if result.successful():
+            data["report"] = result.result
+        return Response(data)
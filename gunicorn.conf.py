@@ -0,0 +1,112 @@
+"""
+Gunicorn settings for the production web containers.
+
+The number of workers follows the CPUs and memory the container may use
+(cgroup limits included). Password hashes do not run in the web workers but
+in the hashing pool of core_apps.users.hashing, so the workers mostly wait on
+the database, Redis and the pool: gthread workers with a few threads each
+keep every core busy, and the pools are sized so all workers together run
+about one hash per core. The defaults come from `python -m
+benchmarks.login_mix`; each can be overridden with the variables below.
+
+    GUNICORN_WORKER_CLASS   gthread (mentoreed.wsgi) or uvicorn (mentoreed.asgi)
+    WEB_CONCURRENCY         number of workers, instead of deriving it
+    GUNICORN_THREADS        threads per gthread worker
+    GUNICORN_WORKER_MEMORY_MB   resident memory of one worker
+    PASSWORD_HASH_MEMORY_MB     memory of one password hash in flight
+"""
+
+import math
+import os
+
+WORKER_CLASSES = {
+    "gthread": "gthread",
+    "uvicorn": "uvicorn.workers.UvicornWorker",
+}
+
+
+def available_cpus():
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            return max(1, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def available_memory_mb():
+    physical = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    for path in (
+        "/sys/fs/cgroup/memory.max",
+        "/sys/fs/cgroup/memory/memory.limit_in_bytes",
+    ):
+        try:
+            with open(path) as f:
+                limit = f.read().strip()
+        except OSError:
+            continue
+        if limit.isdigit():
+            # cgroup v1 reports "no limit" as a huge number.
+            return min(int(limit), physical) // 2**20
+    return physical // 2**20
+
+
+cpus = available_cpus()
+memory_mb = available_memory_mb()
+
+worker_type = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+worker_class = WORKER_CLASSES[worker_type]
+threads = int(os.environ.get("GUNICORN_THREADS", 4)) if worker_type == "gthread" else 1
+
+# One worker per core, plus one to cover the time a worker spends blocked
+# on I/O; fewer if their memory and a hash per core would not fit in 80% of
+# the container.
+worker_memory_mb = int(os.environ.get("GUNICORN_WORKER_MEMORY_MB", 160))
+hash_memory_mb = int(os.environ.get("PASSWORD_HASH_MEMORY_MB", 64))
+workers_by_memory = int((memory_mb * 0.8 - cpus * hash_memory_mb) // worker_memory_mb)
+workers = int(os.environ.get("WEB_CONCURRENCY", 0)) or max(
+    1, min(cpus + 1, workers_by_memory)
+)
+
+# Read by the Django settings: the database pool of each worker gets its
+# share of the connection budget, and the hashing pools share the cores.
+os.environ["WEB_CONCURRENCY"] = str(workers)
+os.environ.setdefault("PASSWORD_HASHING_WORKERS", str(max(1, cpus // workers)))
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:1998")
+
+# Import the app once in the master, so forked workers share those pages.
+preload_app = True
+
+# Recycle workers to bound slow leaks; the jitter keeps them from all
+# restarting at the same moment.
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = max_requests // 10
+
+# Long enough for a login waiting behind a full hashing pool.
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = 30
+keepalive = 5
+
+
+def close_connections():
+    from django.apps import apps
+
+    # Only once the app is loaded, which preload_app does in the master.
+    if apps.ready:
+        from core_apps.common.connections import close_connections
+
+        close_connections()
+
+
+def pre_fork(server, worker):
+    close_connections()
+
+
+def post_fork(server, worker):
+    close_connections()
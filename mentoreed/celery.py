@@ -2,6 +2,7 @@ import os
 
 from celery import Celery
 from django.conf import settings
+from kombu import Queue
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mentoreed.settings.production")
 
@@ -9,4 +10,7 @@ app = Celery("mentoreed")
 
 app.config_from_object("django.conf:settings", namespace="CELERY")
 
+# Declared up front so a worker started without -Q consumes from all of them.
+app.conf.task_queues = [Queue(name) for name in settings.CELERY_QUEUE_CONCURRENCY]
+
 app.autodiscover_tasks(lambda: settings.INSTALLED_APPS)
@@ -10,8 +10,10 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from datetime import timedelta
 from pathlib import Path
+from urllib.parse import urlsplit
 
 import environ
 
@@ -57,27 +59,50 @@ THIRD_PARTY_APPS = [
     # Registration
     "allauth",
     "allauth.account",
+    "django_filters",
+    "corsheaders",
+    "djcelery_email",
+]
+
+# Apps the API and the celery workers never use: the API docs, social
+# accounts and form/dev helpers.
+TOOLING_APPS = [
     "allauth.socialaccount",
     "django_extensions",
-    "django_filters",
     "django_countries",
     "phonenumber_field",
     "drf_yasg",
-    "corsheaders",
-    "djcelery_email",
 ]
 
 LOCAL_APPS = [
     "core_apps.users",
     "core_apps.jwt",
+    "core_apps.common",
 ]
 
-INSTALLED_APPS = ADMIN_APPS + DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
+# The kind of process these settings are loaded in. Each role installs only
+# the apps it serves, so its workers import less on boot:
+# - "api": the REST API, without the admin site and /redoc/
+# - "admin": the admin site and the API docs
+# - "worker": celery workers
+# - "all": everything, for manage.py, tests and single-process deployments
+DJANGO_ROLE = env("DJANGO_ROLE", default="all")
+ROLE_APPS = {
+    "api": DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS,
+    "admin": ADMIN_APPS + DJANGO_APPS + THIRD_PARTY_APPS + TOOLING_APPS + LOCAL_APPS,
+    "worker": DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS,
+    "all": ADMIN_APPS + DJANGO_APPS + THIRD_PARTY_APPS + TOOLING_APPS + LOCAL_APPS,
+}
+if DJANGO_ROLE not in ROLE_APPS:
+    raise ValueError(
+        f"DJANGO_ROLE must be one of {', '.join(ROLE_APPS)}, not {DJANGO_ROLE!r}"
+    )
+INSTALLED_APPS = ROLE_APPS[DJANGO_ROLE]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    "core_apps.common.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
@@ -112,13 +137,45 @@ DATABASES = {"default": env.db("DATABASE_URL")}
 
 
 # https://docs.djangoproject.com/en/5.0/topics/auth/passwords/
+# The first hasher is used for new hashes; the rest verify older ones, which
+# are upgraded on the next successful login.
 PASSWORD_HASHERS = [
+    "core_apps.users.hashers.TunedArgon2PasswordHasher",
     "django.contrib.auth.hashers.PBKDF2PasswordHasher",
     "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
-    "django.contrib.auth.hashers.Argon2PasswordHasher",
     "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
     "django.contrib.auth.hashers.ScryptPasswordHasher",
 ]
+# Argon2 cost parameters shared by every host. Run `manage.py
+# tune_password_hasher` once on the production hardware and set the values it
+# prints in the environment: hosts hashing with different parameters would
+# re-hash each other's users on every login. Unset parameters come from the
+# profile the command records (local development), then Django's defaults.
+PASSWORD_ARGON2_TIME_COST = env.int("PASSWORD_ARGON2_TIME_COST", default=None)
+PASSWORD_ARGON2_MEMORY_COST = env.int("PASSWORD_ARGON2_MEMORY_COST", default=None)
+PASSWORD_ARGON2_PARALLELISM = env.int("PASSWORD_ARGON2_PARALLELISM", default=None)
+# Where `manage.py tune_password_hasher` records its measurements; it targets
+# PASSWORD_HASH_TARGET_MS of one core per hash.
+PASSWORD_HASHER_PROFILE = env(
+    "PASSWORD_HASHER_PROFILE", default=str(ROOT_DIR / "argon2_profile.json")
+)
+PASSWORD_HASH_TARGET_MS = env.float("PASSWORD_HASH_TARGET_MS", default=100.0)
+
+# Hash passwords in a process pool (core_apps.users.hashing). The pool and
+# its limit are per web worker: a worker that finds WORKERS + MAX_PENDING
+# hashes in flight answers 503 with Retry-After, so the host as a whole
+# admits WEB_CONCURRENCY times that. By default the web workers split the
+# cores between their pools.
+PASSWORD_HASHING_POOL = env.bool("PASSWORD_HASHING_POOL", default=False)
+PASSWORD_HASHING_WORKERS = env.int(
+    "PASSWORD_HASHING_WORKERS",
+    default=max(1, (os.cpu_count() or 1) // env.int("WEB_CONCURRENCY", default=1)),
+)
+PASSWORD_HASHING_MAX_PENDING = env.int("PASSWORD_HASHING_MAX_PENDING", default=16)
+PASSWORD_HASHING_RETRY_AFTER = 1
+# Where the web workers publish the pool's queue depth and hash times
+# (manage.py password_hashing_stats)
+PASSWORD_HASHING_STATS_ALIAS = "default"
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -140,13 +197,15 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
-    "DEFAULT_AUTHENTICATION_CLASSES": {
+    "DEFAULT_AUTHENTICATION_CLASSES": (
         "core_apps.jwt.jwt_auth.JWTCookieAuthentication",
         # "rest_framework_simp
         # lejwt.authentication.JWTAuthentication",
-    },
+    ),
     "DEFAULT_THROTTLE_RATES": {
         "register": "5/minute",
+        "login": "5/minute",
+        "logout": "5/minute",
     },
 }
 
@@ -156,18 +215,55 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "SIGNING_KEY": env("JWT_SIGNING_KEY"),
-    "JWT_AUTH_HTTPONLY": True,
-    "JWT_AUTH_RETURN_EXPIRATION": False,
+    "ROTATE_REFRESH_TOKENS": True,
+    "BLACKLIST_AFTER_ROTATION": True,
 }
 USE_JWT = True
+# JWT cookie settings read by core_apps.jwt
+JWT_AUTH_COOKIE = "mentoreed-auth"
+JWT_AUTH_REFRESH_COOKIE = "mentoreed-refresh-token"
+JWT_AUTH_REFRESH_COOKIE_PATH = "/"
+JWT_AUTH_SECURE = False
+JWT_AUTH_HTTPONLY = True
+JWT_AUTH_SAMESITE = "Lax"
+JWT_AUTH_COOKIE_DOMAIN = None
+JWT_AUTH_COOKIE_USE_CSRF = True
+JWT_AUTH_COOKIE_ENFORCE_CSRF_ON_UNAUTHENTICATED = False
+JWT_AUTH_RETURN_EXPIRATION = False
+# Seconds between incremental syncs / full rebuilds of the per-process
+# refresh-token blacklist index (core_apps.jwt.blacklist)
+JWT_BLACKLIST_SYNC_INTERVAL = env.float("JWT_BLACKLIST_SYNC_INTERVAL", default=1.0)
+JWT_BLACKLIST_REBUILD_INTERVAL = env.int("JWT_BLACKLIST_REBUILD_INTERVAL", default=3600)
+# Seconds a blacklist row may take to commit, or app server clocks may be
+# apart, and still be picked up by the next incremental sync
+JWT_BLACKLIST_SYNC_OVERLAP = env.int("JWT_BLACKLIST_SYNC_OVERLAP", default=60)
+# Rotation inserts are written in bulk after the response, once this many are
+# pending or, from a timer thread, once the oldest is this many seconds old
+# (core_apps.jwt.blacklist). The rotated token is revoked in the shared cache
+# before the response, so other workers refuse it meanwhile.
+JWT_BUFFER_TOKEN_WRITES = env.bool("JWT_BUFFER_TOKEN_WRITES", default=True)
+JWT_TOKEN_WRITE_BATCH_SIZE = env.int("JWT_TOKEN_WRITE_BATCH_SIZE", default=200)
+JWT_TOKEN_WRITE_MAX_DELAY = env.float("JWT_TOKEN_WRITE_MAX_DELAY", default=1.0)
+JWT_TOKEN_WRITE_AUTOFLUSH = True
+# Logout revokes the tokens in the shared cache right away and leaves the
+# blacklist rows to a celery task, written in batches like the rotation
+# inserts; refresh and authentication check the cache first (one cache read
+# per authenticated request). core_apps.jwt.blacklist.RevokedTokens
+JWT_FAST_LOGOUT = env.bool("JWT_FAST_LOGOUT", default=True)
+JWT_REVOKED_TOKENS_ALIAS = "tokens"
 LOGIN_SERIALIZER = "core_apps.jwt.serializers.LoginSerializer"
 JWT_SERIALIZER = "core_apps.jwt.serializers.JWTSerializer"
-JWT_SERIALIZER_WITH_EXPIRATION = (
-    "core_apps.jwt.serializers.JWTSerializerWithExpiration",
-)
-JWT_TOKEN_CLAIMS_SERIALIZER = (
-    "rest_framework_simplejwt.serializers.TokenObtainPairSerializer"
-)
+JWT_SERIALIZER_WITH_EXPIRATION = "core_apps.jwt.serializers.JWTSerializerWithExpiration"
+JWT_TOKEN_CLAIMS_SERIALIZER = "core_apps.jwt.serializers.TokenClaimsSerializer"
+# Render login and register responses through pre-bound serializer fields
+# (core_apps.jwt.compiled); the bytes are the same as DRF's.
+JWT_COMPILED_RESPONSES = env.bool("JWT_COMPILED_RESPONSES", default=True)
+# Embed a user snapshot in access tokens so authentication skips the
+# per-request user query. Changes to the user apply on the next refresh.
+JWT_AUTH_USER_SNAPSHOT = env.bool("JWT_AUTH_USER_SNAPSHOT", default=False)
+# Route login, token refresh and user details to the async views. Meant for
+# ASGI workers (docker/production/django/start-asgi).
+JWT_AUTH_ASYNC_VIEWS = env.bool("JWT_AUTH_ASYNC_VIEWS", default=False)
 TOKEN_MODEL = "rest_framework.authtoken.models.Token"
 SESSION_LOGIN = True
 USER_DETAILS_SERIALIZER = "core_apps.users.serializers.UserDetailsSerializer"
@@ -184,7 +280,7 @@ ACCOUNT_EMAIL_VERIFICATION = "none"
 
 
 AUTHENTICATION_BACKENDS = [
-    "django.contrib.auth.backends.ModelBackend",
+    "core_apps.users.permissions.CachedModelBackend",
     "core_apps.users.permissions.UsersPermissionsBackend",
     "allauth.account.auth_backends.AuthenticationBackend",
 ]
@@ -204,12 +300,27 @@ USE_TZ = True
 SITE_ID = 1
 
 ADMIN_URL = "admin/"
+# Changelists of tables with more rows than this show estimated counts
+# (core_apps.common.admin.EstimatedCountPaginator)
+ADMIN_ESTIMATED_COUNT_THRESHOLD = env.int(
+    "ADMIN_ESTIMATED_COUNT_THRESHOLD", default=100_000
+)
+# "trigram" searches users through the pg_trgm indexes (UserAdmin), and
+# "contains" with Django's search, which scans the table
+USER_ADMIN_SEARCH = env("USER_ADMIN_SEARCH", default="trigram")
 
 
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/3.2/howto/static-files/
 STATIC_URL = "/staticfiles/"
 STATIC_ROOT = str(ROOT_DIR / "staticfiles")
+# Written by the generate_openapi_schema command and served to /redoc/
+# (core_apps.common.schema); without the file the schema is generated once
+# per process.
+OPENAPI_SCHEMA_FILE = env(
+    "OPENAPI_SCHEMA_FILE", default=str(ROOT_DIR / "staticfiles" / "openapi.json")
+)
+REDOC_SETTINGS = {"SPEC_URL": "openapi_schema"}
 
 MEDIA_URL = "/mediafiles/"
 MEDIA_ROOT = str(ROOT_DIR / "mediafiles")
@@ -228,10 +339,174 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_BACKEND_MAX_RETRIES = 10
 CELERY_TASK_SEND_SENT_EVENT = True
+# Tasks are fire-and-forget: results are only stored for the tasks that set
+# ignore_result=False, and kept for a day.
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_RESULT_EXPIRES = timedelta(days=1)
+
+# Queues, so a burst of one kind of task never waits behind another:
+#   email    email delivery (core_apps.common.mail)
+#   tokens   blacklist writes and expired-token cleanup (core_apps.jwt.tasks)
+#   imports  bulk user imports (core_apps.users.tasks)
+#   default  everything else
+CELERY_TASK_DEFAULT_QUEUE = "default"
+CELERY_TASK_ROUTES = {
+    "core_apps.common.tasks.send_email_batch": {"queue": "email"},
+    "djcelery_email_send_multiple": {"queue": "email"},
+    "core_apps.jwt.tasks.*": {"queue": "tokens"},
+    "core_apps.users.tasks.*": {"queue": "imports"},
+}
+# Worker processes per queue. A worker started for several queues
+# (CELERY_WORKER_QUEUES, a comma-separated list) gets the sum.
+CELERY_QUEUE_CONCURRENCY = {
+    "default": env.int("CELERY_DEFAULT_CONCURRENCY", default=2),
+    "email": env.int("CELERY_EMAIL_CONCURRENCY", default=4),
+    "tokens": env.int("CELERY_TOKENS_CONCURRENCY", default=1),
+    "imports": env.int("CELERY_IMPORTS_CONCURRENCY", default=1),
+}
+# Queues of long tasks, which are acknowledged once they have run (acks_late
+# on the task) and reserved one at a time, so a busy process does not hold
+# back messages another one could run.
+CELERY_LONG_TASK_QUEUES = ["imports"]
+CELERY_WORKER_QUEUES = env.list(
+    "CELERY_WORKER_QUEUES", default=list(CELERY_QUEUE_CONCURRENCY)
+)
+CELERY_WORKER_CONCURRENCY = sum(
+    CELERY_QUEUE_CONCURRENCY[queue] for queue in CELERY_WORKER_QUEUES
+)
+CELERY_WORKER_PREFETCH_MULTIPLIER = (
+    1 if set(CELERY_WORKER_QUEUES) & set(CELERY_LONG_TASK_QUEUES) else 4
+)
 
 if USE_TZ:
     CELERY_TIMEZONE = TIME_ZONE
 
+# Email goes out through core_apps.common.mail.BatchingEmailBackend: chunks
+# of EMAIL_BATCH_SIZE messages per celery task, delivered by the workers with
+# EMAIL_DELIVERY_BACKEND over connections they keep open between tasks. A
+# message that fails is retried EMAIL_MAX_RETRIES times, after
+# EMAIL_RETRY_BACKOFF seconds and twice as long each time.
+EMAIL_DELIVERY_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+EMAIL_BATCH_SIZE = env.int("EMAIL_BATCH_SIZE", default=20)
+EMAIL_SMTP_POOL_SIZE = env.int("EMAIL_SMTP_POOL_SIZE", default=1)
+# Seconds an open SMTP session may sit idle before it is closed
+EMAIL_SMTP_MAX_IDLE = env.float("EMAIL_SMTP_MAX_IDLE", default=30.0)
+EMAIL_MAX_RETRIES = env.int("EMAIL_MAX_RETRIES", default=5)
+EMAIL_RETRY_BACKOFF = env.float("EMAIL_RETRY_BACKOFF", default=10.0)
+EMAIL_TIMEOUT = env.int("EMAIL_TIMEOUT", default=10)
+# Where the workers publish their delivery counters (manage.py mail_stats)
+EMAIL_STATS_ALIAS = "default"
+
+# Options of the Redis cache aliases: each process keeps one pool of up to
+# max_connections per alias and waits at most `timeout` for a free one.
+REDIS_CACHE_OPTIONS = {
+    "pool_class": "redis.BlockingConnectionPool",
+    "max_connections": env.int("CACHE_MAX_CONNECTIONS", default=50),
+    "timeout": 0.5,
+    "socket_timeout": 0.25,
+    "socket_connect_timeout": 0.25,
+    "health_check_interval": 30,
+}
+
+# The Redis server of Celery, but another database: clearing a cache flushes
+# its whole database, which must never hold queued tasks.
+CACHE_REDIS_URL = env(
+    "CACHE_REDIS_URL", default=urlsplit(CELERY_BROKER_URL)._replace(path="/1").geturl()
+)
+
+# The default alias is Redis, shared by every process; while Redis is down it
+# reads as a miss (core_apps.common.cache.FailSoftRedisCache). The "users"
+# alias is the shared tier of core_apps.users.cache.user_cache,
+# "sessions" backs SESSION_ENGINE, "tokens" holds the revoked JWTs and
+# "imports" the uploads of background user imports. All live in
+# CACHE_REDIS_URL, apart by key prefix.
+CACHES = {
+    "default": {
+        "BACKEND": "core_apps.common.cache.FailSoftRedisCache",
+        "LOCATION": env("CACHE_URL", default=CACHE_REDIS_URL),
+        "KEY_PREFIX": "mentoreed",
+        "OPTIONS": REDIS_CACHE_OPTIONS,
+    },
+    "users": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": env("USER_CACHE_URL", default=CACHE_REDIS_URL),
+        "KEY_PREFIX": "users",
+        "OPTIONS": REDIS_CACHE_OPTIONS,
+    },
+    # Not fail-soft: a session write that is silently dropped logs users out.
+    "sessions": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": env("SESSION_CACHE_URL", default=CACHE_REDIS_URL),
+        "KEY_PREFIX": "sessions",
+        "OPTIONS": REDIS_CACHE_OPTIONS,
+    },
+    # Not fail-soft either: a revocation must not be silently dropped
+    # (core_apps.jwt.blacklist.RevokedTokens).
+    "tokens": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": env("TOKEN_CACHE_URL", default=CACHE_REDIS_URL),
+        "KEY_PREFIX": "tokens",
+        "OPTIONS": REDIS_CACHE_OPTIONS,
+    },
+    # Not fail-soft: a dropped upload would be reported as enqueued.
+    "imports": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": env("IMPORT_CACHE_URL", default=CACHE_REDIS_URL),
+        "KEY_PREFIX": "imports",
+        "OPTIONS": REDIS_CACHE_OPTIONS,
+    },
+}
+
+# Sessions serve the admin site and allauth's web flows; the API is JWT only
+# and requests under SESSIONLESS_PATH_PREFIXES never touch the session
+# (core_apps.common.middleware.SessionMiddleware). SESSION_STORE is one of:
+#   "cached_db" rows in django_session, read through the "sessions" cache
+#   "cache"     Redis only, nothing written to the database
+#   "db"        rows in django_session only
+SESSION_STORE = env("SESSION_STORE", default="cached_db")
+SESSION_ENGINE = f"django.contrib.sessions.backends.{SESSION_STORE}"
+SESSION_CACHE_ALIAS = "sessions"
+SESSIONLESS_PATH_PREFIXES = ["/api/v1/"]
+
+# Cache-aside reads of core_apps.common.cache (cached_view, cached_queryset)
+CACHE_ASIDE_ALIAS = "default"
+CACHE_ASIDE_TIMEOUT = env.int("CACHE_ASIDE_TIMEOUT", default=60)
+CACHE_ASIDE_MAX_SIZE = env.int("CACHE_ASIDE_MAX_SIZE", default=1000)
+# Upper bound on how long a process serves a value another one replaced
+CACHE_ASIDE_LOCAL_TTL = env.int("CACHE_ASIDE_LOCAL_TTL", default=2)
+# Release the process runs, set at image build time; cache-aside keys carry
+# it so a deploy never reads values an older release wrote.
+CACHE_DEPLOY_VERSION = env("DEPLOY_VERSION", default="dev")
+
+# Redis holding the throttle history shared by every worker; empty keeps
+# the history in each process
+THROTTLE_REDIS_URL = env("THROTTLE_REDIS_URL", default=CACHE_REDIS_URL)
+# Seconds to wait for Redis before letting the request through
+THROTTLE_REDIS_TIMEOUT = env.float("THROTTLE_REDIS_TIMEOUT", default=0.1)
+
+# Bulk user imports through /api/v1/users/import; larger files go through
+# the import_users management command.
+USER_IMPORT_MAX_ROWS = env.int("USER_IMPORT_MAX_ROWS", default=5000)
+# Uploads with more rows are imported by a celery task, as hashing their
+# passwords would outlast the request timeout.
+USER_IMPORT_SYNC_MAX_ROWS = env.int("USER_IMPORT_SYNC_MAX_ROWS", default=100)
+USER_IMPORT_CHUNK_SIZE = 1000
+# Background imports read their rows, passwords included, from this cache
+# rather than from the broker message; seconds an upload waits for its task.
+USER_IMPORT_CACHE_ALIAS = "imports"
+USER_IMPORT_UPLOAD_TIMEOUT = 24 * 60 * 60
+
+# Cache of user rows read by JWTCookieAuthentication
+USER_CACHE_ENABLED = env.bool("USER_CACHE_ENABLED", default=True)
+USER_CACHE_ALIAS = "users"
+USER_CACHE_MAX_SIZE = env.int("USER_CACHE_MAX_SIZE", default=10_000)
+# Upper bound on how long another worker may serve a changed user, including
+# one that was deactivated
+USER_CACHE_LOCAL_TTL = env.int("USER_CACHE_LOCAL_TTL", default=5)
+USER_CACHE_TTL = env.int("USER_CACHE_TTL", default=300)
+# Seconds a user's permission set is cached (core_apps.users.cache.PermissionCache)
+PERMISSION_CACHE_TIMEOUT = env.int("PERMISSION_CACHE_TIMEOUT", default=300)
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
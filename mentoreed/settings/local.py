@@ -11,9 +11,12 @@ SECRET_KEY = env(
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
 
+# Generate the OpenAPI schema in process, so it follows code changes.
+OPENAPI_SCHEMA_FILE = env("OPENAPI_SCHEMA_FILE", default=None)
+
 CSRF_TRUSTED_ORIGINS = ["http://localhost:8080"]
 
-EMAIL_BACKEND = "djcelery_email.backends.CeleryEmailBackend"
+EMAIL_BACKEND = "core_apps.common.mail.BatchingEmailBackend"
 EMAIL_HOST = env("EMAIL_HOST", default="mailhog")
 EMAIL_PORT = env("EMAIL_PORT")
 DEFAULT_FROM_EMAIL = "email@email.com"
@@ -15,6 +15,35 @@ ADMIN_URL = env("DJANGO_ADMIN_URL")
 
 DATABASES = {"default": env.db("DATABASE_URL")}
 
+# How web workers hold their Postgres connections:
+#   "pool"       psycopg 3 pool per worker process (Django >= 5.1)
+#   "pgbouncer"  persistent connections to a pgbouncer in transaction mode
+#   "persistent" one reused connection per worker thread
+DATABASE_POOL_MODE = env("DATABASE_POOL_MODE", default="pool")
+# Number of gunicorn workers, exported by gunicorn.conf.py.
+WEB_CONCURRENCY = env.int("WEB_CONCURRENCY", default=1)
+# Postgres connections the web workers may hold altogether
+DATABASE_CONNECTION_BUDGET = env.int("DATABASE_CONNECTION_BUDGET", default=20)
+
+if DATABASE_POOL_MODE == "pool":
+    DATABASES["default"]["OPTIONS"] = {
+        **DATABASES["default"].get("OPTIONS", {}),
+        "pool": {
+            "min_size": 1,
+            "max_size": max(2, DATABASE_CONNECTION_BUDGET // WEB_CONCURRENCY),
+            # Seconds a request waits for a free connection before failing
+            "timeout": env.float("DATABASE_POOL_TIMEOUT", default=10.0),
+        },
+    }
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = env.int("CONN_MAX_AGE", default=60)
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+    if DATABASE_POOL_MODE == "pgbouncer":
+        # Transaction pooling cannot keep a cursor open across transactions.
+        DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
+
+PASSWORD_HASHING_POOL = env.bool("PASSWORD_HASHING_POOL", default=True)
+
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
 
 SECURE_SSL_REDIRECT = env.bool("DJANGO_SECURE_SSL_REDIRECT", default=True)
@@ -23,6 +52,8 @@ SESSION_COOKIE_SECURE = True
 
 CSRF_COOKIE_SECURE = True
 
+JWT_AUTH_SECURE = True
+
 # TODO: change to 518400 later
 SECURE_HSTS_SECONDS = 60
 
@@ -46,7 +77,7 @@ SERFVER_EMAIL = env("DJANGO_SERVER_EMAIL", default=DEFAULT_FROM_EMAIL)
 
 EMAIL_SUBJECT_PREFIX = env("DJANGO_EMAIL_SUBJECT_PREFIX", default="[Mentoreed]")
 
-EMAIL_BACKEND = "djcelery_email.backends.CeleryEmailBackend"
+EMAIL_BACKEND = "core_apps.common.mail.BatchingEmailBackend"
 EMAIL_HOST = "smtp.mailgun.org"
 EMAIL_HOST_USER = "postmaster@mg.mentoreed.live"
 EMAIL_HOST_PASSWORD = env("SMTP_MAILGUN_PASSWORD")
@@ -0,0 +1,18 @@
+from .local import *  # noqa
+
+# Tests never share a cache with the running stack: each alias is a
+# process-local LocMemCache of its own, emptied after every test (conftest.py).
+CACHES = {
+    alias: {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": alias,
+    }
+    for alias in ("default", "users", "sessions", "tokens", "imports")
+}
+
+# Throttle history stays in the process too (RedisScopedRateThrottle.cache).
+THROTTLE_REDIS_URL = ""
+
+# Tests flush the token buffers themselves: a timer thread would write
+# outside the test's transaction.
+JWT_TOKEN_WRITE_AUTOFLUSH = False
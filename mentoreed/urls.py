@@ -1,28 +1,30 @@
+from django.apps import apps
 from django.conf import settings
-from django.contrib import admin
 from django.urls import include, path
-from drf_yasg import openapi
-from drf_yasg.views import get_schema_view
-from rest_framework import permissions
 
 from core_apps.jwt.urls import urlpatterns as jwt_urls
 
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Mentoreed API",
-        default_version="v1",
-        description="Mentoreed API documentation",
-        contact=openapi.Contact(email="whatever@whatever.com"),
-        license=openapi.License(name="MIT License"),
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
-
 urlpatterns = [
-    path("redoc/", schema_view.with_ui("redoc", cache_timeout=0)),
-    path(settings.ADMIN_URL, admin.site.urls),
     path("api/v1/auth/", include("core_apps.jwt.urls")),
+    path("api/v1/users/", include("core_apps.users.urls")),
 ]
 
+# Served by the processes whose DJANGO_ROLE installs them.
+if apps.is_installed("django.contrib.admin"):
+    from django.contrib import admin
+
+    urlpatterns.append(path(settings.ADMIN_URL, admin.site.urls))
+
+if apps.is_installed("drf_yasg"):
+    from drf_yasg.renderers import ReDocRenderer
+
+    from core_apps.common.schema import schema_view
+    from core_apps.common.views import openapi_schema_view
+
+    urlpatterns += [
+        # The ReDoc page only; it loads the schema from openapi_schema_view.
+        path("redoc/", schema_view.as_cached_view(renderer_classes=(ReDocRenderer,))),
+        path("redoc/openapi.json", openapi_schema_view, name="openapi_schema"),
+    ]
+
 urlpatterns += jwt_urls